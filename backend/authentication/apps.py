@@ -4,3 +4,21 @@ from django.apps import AppConfig
 class AuthenticationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'authentication'
+
+    def ready(self):
+        # Saving a user (password change, deactivation) or deleting one drops
+        # it from the authenticated-user cache
+        from django.db.models.signals import post_delete, post_save
+        from .models import User
+        from .revocation import track_user_activation
+        from .user_cache import invalidate_cached_user
+        post_save.connect(invalidate_cached_user, sender=User, dispatch_uid='user_cache_post_save')
+        post_save.connect(track_user_activation, sender=User, dispatch_uid='revocation_post_save')
+        post_delete.connect(invalidate_cached_user, sender=User, dispatch_uid='user_cache_post_delete')
+
+        # Cache and connection pool counters on /metrics
+        from .metrics import register_stats
+        from .mongodb import MongoDBConnection
+        from .user_cache import get_user_cache
+        register_stats('user_cache', lambda: get_user_cache().stats())
+        register_stats('mongodb_pool', MongoDBConnection.pool_stats)
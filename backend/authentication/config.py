@@ -8,4 +8,5 @@ MONGODB_DB_NAME = os.getenv('MONGODB_DB_NAME', 'solarpredict')
 USERS_COLLECTION = 'users'
 PREDICTIONS_COLLECTION = 'predictions'
 TOKENS_COLLECTION = 'tokens'
-HISTORY_COLLECTION = 'historical data'
\ No newline at end of file
+HISTORY_COLLECTION = 'historical data'
+ROLLUPS_COLLECTION = 'prediction_rollups'
\ No newline at end of file
@@ -1,9 +1,15 @@
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken
 from rest_framework_simplejwt.settings import api_settings
+from .metrics import timed
 from .models import User
+from .user_cache import get_user_cache
 
 class CustomJWTAuthentication(JWTAuthentication):
+    def authenticate(self, request):
+        with timed('auth'):
+            return super().authenticate(request)
+
     def get_user_id_claim(self):
         return api_settings.USER_ID_CLAIM
 
@@ -13,6 +19,9 @@ class CustomJWTAuthentication(JWTAuthentication):
     def get_user(self, validated_token):
         """
         Attempts to find and return a user using the given validated token.
+
+        Active users are cached per process (see UserCache) so most requests
+        skip the ORM/MongoDB lookup.
         """
         try:
             user_id = validated_token[self.get_user_id_claim()]
@@ -24,6 +33,11 @@ class CustomJWTAuthentication(JWTAuthentication):
             import uuid
             if isinstance(user_id, str):
                 user_id = uuid.UUID(user_id)
+
+            user_cache = get_user_cache()
+            user = user_cache.get(user_id)
+            if user is not None:
+                return user
             
             # First try to get user from Django ORM
             try:
@@ -51,4 +65,5 @@ class CustomJWTAuthentication(JWTAuthentication):
         if not user.is_active:
             raise InvalidToken('User is inactive')
 
+        user_cache.set(user_id, user)
         return user
@@ -0,0 +1,277 @@
+import copy
+import hmac
+import threading
+import time
+from bisect import bisect_left
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse, HttpResponseForbidden, HttpResponseNotFound
+import logging
+
+logger = logging.getLogger(__name__)
+
+# In-process metrics exported in the Prometheus text format on /metrics.
+#
+# Each thread updates its own shard (a dict of label values -> counts), so
+# recording a sample takes no lock; the shards are only summed when /metrics
+# is scraped. Shards of threads that have exited are folded into a retired
+# total at the next scrape, so thread-per-request servers don't accumulate
+# them. Every worker process exports its own series.
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class _ShardedMetric:
+    type = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        # thread ident -> (thread, shard)
+        self._shards = {}
+        # Samples of threads that have exited
+        self._retired = {}
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            ident = threading.get_ident()
+            with self._lock:
+                # Idents are reused once a thread exits: keep the old thread's samples
+                previous = self._shards.get(ident)
+                if previous is not None:
+                    self._merge(self._retired, previous[1])
+                self._shards[ident] = (threading.current_thread(), shard)
+        return shard
+
+    def _merge(self, into, shard):
+        """Add the samples of shard to into"""
+        raise NotImplementedError
+
+    def _snapshots(self):
+        with self._lock:
+            for ident, (thread, shard) in list(self._shards.items()):
+                if not thread.is_alive():
+                    self._merge(self._retired, shard)
+                    del self._shards[ident]
+            shards = [shard for _, shard in self._shards.values()]
+            retired = {labels: copy.copy(value) for labels, value in self._retired.items()}
+        return [retired] + [dict(shard) for shard in shards]
+
+    def _labels(self, values, extra=()):
+        pairs = list(zip(self.labelnames, values)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.type}']
+        lines.extend(self._samples())
+        return lines
+
+
+class Counter(_ShardedMetric):
+    type = 'counter'
+
+    def inc(self, labels=(), amount=1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def _merge(self, into, shard):
+        for labels, value in dict(shard).items():
+            into[labels] = into.get(labels, 0) + value
+
+    def values(self):
+        """Label values -> total, summed over all threads"""
+        totals = {}
+        for snapshot in self._snapshots():
+            for labels, value in snapshot.items():
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def _samples(self):
+        return [f'{self.name}{self._labels(labels)} {value}' for labels, value in sorted(self.values().items())]
+
+
+class Histogram(_ShardedMetric):
+    type = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, labels=()):
+        shard = self._shard()
+        series = shard.get(labels)
+        if series is None:
+            # One count per bucket, then +Inf, then the sum of observed values
+            series = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def _merge(self, into, shard):
+        for labels, series in dict(shard).items():
+            total = into.setdefault(labels, [0] * len(series))
+            for i, value in enumerate(series):
+                total[i] += value
+
+    def values(self):
+        """Label values -> (per-bucket counts including +Inf, sum), summed over all threads"""
+        totals = {}
+        for snapshot in self._snapshots():
+            for labels, series in snapshot.items():
+                total = totals.setdefault(labels, [0] * len(series))
+                for i, value in enumerate(series):
+                    total[i] += value
+        return {labels: (series[:-1], series[-1]) for labels, series in totals.items()}
+
+    def _samples(self):
+        lines = []
+        for labels, (counts, total) in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip([str(bound) for bound in self.buckets] + ['+Inf'], counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{self._labels(labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{self.name}_sum{self._labels(labels)} {total}')
+            lines.append(f'{self.name}_count{self._labels(labels)} {cumulative}')
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    'solar_http_request_duration_seconds', 'HTTP request latency by endpoint', ('endpoint', 'method', 'status')
+)
+STAGE_SECONDS = Histogram(
+    'solar_stage_duration_seconds', 'Time spent in each request stage (auth, parse, features, model, persist)',
+    ('stage',)
+)
+MONGO_COMMAND_SECONDS = Histogram(
+    'solar_mongodb_command_duration_seconds', 'MongoDB command round trip time', ('command',)
+)
+MONGO_COMMAND_FAILURES = Counter(
+    'solar_mongodb_command_failures_total', 'MongoDB commands that returned an error', ('command',)
+)
+MODEL_CALLS = Counter('solar_model_calls_total', 'Model predict calls', ('kind',))
+MODEL_ROWS = Counter('solar_model_rows_total', 'Rows scored by the model', ('kind',))
+
+METRICS = [REQUEST_SECONDS, STAGE_SECONDS, MONGO_COMMAND_SECONDS, MONGO_COMMAND_FAILURES, MODEL_CALLS, MODEL_ROWS]
+
+# name -> callable returning a dict of numbers (or None), exported as untyped
+# samples named solar_<name>_<key>; see register_stats
+_stats_sources = {}
+
+
+def register_stats(name, source):
+    """Export the numeric values of a component's stats() dict on /metrics"""
+    _stats_sources[name] = source
+
+
+def render():
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    for name, source in _stats_sources.items():
+        try:
+            stats = source()
+        except Exception as e:
+            logger.warning(f"Could not collect {name} stats: {e}")
+            continue
+        for key, value in sorted((stats or {}).items()):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                lines.append(f'# TYPE solar_{name}_{key} untyped')
+                lines.append(f'solar_{name}_{key} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+class timed:
+    """Context manager recording the duration of a stage"""
+
+    __slots__ = ('stage', 'started')
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        STAGE_SECONDS.observe(time.perf_counter() - self.started, (self.stage,))
+
+
+class StageClock:
+    """Records consecutive stages of a view: each lap() ends one stage and starts the next"""
+
+    __slots__ = ('_last',)
+
+    def __init__(self):
+        self._last = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        STAGE_SECONDS.observe(now - self._last, (stage,))
+        self._last = now
+
+    def reset(self):
+        """Start the next stage now, without recording the time since the last lap"""
+        self._last = time.perf_counter()
+
+
+class RequestMetricsMiddleware:
+    """Records every request's latency by URL name, method and status code"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SOLAR_METRICS_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _observe(self, request, response, started):
+        match = request.resolver_match
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            (match.view_name if match else 'unmatched', request.method, str(response.status_code))
+        )
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self._observe(request, response, started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self._observe(request, response, started)
+        return response
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint; requires "Bearer <SOLAR_METRICS_TOKEN>" and
+    refuses every scrape while no token is configured
+    """
+    if not settings.SOLAR_METRICS_ENABLED:
+        return HttpResponseNotFound()
+    token = settings.SOLAR_METRICS_TOKEN
+    if not token:
+        return HttpResponseForbidden('Set SOLAR_METRICS_TOKEN to enable /metrics')
+    if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponseForbidden()
+    return HttpResponse(render(), content_type='text/plain; version=0.0.4; charset=utf-8')
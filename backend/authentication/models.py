@@ -1,7 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from .mongodb import get_users_collection
-import bcrypt
+from .password_hashing import get_password_hasher
 import uuid
 from datetime import datetime
 
@@ -28,15 +28,20 @@ class User(models.Model):
         """
         return True
 
-    def set_password(self, raw_password):
-        """Hash and set the password"""
-        salt = bcrypt.gensalt()
-        self.password_hash = bcrypt.hashpw(raw_password.encode('utf-8'), salt).decode('utf-8')
-        self.save()
+    def set_password(self, raw_password, save=True):
+        """
+        Hash and set the password
+
+        Hashing runs on the bounded password hashing pool and raises
+        PasswordHashingBusy if no worker frees up within the queue timeout.
+        """
+        self.password_hash = get_password_hasher().hash_password(raw_password)
+        if save:
+            self.save()
 
     def check_password(self, raw_password):
-        """Check if the provided password is correct"""
-        return bcrypt.checkpw(raw_password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        """Check if the provided password is correct (on the password hashing pool)"""
+        return get_password_hasher().check_password(raw_password, self.password_hash)
 
     def save_to_mongodb(self):
         """Save user data to MongoDB"""
@@ -1,30 +1,116 @@
 import os
-from pymongo import MongoClient
+import threading
 from django.conf import settings
 import logging
-from .config import MONGODB_URI, MONGODB_DB_NAME, USERS_COLLECTION, PREDICTIONS_COLLECTION, TOKENS_COLLECTION, HISTORY_COLLECTION
+from .config import MONGODB_URI, MONGODB_DB_NAME, USERS_COLLECTION, PREDICTIONS_COLLECTION, TOKENS_COLLECTION, HISTORY_COLLECTION, ROLLUPS_COLLECTION
 
 logger = logging.getLogger(__name__)
 
+# Wire compressors in order of preference -> module they need (None: built in)
+COMPRESSOR_MODULES = {'zstd': 'zstandard', 'snappy': 'snappy', 'zlib': None}
+
+
+def available_compressors(names):
+    """
+    Filter a comma-separated compressor list down to the ones whose module is
+    installed, so a missing optional package disables that compressor instead
+    of producing a pymongo warning on every client.
+    """
+    from importlib.util import find_spec
+
+    compressors = []
+    for name in (part.strip() for part in names.split(',')):
+        if not name:
+            continue
+        if name not in COMPRESSOR_MODULES:
+            logger.warning(f"Unknown MongoDB compressor '{name}' ignored")
+            continue
+        module = COMPRESSOR_MODULES[name]
+        if module is None or find_spec(module) is not None:
+            compressors.append(name)
+    return compressors
+
+
+def client_options():
+    """MongoClient keyword arguments for the configured pool size, timeouts and compression"""
+    options = {
+        'maxPoolSize': settings.MONGODB_MAX_POOL_SIZE,
+        'minPoolSize': settings.MONGODB_MIN_POOL_SIZE,
+    }
+    if settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS:
+        options['waitQueueTimeoutMS'] = settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS
+    compressors = available_compressors(settings.MONGODB_COMPRESSORS)
+    if compressors:
+        options['compressors'] = ','.join(compressors)
+    return options
+
+
 class MongoDBConnection:
     _client = None
     _db = None
-    
+    # motor client for async views; it binds to the event loop of its first
+    # operation, so it is only meant for ASGI workers (one loop per process)
+    _async_client = None
+    _async_db = None
+    # Process that created the clients. MongoClient is not fork-safe, so a
+    # pre-fork server's workers each build their own on first use.
+    _pid = None
+    _async_pid = None
+    _pool_metrics = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_pool_metrics(cls):
+        """Connection pool listener shared by this process's sync and async clients"""
+        if cls._pool_metrics is None:
+            from .pool_metrics import PoolMetrics
+            cls._pool_metrics = PoolMetrics(slow_checkout_ms=settings.MONGODB_SLOW_CHECKOUT_MS)
+        return cls._pool_metrics
+
+    @classmethod
+    def event_listeners(cls):
+        """Pool listener, plus the command timing listener when metrics are enabled"""
+        listeners = [cls.get_pool_metrics()]
+        if settings.SOLAR_METRICS_ENABLED:
+            from .pool_metrics import CommandMetrics
+            listeners.append(CommandMetrics())
+        return listeners
+
+    @classmethod
+    def pool_stats(cls):
+        """Checkout wait histogram, pool gauges and failures, or None before the first client"""
+        return cls._pool_metrics.stats() if cls._pool_metrics is not None else None
+
+    @classmethod
+    def _forked(cls, pid):
+        return pid is not None and pid != os.getpid()
+
     @classmethod
     def get_client(cls):
+        if cls._forked(cls._pid):
+            # Inherited from the parent process: drop it (without closing the
+            # parent's sockets) and connect again from this process
+            cls._client = cls._db = None
+            cls._pool_metrics = None
         if cls._client is None:
-            try:
-                cls._client = MongoClient(MONGODB_URI)
-                logger.info("Connected to MongoDB successfully")
-            except Exception as e:
-                logger.error(f"Failed to connect to MongoDB: {e}")
-                raise
+            with cls._lock:
+                if cls._client is None:
+                    try:
+                        # Imported on first use so processes that never touch MongoDB skip pymongo
+                        from pymongo import MongoClient
+                        options = client_options()
+                        cls._client = MongoClient(MONGODB_URI, event_listeners=cls.event_listeners(), **options)
+                        cls._pid = os.getpid()
+                        logger.info(f"Connected to MongoDB successfully ({options})")
+                    except Exception as e:
+                        logger.error(f"Failed to connect to MongoDB: {e}")
+                        raise
         return cls._client
     
     @classmethod
     def get_database(cls):
+        client = cls.get_client()
         if cls._db is None:
-            client = cls.get_client()
             cls._db = client[MONGODB_DB_NAME]
         return cls._db
     
@@ -33,6 +119,34 @@ class MongoDBConnection:
         db = cls.get_database()
         return db[collection_name]
 
+    @classmethod
+    def get_async_client(cls):
+        if cls._forked(cls._async_pid):
+            cls._async_client = cls._async_db = None
+        if cls._async_client is None:
+            try:
+                from motor.motor_asyncio import AsyncIOMotorClient
+                cls._async_client = AsyncIOMotorClient(
+                    MONGODB_URI, event_listeners=cls.event_listeners(), **client_options()
+                )
+                cls._async_pid = os.getpid()
+                logger.info("Created async MongoDB client")
+            except Exception as e:
+                logger.error(f"Failed to create async MongoDB client: {e}")
+                raise
+        return cls._async_client
+
+    @classmethod
+    def get_async_database(cls):
+        client = cls.get_async_client()
+        if cls._async_db is None:
+            cls._async_db = client[MONGODB_DB_NAME]
+        return cls._async_db
+
+    @classmethod
+    def get_async_collection(cls, collection_name):
+        return cls.get_async_database()[collection_name]
+
 # MongoDB collections
 def get_users_collection():
     return MongoDBConnection.get_collection(USERS_COLLECTION)
@@ -45,3 +159,16 @@ def get_predictions_collection():
 
 def get_historical_collection():
     return MongoDBConnection.get_collection(HISTORY_COLLECTION)
+
+def get_rollups_collection():
+    return MongoDBConnection.get_collection(ROLLUPS_COLLECTION)
+
+# Async (motor) collections
+def get_async_predictions_collection():
+    return MongoDBConnection.get_async_collection(PREDICTIONS_COLLECTION)
+
+def get_async_historical_collection():
+    return MongoDBConnection.get_async_collection(HISTORY_COLLECTION)
+
+def get_async_rollups_collection():
+    return MongoDBConnection.get_async_collection(ROLLUPS_COLLECTION)
@@ -0,0 +1,83 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from django.conf import settings
+import bcrypt
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when a password operation waited longer than the queue timeout for a worker"""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a small dedicated thread pool so a burst of logins or
+    registrations is limited to max_workers concurrent hashes (bcrypt releases
+    the GIL, so each one occupies a core) instead of one per request thread,
+    leaving CPU for prediction requests.
+
+    Callers block until their job is done. A job that is still queued after
+    queue_timeout seconds is cancelled and PasswordHashingBusy is raised, so
+    requests fail fast with 503 instead of piling up behind the pool.
+    """
+
+    def __init__(self, max_workers=2, queue_timeout=5.0):
+        self.max_workers = max_workers
+        self.queue_timeout = queue_timeout
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='bcrypt')
+        return self._executor
+
+    def _run(self, fn):
+        future = self._get_executor().submit(fn)
+        try:
+            return future.result(timeout=self.queue_timeout)
+        except FutureTimeoutError:
+            if future.cancel():
+                logger.warning(f"Password hashing queue timeout after {self.queue_timeout}s")
+                raise PasswordHashingBusy('Password hashing is busy, try again shortly')
+            # Already running: the wait was spent hashing, not queueing
+            return future.result()
+
+    def hash_password(self, raw_password):
+        """Return the bcrypt hash of raw_password as a str"""
+        return self._run(
+            lambda: bcrypt.hashpw(raw_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        )
+
+    def check_password(self, raw_password, password_hash):
+        """Check raw_password against a bcrypt hash"""
+        return self._run(
+            lambda: bcrypt.checkpw(raw_password.encode('utf-8'), password_hash.encode('utf-8'))
+        )
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+_hasher = None
+_hasher_lock = threading.Lock()
+
+
+def get_password_hasher():
+    """Return the process-wide password hashing pool."""
+    global _hasher
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                _hasher = PasswordHasher(
+                    max_workers=settings.SOLAR_PASSWORD_HASH_WORKERS,
+                    queue_timeout=settings.SOLAR_PASSWORD_HASH_QUEUE_TIMEOUT,
+                )
+    return _hasher
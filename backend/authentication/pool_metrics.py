@@ -0,0 +1,134 @@
+import threading
+import time
+from pymongo import monitoring
+from .metrics import MONGO_COMMAND_FAILURES, MONGO_COMMAND_SECONDS
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the checkout wait histogram buckets
+CHECKOUT_WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    pymongo connection pool listener that tracks how long requests wait to
+    check a connection out of the pool, how many connections are open and
+    checked out, and checkout failures (e.g. waitQueueTimeoutMS exceeded).
+
+    Checkout started/succeeded events are published synchronously on the
+    requesting thread, so the wait is measured with a thread-local start time.
+    """
+
+    def __init__(self, slow_checkout_ms=100):
+        self.slow_checkout_ms = slow_checkout_ms
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._buckets = [0] * (len(CHECKOUT_WAIT_BUCKETS_MS) + 1)
+        self._counters = {
+            'checkouts': 0,
+            'checkout_failures': 0,
+            'connections_created': 0,
+            'connections_closed': 0,
+            'pools_cleared': 0,
+        }
+        self._failure_reasons = {}
+        self._wait_sum_ms = 0.0
+        self._wait_max_ms = 0.0
+        self._checked_out = 0
+        self._max_pool_size = None
+
+    def _increment(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def pool_created(self, event):
+        self._max_pool_size = event.options.get('maxPoolSize')
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._increment('pools_cleared')
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._increment('connections_created')
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._increment('connections_closed')
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def _waited_ms(self):
+        started = getattr(self._local, 'started', None)
+        self._local.started = None
+        return (time.perf_counter() - started) * 1000 if started is not None else None
+
+    def connection_checked_out(self, event):
+        waited_ms = self._waited_ms()
+        with self._lock:
+            self._counters['checkouts'] += 1
+            self._checked_out += 1
+            if waited_ms is not None:
+                self._wait_sum_ms += waited_ms
+                self._wait_max_ms = max(self._wait_max_ms, waited_ms)
+                for i, bound in enumerate(CHECKOUT_WAIT_BUCKETS_MS):
+                    if waited_ms <= bound:
+                        self._buckets[i] += 1
+                        break
+                else:
+                    self._buckets[-1] += 1
+        if waited_ms is not None and waited_ms >= self.slow_checkout_ms:
+            logger.warning(f"Slow MongoDB connection checkout from {event.address}: {waited_ms:.1f} ms")
+
+    def connection_check_out_failed(self, event):
+        waited_ms = self._waited_ms()
+        with self._lock:
+            self._counters['checkout_failures'] += 1
+            self._failure_reasons[event.reason] = self._failure_reasons.get(event.reason, 0) + 1
+        logger.warning(f"MongoDB connection checkout failed ({event.reason}) after {waited_ms or 0:.1f} ms")
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self._checked_out -= 1
+
+    def stats(self):
+        """Counters, pool gauges and the checkout wait histogram"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['failure_reasons'] = dict(self._failure_reasons)
+            stats['open_connections'] = stats['connections_created'] - stats['connections_closed']
+            stats['checked_out'] = self._checked_out
+            stats['max_pool_size'] = self._max_pool_size
+            stats['checkout_wait_ms'] = {
+                'count': stats['checkouts'],
+                'sum': round(self._wait_sum_ms, 3),
+                'max': round(self._wait_max_ms, 3),
+                # Cumulative counts per upper bound, Prometheus-style
+                'buckets': dict(zip(
+                    [str(bound) for bound in CHECKOUT_WAIT_BUCKETS_MS] + ['+Inf'],
+                    [sum(self._buckets[:i + 1]) for i in range(len(self._buckets))]
+                )),
+            }
+        return stats
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """pymongo command listener feeding the MongoDB command histogram"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_COMMAND_SECONDS.observe(event.duration_micros / 1e6, (event.command_name,))
+
+    def failed(self, event):
+        MONGO_COMMAND_SECONDS.observe(event.duration_micros / 1e6, (event.command_name,))
+        MONGO_COMMAND_FAILURES.inc((event.command_name,))
@@ -0,0 +1,131 @@
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from django.conf import settings
+from .mongodb import get_tokens_collection, get_users_collection
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationList:
+    """
+    In-process set of deactivated user IDs and revoked access token IDs
+    (jti), so a token can be checked without a database round trip.
+
+    The sets are loaded from the database on first use and reloaded by a
+    background thread every refresh_interval seconds. Deactivations and
+    logouts handled by this process are applied immediately; those made by
+    other processes are seen after the next refresh. If a refresh fails the
+    previous sets are kept.
+    """
+
+    def __init__(self, refresh_interval=30.0):
+        self.refresh_interval = refresh_interval
+        self._inactive_users = frozenset()
+        self._revoked_tokens = frozenset()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self.last_refresh = None
+
+    def _load_inactive_users(self):
+        from .models import User
+
+        inactive = {str(user_id) for user_id in User.objects.filter(is_active=False).values_list('id', flat=True)}
+        inactive.update(str(doc['_id']) for doc in get_users_collection().find({'is_active': False}, {'_id': 1}))
+        return inactive
+
+    def _load_revoked_tokens(self):
+        cursor = get_tokens_collection().find(
+            {'type': 'revoked_access', 'expires_at': {'$gt': datetime.now(timezone.utc)}},
+            {'_id': 1}
+        )
+        return {doc['_id'] for doc in cursor}
+
+    def refresh(self):
+        """Reload both sets from the database"""
+        try:
+            inactive = self._load_inactive_users()
+            revoked = self._load_revoked_tokens()
+        except Exception as e:
+            logger.error(f"Failed to refresh token revocation list: {e}")
+            return False
+        with self._lock:
+            self._inactive_users = frozenset(inactive)
+            self._revoked_tokens = frozenset(revoked)
+        self.last_refresh = time.time()
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_interval):
+            self.refresh()
+
+    def _ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            if self.refresh_interval > 0:
+                self._thread = threading.Thread(target=self._run, name='token-revocation-refresh', daemon=True)
+                self._thread.start()
+        self.refresh()
+
+    def stop(self):
+        self._stop.set()
+
+    def is_revoked(self, user_id, jti):
+        """True if the user is deactivated or the token has been revoked"""
+        self._ensure_started()
+        return str(user_id) in self._inactive_users or jti in self._revoked_tokens
+
+    def add_inactive_user(self, user_id):
+        with self._lock:
+            self._inactive_users = self._inactive_users | {str(user_id)}
+
+    def remove_inactive_user(self, user_id):
+        with self._lock:
+            self._inactive_users = self._inactive_users - {str(user_id)}
+
+    def revoke_token(self, token):
+        """
+        Revoke an access token until it expires: recorded in the tokens
+        collection for other processes and applied locally right away.
+        """
+        jti = token['jti']
+        expires_at = datetime.fromtimestamp(token['exp'], tz=timezone.utc)
+        get_tokens_collection().update_one(
+            {'_id': jti},
+            {'$set': {'type': 'revoked_access', 'user_id': str(token['user_id']), 'expires_at': expires_at}},
+            upsert=True
+        )
+        with self._lock:
+            self._revoked_tokens = self._revoked_tokens | {jti}
+
+
+_revocation_list = None
+_revocation_list_lock = threading.Lock()
+
+
+def get_revocation_list():
+    """Return the process-wide token revocation list."""
+    global _revocation_list
+    if _revocation_list is None:
+        with _revocation_list_lock:
+            if _revocation_list is None:
+                _revocation_list = RevocationList(refresh_interval=settings.SOLAR_REVOCATION_REFRESH_INTERVAL)
+    return _revocation_list
+
+
+def track_user_activation(sender, instance, **kwargs):
+    """post_save receiver: apply (de)activations made in this process immediately"""
+    revocation_list = get_revocation_list()
+    if instance.is_active:
+        revocation_list.remove_inactive_user(instance.pk)
+    else:
+        revocation_list.add_inactive_user(instance.pk)
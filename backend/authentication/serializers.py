@@ -18,11 +18,12 @@ class UserRegistrationSerializer(serializers.Serializer):
         return value
 
     def create(self, validated_data):
-        user = User.objects.create(
+        # Hash before inserting so a busy hashing pool doesn't leave a user without a password
+        user = User(
             email=validated_data['email'],
             name=validated_data['name']
         )
-        user.set_password(validated_data['password'])
+        user.set_password(validated_data['password'], save=False)
         user.save()
         user.save_to_mongodb()
         return user
@@ -1,3 +1,216 @@
-from django.test import TestCase
+import threading
+import uuid
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIRequestFactory
+
+from .password_hashing import PasswordHasher, PasswordHashingBusy
+from .revocation import RevocationList
+from .user_cache import UserCache
+
+
+class UserCacheTests(SimpleTestCase):
+    def test_lru_eviction_and_hit_rate(self):
+        cache = UserCache(max_size=2, ttl=60)
+        cache.set('a', 'user-a')
+        cache.set('b', 'user-b')
+        self.assertEqual(cache.get('a'), 'user-a')
+        cache.set('c', 'user-c')  # evicts 'b', the least recently used
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 'user-c')
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions']), (2, 1, 1))
+        self.assertAlmostEqual(stats['hit_rate'], 2 / 3, places=3)
+
+    def test_entries_expire_and_can_be_invalidated(self):
+        cache = UserCache(max_size=10, ttl=5)
+        with mock.patch('authentication.user_cache.time.monotonic', return_value=100.0):
+            cache.set('a', 'user-a')
+            cache.set('b', 'user-b')
+        cache.invalidate('b')
+        with mock.patch('authentication.user_cache.time.monotonic', return_value=106.0):
+            self.assertIsNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats()['expired'], 1)
+        self.assertEqual(cache.stats()['invalidations'], 1)
+
+
+class UserCacheInvalidationTests(TestCase):
+    def test_saving_a_user_drops_it_from_the_cache(self):
+        from .models import User
+        from .user_cache import get_user_cache
+
+        user = User.objects.create(email='cache@example.com', name='Cache', password_hash='x')
+        get_user_cache().set(user.id, user)
+        user.is_active = False
+        user.save()
+        self.assertIsNone(get_user_cache().get(user.id))
+
+
+class PasswordHasherTests(SimpleTestCase):
+    def test_hash_and_check(self):
+        hasher = PasswordHasher(max_workers=1, queue_timeout=5)
+        password_hash = hasher.hash_password('secret123')
+        self.assertTrue(hasher.check_password('secret123', password_hash))
+        self.assertFalse(hasher.check_password('wrong', password_hash))
+        hasher.shutdown()
+
+    def test_queued_job_times_out_when_pool_is_busy(self):
+        hasher = PasswordHasher(max_workers=1, queue_timeout=0.05)
+        release = threading.Event()
+        blocker = hasher._get_executor().submit(release.wait)
+        with self.assertRaises(PasswordHashingBusy):
+            hasher.hash_password('secret123')
+        release.set()
+        blocker.result()
+        hasher.shutdown()
+
+
+class StaticRevocationList(RevocationList):
+    """RevocationList whose "database" is a pair of in-memory sets"""
+
+    def __init__(self, inactive_users=(), revoked_tokens=()):
+        super().__init__(refresh_interval=0)
+        self.stored_inactive = set(inactive_users)
+        self.stored_revoked = set(revoked_tokens)
+
+    def _load_inactive_users(self):
+        return self.stored_inactive
+
+    def _load_revoked_tokens(self):
+        return self.stored_revoked
+
+
+@override_settings(SOLAR_VERIFY_TOKEN_MODE='stateless')
+class StatelessVerifyTokenTests(SimpleTestCase):
+    def setUp(self):
+        from .models import User
+        from .views import tokens_for_user
+
+        self.user = User(id=uuid.uuid4(), email='verify@example.com', name='Verify')
+        self.access = tokens_for_user(self.user).access_token
+
+    def verify(self, revocation_list):
+        from .views import verify_token
+
+        request = APIRequestFactory().get('/api/auth/verify/', HTTP_AUTHORIZATION=f'Bearer {self.access}')
+        with mock.patch('authentication.views.get_revocation_list', return_value=revocation_list):
+            return verify_token(request)
+
+    def test_valid_token_returns_claims(self):
+        response = self.verify(StaticRevocationList())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['user']['email'], 'verify@example.com')
+        self.assertEqual(response.data['claims']['user_id'], str(self.user.id))
+
+    def test_revoked_token_and_inactive_user_are_rejected(self):
+        self.assertEqual(self.verify(StaticRevocationList(revoked_tokens={self.access['jti']})).status_code, 401)
+        self.assertEqual(self.verify(StaticRevocationList(inactive_users={str(self.user.id)})).status_code, 401)
+
+
+class LogoutRevocationTests(SimpleTestCase):
+    def setUp(self):
+        from .models import User
+        from .views import tokens_for_user
+
+        self.user = User(id=uuid.uuid4(), email='logout@example.com', name='Logout')
+        self.access = tokens_for_user(self.user).access_token
+        self.revocation_list = mock.Mock()
+
+    def logout(self):
+        from rest_framework.test import force_authenticate
+        from .views import logout
+
+        request = APIRequestFactory().post('/api/auth/logout/', {}, format='json')
+        force_authenticate(request, user=self.user, token=self.access)
+        with mock.patch('authentication.views.get_revocation_list', return_value=self.revocation_list):
+            return logout(request)
+
+    @override_settings(SOLAR_VERIFY_TOKEN_MODE='database')
+    def test_database_mode_does_not_record_revocations(self):
+        self.assertEqual(self.logout().status_code, 200)
+        self.revocation_list.revoke_token.assert_not_called()
+
+    @override_settings(SOLAR_VERIFY_TOKEN_MODE='stateless')
+    def test_stateless_mode_revokes_and_survives_a_failed_write(self):
+        self.assertEqual(self.logout().status_code, 200)
+        self.revocation_list.revoke_token.assert_called_once_with(self.access)
+
+        self.revocation_list.revoke_token.side_effect = RuntimeError('MongoDB unavailable')
+        self.assertEqual(self.logout().status_code, 200)
+
+
+class PoolMetricsTests(SimpleTestCase):
+    def test_tracks_checkout_wait_and_pool_gauges(self):
+        from types import SimpleNamespace
+        from .pool_metrics import PoolMetrics
+
+        metrics = PoolMetrics(slow_checkout_ms=10_000)
+        event = SimpleNamespace(address=('localhost', 27017), connection_id=1, reason='timeout')
+        metrics.connection_created(event)
+        metrics.connection_check_out_started(event)
+        metrics.connection_checked_out(event)
+        metrics.connection_check_out_started(event)
+        metrics.connection_check_out_failed(event)
+
+        stats = metrics.stats()
+        self.assertEqual((stats['checkouts'], stats['checked_out'], stats['open_connections']), (1, 1, 1))
+        self.assertEqual(stats['failure_reasons'], {'timeout': 1})
+        self.assertEqual(stats['checkout_wait_ms']['buckets']['+Inf'], 1)
+
+        metrics.connection_checked_in(event)
+        self.assertEqual(metrics.stats()['checked_out'], 0)
+
+
+class PrometheusMetricsTests(SimpleTestCase):
+    def test_histogram_merges_thread_shards_into_cumulative_buckets(self):
+        from .metrics import Histogram
+
+        histogram = Histogram('test_seconds', 'Test latency', ('stage',), buckets=(0.01, 0.1))
+        histogram.observe(0.005, ('model',))
+        worker = threading.Thread(target=lambda: [histogram.observe(0.05, ('model',)) for _ in range(2)])
+        worker.start()
+        worker.join()
+        histogram.observe(3, ('model',))
+
+        lines = histogram.render()
+        self.assertIn('# TYPE test_seconds histogram', lines)
+        self.assertIn('test_seconds_bucket{stage="model",le="0.01"} 1', lines)
+        self.assertIn('test_seconds_bucket{stage="model",le="0.1"} 3', lines)
+        self.assertIn('test_seconds_bucket{stage="model",le="+Inf"} 4', lines)
+        self.assertIn('test_seconds_count{stage="model"} 4', lines)
+
+    def test_shards_of_exited_threads_are_folded_into_the_totals(self):
+        from .metrics import Counter, Histogram
+
+        counter = Counter('test_total', 'Test counter', ('kind',))
+        histogram = Histogram('test_seconds', 'Test latency', buckets=(0.5,))
+
+        def request():
+            counter.inc(('single',))
+            histogram.observe(0.25)
+
+        for rounds in range(1, 4):
+            threads = [threading.Thread(target=request) for _ in range(20)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(counter.values(), {('single',): 20 * rounds})
+        self.assertEqual(histogram.values(), {(): ([60, 0], 15.0)})
+        self.assertEqual((len(counter._shards), len(histogram._shards)), (0, 0))
+
+    @override_settings(SOLAR_METRICS_TOKEN='')
+    def test_metrics_endpoint_refuses_scrapes_without_a_configured_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer ').status_code, 403)
+
+    @override_settings(SOLAR_METRICS_TOKEN='scrape-secret')
+    def test_metrics_endpoint_requires_configured_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'# TYPE solar_model_calls_total counter', response.content)
@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class UserCache:
+    """
+    Bounded LRU cache of authenticated users with a per-entry TTL, so
+    CustomJWTAuthentication doesn't query the database on every request.
+
+    Entries are dropped on save/delete of the user (password change,
+    deactivation) and on logout. The cache is per process: changes made by
+    another worker, or directly in MongoDB, are picked up once the entry's
+    ttl seconds have passed.
+    """
+
+    def __init__(self, max_size=1024, ttl=60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0, 'invalidations': 0}
+
+    @property
+    def enabled(self):
+        return self.max_size > 0 and self.ttl > 0
+
+    def get(self, user_id):
+        """Return the cached user, or None on a miss or expired entry"""
+        key = str(user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            user, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._stats['expired'] += 1
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return user
+
+    def set(self, user_id, user):
+        if not self.enabled:
+            return
+        key = str(user_id)
+        with self._lock:
+            self._entries[key] = (user, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def invalidate(self, user_id):
+        with self._lock:
+            if self._entries.pop(str(user_id), None) is not None:
+                self._stats['invalidations'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Counters, current size and hit rate (hits / lookups)"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_user_cache = None
+_user_cache_lock = threading.Lock()
+
+
+def get_user_cache():
+    """Return the process-wide authenticated-user cache."""
+    global _user_cache
+    if _user_cache is None:
+        with _user_cache_lock:
+            if _user_cache is None:
+                _user_cache = UserCache(
+                    max_size=settings.SOLAR_AUTH_USER_CACHE_SIZE,
+                    ttl=settings.SOLAR_AUTH_USER_CACHE_TTL,
+                )
+    return _user_cache
+
+
+def invalidate_cached_user(sender, instance, **kwargs):
+    """post_save/post_delete receiver: drop the user so the next request reloads it"""
+    get_user_cache().invalidate(instance.pk)
@@ -1,15 +1,29 @@
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
 from .models import User
+from .password_hashing import PasswordHashingBusy
 from .serializers import UserRegistrationSerializer, UserLoginSerializer, UserSerializer
+from .revocation import get_revocation_list
+from .user_cache import get_user_cache
+from django.conf import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+def tokens_for_user(user):
+    """
+    Refresh token for a user, with email and name as claims so they are
+    copied into its access tokens and can be returned by stateless verification
+    """
+    refresh = RefreshToken.for_user(user)
+    refresh['email'] = user.email
+    refresh['name'] = user.name
+    return refresh
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def register(request):
@@ -20,7 +34,7 @@ def register(request):
             user = serializer.save()
             
             # Generate JWT tokens
-            refresh = RefreshToken.for_user(user)
+            refresh = tokens_for_user(user)
             access_token = refresh.access_token
             
             return Response({
@@ -33,6 +47,10 @@ def register(request):
             }, status=status.HTTP_201_CREATED)
         else:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    except PasswordHashingBusy:
+        return Response({
+            'error': 'Server busy, please retry'
+        }, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '1'})
     except Exception as e:
         logger.error(f"Registration error: {e}")
         return Response({
@@ -68,7 +86,7 @@ def login(request):
                     }, status=status.HTTP_401_UNAUTHORIZED)
                 
                 # Generate JWT tokens
-                refresh = RefreshToken.for_user(user)
+                refresh = tokens_for_user(user)
                 access_token = refresh.access_token
                 
                 return Response({
@@ -85,6 +103,10 @@ def login(request):
                 }, status=status.HTTP_401_UNAUTHORIZED)
         else:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    except PasswordHashingBusy:
+        return Response({
+            'error': 'Server busy, please retry'
+        }, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '1'})
     except Exception as e:
         logger.error(f"Login error: {e}")
         return Response({
@@ -127,9 +149,16 @@ def user_profile(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 @api_view(['GET'])
+@authentication_classes([])  # the token is checked below; don't also resolve request.user
 @permission_classes([AllowAny])
 def verify_token(request):
-    """Verify if token is valid (public endpoint)"""
+    """
+    Verify if token is valid (public endpoint)
+
+    With SOLAR_VERIFY_TOKEN_MODE = 'stateless' only the signature, expiry and
+    the in-process revocation list are checked, and the user is built from
+    the token's claims without any database lookup.
+    """
     try:
         auth_header = request.headers.get('Authorization')
         if not auth_header or not auth_header.startswith('Bearer '):
@@ -137,6 +166,27 @@ def verify_token(request):
         
         token = auth_header.split(' ')[1]
         from rest_framework_simplejwt.tokens import AccessToken
+
+        if settings.SOLAR_VERIFY_TOKEN_MODE == 'stateless':
+            try:
+                access_token = AccessToken(token)
+                user_id = access_token['user_id']
+                if get_revocation_list().is_revoked(user_id, access_token.get('jti')):
+                    return Response({'valid': False}, status=status.HTTP_401_UNAUTHORIZED)
+            except Exception as e:
+                logger.info(f"Stateless token verification failed: {e}")
+                return Response({'valid': False}, status=status.HTTP_401_UNAUTHORIZED)
+
+            return Response({
+                'valid': True,
+                'user': {
+                    'id': user_id,
+                    'email': access_token.get('email'),
+                    'name': access_token.get('name'),
+                    'is_active': True
+                },
+                'claims': access_token.payload
+            }, status=status.HTTP_200_OK)
         
         try:
             # Try to decode the token
@@ -187,8 +237,22 @@ def verify_token(request):
 
 @api_view(['POST'])
 def logout(request):
-    """User logout endpoint"""
+    """
+    User logout endpoint
+
+    With SOLAR_VERIFY_TOKEN_MODE = 'stateless' the access token is also added
+    to the revocation list. Only stateless /verify/ consults that list: the
+    token keeps authenticating other endpoints until it expires.
+    """
     try:
+        get_user_cache().invalidate(request.user.id)
+        if request.auth is not None and settings.SOLAR_VERIFY_TOKEN_MODE == 'stateless':
+            try:
+                get_revocation_list().revoke_token(request.auth)
+            except Exception as e:
+                # The refresh token is still blacklisted below
+                logger.error(f"Failed to revoke access token on logout: {e}")
+
         refresh_token = request.data.get('refresh')
         if refresh_token:
             token = RefreshToken(refresh_token)
@@ -47,6 +47,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'authentication.metrics.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -190,3 +191,113 @@ CORS_ALLOW_HEADERS = [
 SECRET_KEY = config('SECRET_KEY', default=SECRET_KEY)
 DEBUG = config('DEBUG', default=True, cast=bool)
 ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='localhost,127.0.0.1', cast=lambda v: [s.strip() for s in v.split(',')])
+
+# Solar Prediction Settings
+SOLAR_BATCH_MAX_ROWS = config('SOLAR_BATCH_MAX_ROWS', default=10000, cast=int)
+# 'sklearn' calls the fitted Pipeline directly, 'compiled' evaluates the
+# boosted trees from flattened NumPy node arrays (see dashboard/compiled_model.py)
+SOLAR_INFERENCE_BACKEND = config('SOLAR_INFERENCE_BACKEND', default='sklearn')
+SOLAR_COMPILED_BATCH_THRESHOLD = config('SOLAR_COMPILED_BATCH_THRESHOLD', default=16, cast=int)
+# Build single-prediction features directly into a NumPy buffer instead of a DataFrame
+SOLAR_FAST_FEATURIZER = config('SOLAR_FAST_FEATURIZER', default=True, cast=bool)
+SOLAR_MODEL_PATH = config('SOLAR_MODEL_PATH', default=str(BASE_DIR / 'models' / 'solar_power_model.pkl'))
+# Seconds between checks of the model file for a new version (0 disables hot reload)
+SOLAR_MODEL_RELOAD_INTERVAL = config('SOLAR_MODEL_RELOAD_INTERVAL', default=30, cast=int)
+# Number of loaded model versions kept so requests can pin one with model_version
+SOLAR_MODEL_MAX_VERSIONS = config('SOLAR_MODEL_MAX_VERSIONS', default=2, cast=int)
+# Load model arrays read-only memory-mapped so workers share them via the page cache
+# (effective for artifacts written by `manage.py export_compiled_model`). Roll out
+# new files by renaming them over the old one, never by overwriting it in place:
+# mapped arrays would change under live workers (garbage predictions or SIGBUS).
+SOLAR_MODEL_MMAP = config('SOLAR_MODEL_MMAP', default=True, cast=bool)
+# Load the model when Django starts instead of on the first prediction request
+SOLAR_MODEL_WARMUP = config('SOLAR_MODEL_WARMUP', default=False, cast=bool)
+
+# Queue prediction documents and insert them in batches from a background thread.
+# Off by default: a queued prediction is not visible to user-latest-prediction,
+# user-stats or delete until its batch is flushed (up to the flush interval),
+# and the frontend reads those right after predicting.
+SOLAR_PREDICTION_WRITE_BEHIND = config('SOLAR_PREDICTION_WRITE_BEHIND', default=False, cast=bool)
+SOLAR_WRITE_BEHIND_BATCH_SIZE = config('SOLAR_WRITE_BEHIND_BATCH_SIZE', default=500, cast=int)
+SOLAR_WRITE_BEHIND_FLUSH_INTERVAL = config('SOLAR_WRITE_BEHIND_FLUSH_INTERVAL', default=0.25, cast=float)
+SOLAR_WRITE_BEHIND_MAX_PENDING = config('SOLAR_WRITE_BEHIND_MAX_PENDING', default=10000, cast=int)
+SOLAR_WRITE_BEHIND_ENQUEUE_TIMEOUT = config('SOLAR_WRITE_BEHIND_ENQUEUE_TIMEOUT', default=0.05, cast=float)
+
+# MongoDB index check at startup: 'off', 'check' (log missing/unused) or 'create'
+# (also create missing ones). `manage.py ensure_indexes` does the same on demand.
+SOLAR_MONGODB_INDEX_CHECK = config('SOLAR_MONGODB_INDEX_CHECK', default='off')
+# Documents fetched per MongoDB round trip when exporting reports
+SOLAR_EXPORT_BATCH_SIZE = config('SOLAR_EXPORT_BATCH_SIZE', default=1000, cast=int)
+# Aggregate report periods in MongoDB with $dateTrunc (requires MongoDB 5.0+,
+# falls back to client-side aggregation when unsupported)
+SOLAR_EXPORT_SERVER_AGGREGATION = config('SOLAR_EXPORT_SERVER_AGGREGATION', default=True, cast=bool)
+# Per-user prediction rollups: 'off', 'write' (maintain them on every prediction
+# write/delete) or 'read' (also serve stats and exports from them). Run
+# `manage.py rebuild_prediction_rollups` to backfill before switching to 'read'.
+SOLAR_PREDICTION_ROLLUPS = config('SOLAR_PREDICTION_ROLLUPS', default='write')
+
+# Per-process cache of authenticated users (entries; 0 disables) and how long
+# a cached user is trusted before it is reloaded, in seconds
+SOLAR_AUTH_USER_CACHE_SIZE = config('SOLAR_AUTH_USER_CACHE_SIZE', default=1024, cast=int)
+SOLAR_AUTH_USER_CACHE_TTL = config('SOLAR_AUTH_USER_CACHE_TTL', default=60, cast=float)
+# bcrypt runs on a dedicated pool of this many threads; a login/registration
+# still queued after the timeout (seconds) gets a 503 instead of waiting
+SOLAR_PASSWORD_HASH_WORKERS = config('SOLAR_PASSWORD_HASH_WORKERS', default=2, cast=int)
+SOLAR_PASSWORD_HASH_QUEUE_TIMEOUT = config('SOLAR_PASSWORD_HASH_QUEUE_TIMEOUT', default=5.0, cast=float)
+
+# /api/auth/verify/: 'database' looks the user up on every call, 'stateless'
+# checks signature, expiry and an in-process revocation list reloaded every
+# SOLAR_REVOCATION_REFRESH_INTERVAL seconds (deactivated users, logged-out tokens).
+# Logout only records revocations in 'stateless' mode, and they only affect
+# /verify/: other endpoints accept an access token until it expires.
+SOLAR_VERIFY_TOKEN_MODE = config('SOLAR_VERIFY_TOKEN_MODE', default='database')
+SOLAR_REVOCATION_REFRESH_INTERVAL = config('SOLAR_REVOCATION_REFRESH_INTERVAL', default=30, cast=float)
+
+# Serve user-predictions, user-latest-prediction, user-stats, todays-power and
+# recommendations from async views on the motor driver. Only for ASGI servers
+# (e.g. `uvicorn backend.asgi:application`); under WSGI keep this off.
+SOLAR_ASYNC_VIEWS = config('SOLAR_ASYNC_VIEWS', default=False, cast=bool)
+
+# MongoDB connection pool (per process). waitQueueTimeoutMS bounds how long a
+# request waits for a free connection (0 = wait for the server selection
+# timeout). Compressors are used in order of preference if their package is
+# installed (zstd: zstandard, snappy: python-snappy) and the server supports them.
+MONGODB_MAX_POOL_SIZE = config('MONGODB_MAX_POOL_SIZE', default=100, cast=int)
+MONGODB_MIN_POOL_SIZE = config('MONGODB_MIN_POOL_SIZE', default=0, cast=int)
+MONGODB_WAIT_QUEUE_TIMEOUT_MS = config('MONGODB_WAIT_QUEUE_TIMEOUT_MS', default=2000, cast=int)
+MONGODB_COMPRESSORS = config('MONGODB_COMPRESSORS', default='zstd,snappy,zlib')
+# Connection checkouts slower than this (ms) are logged as warnings
+MONGODB_SLOW_CHECKOUT_MS = config('MONGODB_SLOW_CHECKOUT_MS', default=100, cast=int)
+
+# Cache used for dashboard responses (ETag / 304 support). Defaults to
+# per-process memory; point CACHE_BACKEND/CACHE_LOCATION at e.g.
+# django.core.cache.backends.redis.RedisCache + redis://host:6379/0 or
+# django.core.cache.backends.filebased.FileBasedCache + /var/tmp/solarpredict
+# to share it between workers.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='solarpredict'),
+    }
+}
+# Seconds a cached response is kept (its key already changes with the data)
+SOLAR_RESPONSE_CACHE_TTL = config('SOLAR_RESPONSE_CACHE_TTL', default=300, cast=int)
+# Largest what-if sweep (product of all grid sizes) scored in one request
+SOLAR_SWEEP_MAX_POINTS = config('SOLAR_SWEEP_MAX_POINTS', default=10000, cast=int)
+# Cached model-searched tilt/azimuth results for recommendations (0 disables caching)
+SOLAR_ORIENTATION_CACHE_SIZE = config('SOLAR_ORIENTATION_CACHE_SIZE', default=2048, cast=int)
+# Memoized single predictions (predict/), keyed by model version + inputs.
+# QUANTA rounds inputs before lookup, e.g. 'ghi=10,dni=10,temperature=0.5';
+# SHARED names a CACHES alias to share entries between workers ('' = per process)
+SOLAR_PREDICTION_CACHE_SIZE = config('SOLAR_PREDICTION_CACHE_SIZE', default=4096, cast=int)
+SOLAR_PREDICTION_CACHE_TTL = config('SOLAR_PREDICTION_CACHE_TTL', default=300, cast=float)
+SOLAR_PREDICTION_CACHE_QUANTA = config(
+    'SOLAR_PREDICTION_CACHE_QUANTA', default='',
+    cast=lambda v: {k.strip(): float(step) for k, step in (item.split('=') for item in v.split(',') if item.strip())}
+)
+SOLAR_PREDICTION_CACHE_SHARED = config('SOLAR_PREDICTION_CACHE_SHARED', default='')
+# In-process Prometheus metrics on /metrics (request/stage/MongoDB latency,
+# model calls, cache and pool stats). Scrapes must send
+# "Authorization: Bearer <token>"; without a token the endpoint refuses them.
+SOLAR_METRICS_ENABLED = config('SOLAR_METRICS_ENABLED', default=True, cast=bool)
+SOLAR_METRICS_TOKEN = config('SOLAR_METRICS_TOKEN', default='')
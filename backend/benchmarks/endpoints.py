@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Endpoint benchmark: latency percentiles and throughput of every route in
+authentication/urls.py and dashboard/urls.py (plus /metrics), measured
+in-process with Django's test client so no server, network or Atlas
+cluster is involved.
+
+MongoDB is replaced by mongomock by default, or by a local mongod with
+--mongo-uri (the --mongo-db database must be empty and is dropped
+afterwards). The ORM uses a throwaway test database. Before measuring, the
+run seeds one user with --predictions predictions spread over the past
+year, their rollups, and --history-days days of hourly historical readings
+for each city. Inputs are drawn from a fixed --seed, so runs are
+comparable across commits.
+
+mongomock evaluates queries in Python without indexes, so Mongo-bound
+endpoints are slower than against a real server; compare mongomock runs
+with mongomock runs.
+
+Each endpoint gets --warmup untimed requests and then --iterations timed
+ones (--auth-iterations for register and login, which hash a bcrypt
+password). The settings the results depend on are recorded with them.
+
+Usage:
+    python benchmarks/endpoints.py [--iterations 100] [--warmup 10] [--auth-iterations 10]
+                                   [--predictions 2000] [--history-days 30] [--seed 0]
+                                   [--only predict,info] [--mongo-uri mongodb://localhost:27017]
+                                   [--output endpoints.json]
+
+Results are printed as JSON so they can be compared across commits.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+from benchmarks.login import percentiles  # noqa: E402
+
+CITIES = ['Ahmedabad', 'Surat', 'Vadodara', 'Rajkot', 'Gandhinagar']
+CLOUD_TYPES = ['Fluffy white clouds', 'Mid-level clouds', 'Thin high clouds', 'Thick low clouds']
+PASSWORD = 'bench-password-123'
+
+# Settings recorded alongside the results
+RECORDED_SETTINGS = [
+    'SOLAR_INFERENCE_BACKEND', 'SOLAR_FAST_FEATURIZER', 'SOLAR_PREDICTION_WRITE_BEHIND',
+    'SOLAR_PREDICTION_ROLLUPS', 'SOLAR_PREDICTION_CACHE_SIZE', 'SOLAR_AUTH_USER_CACHE_SIZE',
+    'SOLAR_VERIFY_TOKEN_MODE', 'SOLAR_ASYNC_VIEWS', 'SOLAR_METRICS_ENABLED',
+    'SOLAR_PASSWORD_HASH_WORKERS',
+]
+
+
+def random_params(rng):
+    """One realistic set of predict/ parameters"""
+    return {
+        'panel_area': round(rng.uniform(5, 80), 2),
+        'tilt': round(rng.uniform(0, 60), 1),
+        'azimuth': round(rng.uniform(90, 270), 1),
+        'ghi': round(rng.uniform(0, 1000), 1),
+        'dni': round(rng.uniform(0, 900), 1),
+        'temperature': round(rng.uniform(15, 45), 1),
+        'humidity': round(rng.uniform(10, 95), 1),
+        'wind_speed': round(rng.uniform(0, 12), 2),
+        'cloud_cover': rng.choice(CLOUD_TYPES),
+    }
+
+
+def prediction_document(rng, user_id, created_at):
+    """A document shaped like the ones PredictionModel.create_prediction stores"""
+    params = random_params(rng)
+    return {
+        'user_id': user_id,
+        'input_data': {
+            'location': rng.choice(CITIES), 'humidity': params['humidity'],
+            'temperature': params['temperature'], 'date': created_at.strftime('%Y-%m-%d'),
+            'time': created_at.strftime('%H:%M'), 'solarIrradiance': params['ghi'],
+            'windSpeed': params['wind_speed'], 'cloudCover': params['cloud_cover'],
+            'panelArea': params['panel_area'], 'tilt': params['tilt'], 'azimuth': params['azimuth'],
+        },
+        'prediction': {
+            'predicted_power_generated': round(rng.uniform(0, 15), 3),
+            'input_parameters': params,
+            'model_info': {'model_type': 'Pipeline', 'prediction_units': 'kW'},
+        },
+        'created_at': created_at,
+        'updated_at': created_at,
+    }
+
+
+def seed(rng, user_id, predictions, history_days):
+    """Seed predictions (with rollups) and historical readings; returns the prediction ids"""
+    from authentication.mongodb import get_historical_collection, get_predictions_collection
+    from dashboard import rollups
+
+    now = datetime.utcnow()
+    docs = [
+        prediction_document(rng, user_id, now - timedelta(seconds=rng.uniform(0, 365 * 86400)))
+        for _ in range(predictions)
+    ]
+    prediction_ids = get_predictions_collection().insert_many(docs).inserted_ids if docs else []
+    if rollups.rollups_maintained():
+        rollups.rebuild(user_id)
+
+    today = datetime(now.year, now.month, now.day)
+    readings = []
+    for day in range(history_days):
+        for city in CITIES:
+            for hour in range(24):
+                daylight = max(0.0, 1 - abs(hour - 12) / 6)
+                readings.append({
+                    'City': city, 'Date': today - timedelta(days=day), 'Time': f'{hour:02d}:00',
+                    'Panel area (m^2)': 10.19, 'Tilt (deg)': 27.2, 'Azimuth (deg)': 190.8,
+                    'GHI (W/m^2)': round(950 * daylight, 1), 'DNI (W/m^2)': round(800 * daylight, 1),
+                    'Temperature (C)': round(rng.uniform(25, 40), 1), 'Humidity (%)': round(rng.uniform(20, 80), 1),
+                    'Wind Speed (m/s)': round(rng.uniform(0, 8), 2), 'Cloud Cover (%)': round(rng.uniform(0, 100), 1),
+                    'Power Generated (kW)': round(8 * daylight * rng.uniform(0.7, 1.0), 3),
+                    'Power Consumed (kW)': round(rng.uniform(0.2, 2), 2),
+                })
+    if readings:
+        get_historical_collection().insert_many(readings)
+    return [str(prediction_id) for prediction_id in prediction_ids]
+
+
+def build_cases(ctx, args):
+    """
+    Endpoint cases, in run order. prepare(i) runs untimed before request i
+    and returns (path, body, headers); body is sent as JSON.
+    """
+    from django.urls import reverse
+    from authentication.views import tokens_for_user
+
+    rng = random.Random(args.seed + 1)
+    auth = {'HTTP_AUTHORIZATION': f"Bearer {ctx['access']}"}
+    fixed_params = random_params(random.Random(args.seed + 2))
+    weather = [
+        {'timestamp': f'2025-03-16T{hour:02d}:00', 'ghi': max(0, 950 - abs(hour - 12) * 150),
+         'dni': max(0, 800 - abs(hour - 12) * 130), 'temperature': 30, 'humidity': 45,
+         'wind_speed': 3, 'cloud_cover': 'Thin high clouds'}
+        for hour in range(24)
+    ]
+
+    def fixed(path, body=None, headers=auth):
+        return lambda i: (path, body, headers)
+
+    def fresh_logout(i):
+        # Logout revokes its access token, so each request needs a new one
+        return reverse('logout'), {}, {'HTTP_AUTHORIZATION': f"Bearer {tokens_for_user(ctx['user']).access_token}"}
+
+    def delete(i):
+        return reverse('delete_prediction', args=[ctx['prediction_ids'].pop()]), None, auth
+
+    return [
+        # authentication/urls.py
+        ('register', 'post', lambda i: (
+            reverse('register'),
+            {'email': f'bench-{args.seed}-{i}-{rng.random():.12f}@example.com', 'name': 'Bench User',
+             'password': PASSWORD, 'confirm_password': PASSWORD},
+            {}
+        ), 201, args.auth_iterations),
+        ('login', 'post', fixed(reverse('login'), {'email': ctx['email'], 'password': PASSWORD}, {}),
+         200, args.auth_iterations),
+        ('refresh', 'post', fixed(reverse('refresh_token'), {'refresh': ctx['refresh']}, {}), 200, None),
+        ('profile', 'get', fixed(reverse('user_profile')), 200, None),
+        ('verify', 'get', fixed(reverse('verify_token')), 200, None),
+        ('logout', 'post', fresh_logout, 200, None),
+        # dashboard/urls.py
+        ('predict', 'post', lambda i: (reverse('predict_solar_power'), random_params(rng), auth), 200, None),
+        ('predict_repeated', 'post', fixed(reverse('predict_solar_power'), fixed_params), 200, None),
+        ('predict_batch_100', 'post', lambda i: (
+            reverse('predict_solar_power_batch'), [random_params(rng) for _ in range(100)], auth
+        ), 200, None),
+        ('forecast_24h', 'post', fixed(
+            reverse('predict_solar_power_forecast'),
+            {'site': {'panel_area': 50, 'tilt': 30, 'azimuth': 180}, 'weather': weather}
+        ), 200, None),
+        ('sweep_475', 'post', fixed(reverse('predict_solar_power_sweep'), {
+            'base': fixed_params,
+            'grid': {'tilt': {'start': 0, 'stop': 90, 'step': 5}, 'azimuth': {'start': 0, 'stop': 360, 'step': 15}},
+        }), 200, None),
+        ('info', 'get', fixed(reverse('get_prediction_info'), headers={}), 200, None),
+        ('user_predictions', 'get', fixed(reverse('get_user_predictions') + '?limit=20'), 200, None),
+        ('user_latest_prediction', 'get', fixed(reverse('get_user_latest_prediction')), 200, None),
+        ('user_stats', 'get', fixed(reverse('get_user_prediction_stats')), 200, None),
+        ('todays_power', 'get', fixed(reverse('get_todays_power_generation') + '?city=Ahmedabad', headers={}),
+         200, None),
+        ('recommendations', 'get', fixed(reverse('get_recommendations')), 200, None),
+        ('export_report_csv', 'export', fixed(reverse('export_report') + '?format=csv&period=monthly'), 200, None),
+        ('test', 'get', fixed(reverse('test_view'), headers={}), 200, None),
+        ('delete_prediction', 'delete', delete, 200, None),
+        ('metrics', 'get', fixed(reverse('metrics'), headers=ctx['metrics_headers']), 200, None),
+    ]
+
+
+def run_case(client, factory, ctx, method, prepare, expected, iterations, warmup):
+    from dashboard.views import export_report
+
+    latencies, statuses = [], {}
+    for i in range(warmup + iterations):
+        path, body, headers = prepare(i)
+        started = time.perf_counter()
+        if method == 'export':
+            # export_report authenticates through request.user rather than the
+            # JWT header, so it is called directly with the user attached
+            request = factory.get(path, **headers)
+            request.user = ctx['user']
+            response = export_report(request)
+        elif body is None:
+            response = getattr(client, method)(path, **headers)
+        else:
+            response = getattr(client, method)(path, data=json.dumps(body), content_type='application/json', **headers)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if i >= warmup:
+            latencies.append(elapsed_ms)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    total_s = sum(latencies) / 1000
+    return {
+        'requests': len(latencies),
+        'status_codes': statuses,
+        'unexpected_status': sum(count for code, count in statuses.items() if code != str(expected)),
+        'latency_ms': percentiles(latencies),
+        'throughput_rps': round(len(latencies) / total_s, 2) if total_s else None,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=100, help='Timed requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=10, help='Untimed requests per endpoint')
+    parser.add_argument('--auth-iterations', type=int, default=10, help='Timed requests for register and login')
+    parser.add_argument('--predictions', type=int, default=2000, help='Seeded predictions for the benchmark user')
+    parser.add_argument('--history-days', type=int, default=30, help='Days of hourly historical data per city')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', help='Comma-separated endpoint names to run')
+    parser.add_argument('--mongo-uri', help='Use this (local) MongoDB instead of mongomock')
+    parser.add_argument('--mongo-db', default='solarpredict_bench', help='Database used with --mongo-uri')
+    parser.add_argument('--output', help='Also write the JSON results to this file')
+    args = parser.parse_args()
+
+    if args.mongo_uri:
+        os.environ['MONGODB_URI'] = args.mongo_uri
+        os.environ['MONGODB_DB_NAME'] = args.mongo_db
+    else:
+        # motor cannot drive mongomock, so the sync read views are measured
+        os.environ['SOLAR_ASYNC_VIEWS'] = 'False'
+    # /metrics refuses scrapes until a token is configured
+    os.environ.setdefault('SOLAR_METRICS_TOKEN', 'bench-metrics-token')
+
+    import django
+    django.setup()
+    from django.conf import settings
+    from django.test import Client, RequestFactory
+    from django.test.utils import setup_databases, setup_test_environment, teardown_databases
+    from authentication.mongodb import MongoDBConnection
+
+    if args.mongo_uri:
+        database = MongoDBConnection.get_database()
+        if database.list_collection_names():
+            parser.error(f'MongoDB database {args.mongo_db!r} is not empty; pick another --mongo-db')
+    else:
+        import mongomock
+        MongoDBConnection._client = mongomock.MongoClient()
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False, aliases={'default'})
+    try:
+        client, factory = Client(), RequestFactory()
+        rng = random.Random(args.seed)
+
+        email = f'bench-owner-{args.seed}@example.com'
+        response = client.post(
+            '/api/auth/register/',
+            data=json.dumps({'email': email, 'name': 'Bench Owner', 'password': PASSWORD, 'confirm_password': PASSWORD}),
+            content_type='application/json'
+        )
+        if response.status_code != 201:
+            raise RuntimeError(f'Could not register the benchmark user: {response.status_code} {response.content[:500]}')
+        from authentication.models import User
+        user = User.objects.get(email=email)
+        tokens = response.json()['tokens']
+
+        seeded_at = time.perf_counter()
+        prediction_ids = seed(rng, str(user.id), args.predictions, args.history_days)
+        seed_s = time.perf_counter() - seeded_at
+
+        ctx = {
+            'user': user, 'email': email, 'access': tokens['access'], 'refresh': tokens['refresh'],
+            'prediction_ids': prediction_ids,
+            'metrics_headers': {'HTTP_AUTHORIZATION': f'Bearer {settings.SOLAR_METRICS_TOKEN}'},
+        }
+        only = set(args.only.split(',')) if args.only else None
+        endpoints = {}
+        for name, method, prepare, expected, iterations in build_cases(ctx, args):
+            if only is not None and name not in only:
+                continue
+            if name == 'delete_prediction':
+                iterations = min(args.iterations, len(prediction_ids) - args.warmup)
+            # Some views print debug output; keep stdout for the JSON results
+            with contextlib.redirect_stdout(sys.stderr):
+                endpoints[name] = run_case(
+                    client, factory, ctx, method, prepare, expected,
+                    args.iterations if iterations is None else iterations, args.warmup
+                )
+
+        from dashboard.write_behind import _writer
+        if _writer is not None:
+            _writer.close()
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        if args.mongo_uri:
+            MongoDBConnection.get_client().drop_database(args.mongo_db)
+
+    results = {
+        'benchmark': 'endpoints',
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'mongodb': 'local' if args.mongo_uri else 'mongomock',
+        'seed': args.seed,
+        'seeded': {
+            'predictions': args.predictions,
+            'historical_readings': args.history_days * len(CITIES) * 24,
+            'seconds': round(seed_s, 2),
+        },
+        'iterations': args.iterations,
+        'warmup': args.warmup,
+        'settings': {name: getattr(settings, name, None) for name in RECORDED_SETTINGS},
+        'endpoints': endpoints,
+    }
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
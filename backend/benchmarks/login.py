@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Login benchmark: throughput and latency of password checks under a burst of
+concurrent logins, and how much that burst slows down predictions served by
+the same process.
+
+Each mode runs --clients threads that check a bcrypt password in a loop for
+--duration seconds while a probe thread times a single-row prediction every
+10 ms:
+
+- inline: bcrypt.checkpw in the request thread (the previous behaviour)
+- pool: the bounded PasswordHasher used by the login/register views
+
+Usage:
+    python benchmarks/login.py [--clients 16] [--duration 5] [--workers 2]
+                               [--queue-timeout 5] [--rounds 12] [--output login.json]
+
+Results are printed as JSON so they can be compared across commits.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+PASSWORD = 'correct horse battery staple'
+
+PROBE_PARAMS = {
+    'city': 0, 'date': '2025-03-15', 'time': '12:00',
+    'panel_area': 50.0, 'tilt': 30.0, 'azimuth': 180.0, 'ghi': 800.0, 'dni': 600.0,
+    'temperature': 30.0, 'humidity': 40.0, 'wind_speed': 3.0, 'power_consumed': 0.0,
+    'cloud_cover': 'Thin high clouds',
+}
+
+
+def percentiles(samples_ms):
+    if not samples_ms:
+        return None
+    ordered = sorted(samples_ms)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 2)
+
+    return {'p50': pick(0.50), 'p95': pick(0.95), 'p99': pick(0.99), 'mean': round(statistics.mean(ordered), 2)}
+
+
+def run_mode(check, clients, duration, probe):
+    login_ms, busy = [], [0]
+    probe_ms = []
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def client():
+        from authentication.password_hashing import PasswordHashingBusy
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                assert check()
+            except PasswordHashingBusy:
+                with lock:
+                    busy[0] += 1
+                continue
+            with lock:
+                login_ms.append((time.perf_counter() - start) * 1000)
+
+    def prober():
+        while not stop.is_set():
+            start = time.perf_counter()
+            probe()
+            probe_ms.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)] + [threading.Thread(target=prober)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'logins': len(login_ms),
+        'logins_per_s': round(len(login_ms) / elapsed, 2),
+        'busy_rejections': busy[0],
+        'login_latency_ms': percentiles(login_ms),
+        'prediction_latency_ms': percentiles(probe_ms),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=16, help='Concurrent login threads')
+    parser.add_argument('--duration', type=float, default=5.0, help='Seconds per mode')
+    parser.add_argument('--workers', type=int, default=2, help='PasswordHasher pool size')
+    parser.add_argument('--queue-timeout', type=float, default=5.0)
+    parser.add_argument('--rounds', type=int, default=12, help='bcrypt cost factor')
+    parser.add_argument('--output', help='Also write the JSON results to this file')
+    args = parser.parse_args()
+
+    import django
+    django.setup()
+    import bcrypt
+    from authentication.password_hashing import PasswordHasher
+    from dashboard.inference import predict_one
+    from dashboard.model_registry import get_model_registry
+
+    password_hash = bcrypt.hashpw(PASSWORD.encode('utf-8'), bcrypt.gensalt(args.rounds)).decode('utf-8')
+    handle = get_model_registry().get_active()
+    probe = lambda: predict_one(handle.predictor, handle.featurizer, PROBE_PARAMS)
+
+    # Baseline prediction latency with no login load
+    baseline = []
+    for _ in range(200):
+        start = time.perf_counter()
+        probe()
+        baseline.append((time.perf_counter() - start) * 1000)
+
+    hasher = PasswordHasher(max_workers=args.workers, queue_timeout=args.queue_timeout)
+    modes = {
+        'inline': lambda: bcrypt.checkpw(PASSWORD.encode('utf-8'), password_hash.encode('utf-8')),
+        'pool': lambda: hasher.check_password(PASSWORD, password_hash),
+    }
+
+    results = {
+        'benchmark': 'login',
+        'clients': args.clients,
+        'duration_s': args.duration,
+        'workers': args.workers,
+        'queue_timeout_s': args.queue_timeout,
+        'bcrypt_rounds': args.rounds,
+        'cpu_count': os.cpu_count(),
+        'idle_prediction_latency_ms': percentiles(baseline),
+        'modes': {name: run_mode(check, args.clients, args.duration, probe) for name, check in modes.items()},
+    }
+    hasher.shutdown()
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
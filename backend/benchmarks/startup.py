@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: measures how long it takes to boot Django and import the
+URL configuration (what every worker and most management commands pay),
+using `python -X importtime` to attribute the time to modules.
+
+Usage:
+    python benchmarks/startup.py [--runs 5] [--top 15] [--warmup] [--output startup.json]
+
+--warmup sets SOLAR_MODEL_WARMUP=True so the model load at boot is included.
+Results are printed as JSON so they can be compared across commits.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BOOT_CODE = (
+    "import django; django.setup(); "
+    "from django.urls import get_resolver; get_resolver().url_patterns"
+)
+
+
+def parse_importtime(stderr):
+    """
+    Parse `-X importtime` output into {module: (self_us, cumulative_us, depth)}.
+    Only the first occurrence of each module is kept.
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            timings, name = line[len('import time:'):].rsplit('|', 1)
+            self_us, cumulative_us = (int(part.strip()) for part in timings.split('|'))
+        except ValueError:
+            continue
+        # The name follows one space, plus two more per level of nesting
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        modules.setdefault(name.strip(), (self_us, cumulative_us, depth))
+    return modules
+
+
+def run_once(warmup):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE='backend.settings', SOLAR_MODEL_WARMUP=str(warmup))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', BOOT_CODE],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Boot failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--warmup', action='store_true', help='Include the model load at boot')
+    parser.add_argument('--output', help='Also write the JSON results to this file')
+    args = parser.parse_args()
+
+    totals = []
+    cumulative = {}
+    for _ in range(args.runs):
+        modules = run_once(args.warmup)
+        # Top-level imports have no indentation; their cumulative times add up to the total
+        totals.append(sum(c for _, c, depth in modules.values() if depth == 0) / 1000)
+        for name, (_, c, depth) in modules.items():
+            cumulative.setdefault(name, []).append(c / 1000)
+
+    heaviest = sorted(
+        ((name, statistics.median(times)) for name, times in cumulative.items()),
+        key=lambda item: item[1], reverse=True
+    )[:args.top]
+
+    results = {
+        'benchmark': 'startup',
+        'warmup': args.warmup,
+        'runs': args.runs,
+        'python': sys.version.split()[0],
+        'import_ms': {
+            'median': round(statistics.median(totals), 1),
+            'min': round(min(totals), 1),
+            'max': round(max(totals), 1),
+        },
+        'heaviest_modules_ms': {name: round(ms, 1) for name, ms in heaviest},
+        'loaded': {
+            name: name in cumulative
+            for name in ('pandas', 'sklearn', 'reportlab', 'pymongo', 'joblib')
+        },
+    }
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,34 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class DashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dashboard'
+
+    def ready(self):
+        # Cache and write-behind counters on /metrics
+        from authentication.metrics import register_stats
+        from . import write_behind
+        from .orientation import get_orientation_cache
+        from .prediction_cache import get_prediction_cache
+        register_stats('prediction_cache', lambda: get_prediction_cache().stats())
+        register_stats('orientation_cache', lambda: get_orientation_cache().stats())
+        register_stats('write_behind', lambda: write_behind._writer.stats() if write_behind._writer else None)
+
+        # The model is otherwise loaded on the first prediction request. Serving
+        # processes can opt into loading it at boot so that request doesn't pay for it.
+        if settings.SOLAR_MODEL_WARMUP:
+            from .model_registry import get_model_registry
+            get_model_registry().get_active()
+
+        # Index check runs in the background so an unreachable database doesn't delay startup
+        if settings.SOLAR_MONGODB_INDEX_CHECK in ('check', 'create'):
+            import threading
+            from .indexes import check_indexes
+            threading.Thread(
+                target=check_indexes,
+                kwargs={'create': settings.SOLAR_MONGODB_INDEX_CHECK == 'create'},
+                name='mongodb-index-check',
+                daemon=True,
+            ).start()
@@ -0,0 +1,143 @@
+import functools
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework import exceptions
+from authentication.jwt_auth import CustomJWTAuthentication
+from authentication.mongodb import get_async_historical_collection, get_async_predictions_collection
+from authentication.user_cache import get_user_cache
+from .http_cache import aget_or_build, cache_key, conditional_json_response
+from .models import AsyncPredictionModel
+from .recommendations import build_recommendations
+from .views import HISTORY_PROJECTION, format_history, history_query, latest_dates_pipeline
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Async versions of the MongoDB-backed read endpoints, routed instead of the
+# DRF views when SOLAR_ASYNC_VIEWS is set (see urls.py). They await motor
+# instead of blocking a thread on pymongo, so one ASGI worker can serve many
+# concurrent dashboard polls. Responses match the sync views.
+
+_authenticator = CustomJWTAuthentication()
+
+
+def async_authenticated(view):
+    """
+    JWT authentication for async views, equivalent to the DRF
+    IsAuthenticated + CustomJWTAuthentication pair. Token validation and
+    cached users are handled on the event loop; only a user cache miss goes
+    to a thread for the ORM/MongoDB lookup.
+    """
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            header = _authenticator.get_header(request)
+            raw_token = _authenticator.get_raw_token(header) if header is not None else None
+            if raw_token is None:
+                raise exceptions.NotAuthenticated()
+            validated_token = _authenticator.get_validated_token(raw_token)
+            user = get_user_cache().get(validated_token.get(_authenticator.get_user_id_claim()))
+            if user is None:
+                user = await sync_to_async(_authenticator.get_user)(validated_token)
+        except exceptions.APIException as e:
+            detail = e.detail if isinstance(e.detail, dict) else {'detail': e.detail}
+            return JsonResponse(detail, status=e.status_code)
+        request.user, request.auth = user, validated_token
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+@require_GET
+@async_authenticated
+async def get_user_predictions(request):
+    """Async get_user_predictions (same ?limit, ?cursor and ?skip parameters)"""
+    user_id = str(request.user.id)
+    try:
+        limit = int(request.GET.get('limit', 10))
+        skip = int(request.GET.get('skip', 0))
+        try:
+            page = await AsyncPredictionModel.get_user_predictions_page(
+                user_id, limit=limit, skip=skip, cursor=request.GET.get('cursor')
+            )
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        predictions = page['predictions']
+
+        return JsonResponse({
+            'predictions': predictions,
+            'count': len(predictions),
+            'next_cursor': page['next_cursor'],
+            'user_id': user_id
+        })
+
+    except Exception as e:
+        logger.error(f"Error getting predictions for user {user_id}: {e}")
+        return JsonResponse({'error': 'Failed to retrieve predictions'}, status=500)
+
+
+@require_GET
+@async_authenticated
+async def get_user_latest_prediction(request):
+    """Async get_user_latest_prediction"""
+    user_id = str(request.user.id)
+    try:
+        prediction = await AsyncPredictionModel.get_user_latest_prediction(user_id)
+        if prediction:
+            return JsonResponse(prediction)
+        return JsonResponse({'message': 'No predictions found for this user'}, status=404)
+
+    except Exception as e:
+        logger.error(f"Error getting latest prediction for user {user_id}: {e}")
+        return JsonResponse({'error': 'Failed to retrieve latest prediction'}, status=500)
+
+
+@require_GET
+@async_authenticated
+async def get_user_prediction_stats(request):
+    """Async get_user_prediction_stats"""
+    user_id = str(request.user.id)
+    try:
+        stats = await AsyncPredictionModel.get_user_prediction_stats(user_id)
+        return JsonResponse({'user_id': user_id, 'stats': stats})
+
+    except Exception as e:
+        logger.error(f"Error getting prediction stats for user {user_id}: {e}")
+        return JsonResponse({'error': 'Failed to retrieve prediction statistics'}, status=500)
+
+
+@require_GET
+async def get_todays_power_generation(request):
+    """Async get_todays_power_generation (public, like the sync view)"""
+    try:
+        collection = get_async_historical_collection()
+        city = request.GET.get('city')
+        latest_dates = [
+            doc['_id'] async for doc in collection.aggregate(latest_dates_pipeline(city)) if doc['_id']
+        ]
+        if not latest_dates:
+            return JsonResponse({'data': []})
+        query = history_query(city, latest_dates)
+        key = cache_key('todays-power', city, latest_dates, await collection.count_documents(query))
+
+        async def build_history():
+            cursor = collection.find(query, projection=HISTORY_PROJECTION).sort([('Date', 1), ('Time', 1)])
+            return {'data': [format_history(doc) async for doc in cursor]}
+
+        data, etag = await aget_or_build(key, build_history, settings.SOLAR_RESPONSE_CACHE_TTL)
+        return conditional_json_response(request, data, etag)
+
+    except Exception as e:
+        logger.error(f"Error fetching today's power generation: {e}")
+        return JsonResponse({'error': 'Failed to fetch today\'s power generation'}, status=500)
+
+
+@require_GET
+@async_authenticated
+async def get_recommendations(request):
+    """Async get_recommendations"""
+    user_id = str(request.user.id)
+    latest = await get_async_predictions_collection().find_one({'user_id': user_id}, sort=[('created_at', -1)])
+    # An uncached tilt/azimuth search runs the model, so keep it off the event loop
+    return JsonResponse({'recommendations': await sync_to_async(build_recommendations)(latest)})
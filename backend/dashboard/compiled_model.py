@@ -0,0 +1,232 @@
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Marker stored in exported artifacts so loaders can tell them from plain pipelines
+COMPILED_FORMAT = 'solar-compiled-trees-v1'
+
+ENSEMBLE_ARRAYS = ('feature', 'threshold', 'children', 'value', 'roots')
+
+
+class CompiledTreeEnsemble:
+    """
+    Flattened, vectorized evaluator for a fitted GradientBoostingRegressor.
+
+    All trees are packed into contiguous node arrays (feature, threshold,
+    children, value) with global node indices. Leaves point back to
+    themselves, so a batch is evaluated by stepping every (row, tree) pair
+    down one level per iteration for max_depth iterations, instead of
+    dispatching each tree from Python.
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, max_depth, base):
+        self.feature = feature
+        self.threshold = threshold
+        # children[2 * node] is the right child, children[2 * node + 1] the left one
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.base = base
+
+    @classmethod
+    def from_estimator(cls, estimator):
+        """
+        Build the flat node arrays from a fitted single-output GradientBoostingRegressor.
+
+        Raises:
+            ValueError: If the estimator is not a supported gradient boosting model
+        """
+        if not hasattr(estimator, 'estimators_') or not hasattr(estimator, 'learning_rate'):
+            raise ValueError(f'Unsupported estimator for compiled inference: {type(estimator).__name__}')
+        if estimator.estimators_.shape[1] != 1:
+            raise ValueError('Only single-output gradient boosting models can be compiled')
+
+        if estimator.init_ == 'zero':
+            base = 0.0
+        elif hasattr(estimator.init_, 'constant_'):
+            base = float(np.ravel(estimator.init_.constant_)[0])
+        else:
+            raise ValueError(f'Unsupported init estimator: {type(estimator.init_).__name__}')
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for tree_estimator in estimator.estimators_[:, 0]:
+            tree = tree_estimator.tree_
+            node_ids = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            # Leaves compare against +inf and loop back to themselves
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+            values.append(estimator.learning_rate * tree.value[:, 0, 0])
+            roots.append(offset)
+
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        left = np.concatenate(lefts).astype(np.intp)
+        right = np.concatenate(rights).astype(np.intp)
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            children=np.stack([right, left], axis=1).ravel(),
+            value=np.concatenate(values).astype(np.float64),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth,
+            base=base,
+        )
+
+    def to_arrays(self):
+        """Plain dict of the node arrays and scalars, for saving."""
+        arrays = {name: getattr(self, name) for name in ENSEMBLE_ARRAYS}
+        arrays.update(max_depth=self.max_depth, base=self.base)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """
+        Rebuild from to_arrays() output. Array inputs are used as-is (no copy),
+        so read-only memory-mapped arrays stay shared with the page cache.
+        """
+        kwargs = {name: np.asarray(arrays[name]) for name in ENSEMBLE_ARRAYS}
+        return cls(max_depth=int(arrays['max_depth']), base=float(arrays['base']), **kwargs)
+
+    def predict(self, X):
+        """
+        Predict for a dense 2-D feature matrix (already preprocessed).
+        """
+        # sklearn trees compare float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        # NaN fails every <= and would silently take the right branch; reject
+        # non-finite input like sklearn's validation does
+        if not np.isfinite(X).all():
+            raise ValueError('Input X contains NaN or infinity')
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.repeat(self.roots[None, :], X.shape[0], axis=0)
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = self.children[2 * nodes + go_left]
+        return self.base + self.value[nodes].sum(axis=1)
+
+
+class CompiledPipeline:
+    """
+    Drop-in replacement for the fitted sklearn Pipeline whose final
+    GradientBoostingRegressor step is evaluated by a CompiledTreeEnsemble.
+
+    The vectorized traversal does work proportional to rows x trees in NumPy
+    gathers, which beats per-tree dispatch for small batches but loses to
+    sklearn's Cython loop on large ones. When the original estimator is
+    available, batches above batch_threshold rows are handed to its own
+    predict on the already preprocessed matrix; otherwise (memory-mapped
+    artifacts) large batches are evaluated in chunks of batch_chunk rows.
+    """
+
+    batch_chunk = 256
+
+    def __init__(self, preprocessor, ensemble, feature_names_in, estimator=None,
+                 batch_threshold=16, model_type='Pipeline'):
+        self.preprocessor = preprocessor
+        self.ensemble = ensemble
+        self.feature_names_in_ = feature_names_in
+        self.estimator = estimator
+        self.batch_threshold = batch_threshold
+        self.model_type = model_type
+
+    @classmethod
+    def from_pipeline(cls, pipeline, batch_threshold=16):
+        return cls(
+            preprocessor=pipeline[:-1],
+            ensemble=CompiledTreeEnsemble.from_estimator(pipeline[-1]),
+            feature_names_in=list(pipeline.feature_names_in_),
+            estimator=pipeline[-1],
+            batch_threshold=batch_threshold,
+            model_type=type(pipeline).__name__,
+        )
+
+    def transform(self, frame):
+        features = self.preprocessor.transform(frame)
+        if hasattr(features, 'toarray'):
+            features = features.toarray()
+        return features
+
+    def predict_features(self, features):
+        n_rows = features.shape[0]
+        if n_rows <= self.batch_threshold:
+            return self.ensemble.predict(features)
+        if self.estimator is not None:
+            return self.estimator.predict(features)
+        return np.concatenate([
+            self.ensemble.predict(features[start:start + self.batch_chunk])
+            for start in range(0, n_rows, self.batch_chunk)
+        ])
+
+    def predict(self, frame):
+        return self.predict_features(self.transform(frame))
+
+
+def export_compiled(pipeline, path):
+    """
+    Save a fitted pipeline as a flat compiled artifact.
+
+    The node arrays are written uncompressed by joblib so the artifact can be
+    loaded with mmap_mode='r', letting every worker process share one copy
+    of the trees through the OS page cache. Only the small preprocessing
+    steps are unpickled into per-process memory.
+    """
+    import joblib
+
+    compiled = CompiledPipeline.from_pipeline(pipeline)
+    artifact = {
+        'format': COMPILED_FORMAT,
+        'model_type': compiled.model_type,
+        'feature_names_in': compiled.feature_names_in_,
+        'preprocessor': compiled.preprocessor,
+        'ensemble': compiled.ensemble.to_arrays(),
+    }
+    joblib.dump(artifact, path)
+    return compiled
+
+
+def is_compiled_artifact(obj):
+    return isinstance(obj, dict) and obj.get('format') == COMPILED_FORMAT
+
+
+def from_artifact(artifact, batch_threshold=16):
+    """Build a CompiledPipeline from a loaded (possibly memory-mapped) artifact."""
+    return CompiledPipeline(
+        preprocessor=artifact['preprocessor'],
+        ensemble=CompiledTreeEnsemble.from_arrays(artifact['ensemble']),
+        feature_names_in=list(artifact['feature_names_in']),
+        batch_threshold=batch_threshold,
+        model_type=artifact['model_type'],
+    )
+
+
+def get_predictor(model, backend, batch_threshold=16):
+    """
+    Return the object used to call predict() for the configured inference backend.
+
+    Args:
+        model: Fitted sklearn Pipeline, CompiledPipeline, or None
+        backend (str): 'sklearn' or 'compiled'
+        batch_threshold (int): Largest batch evaluated by the compiled trees
+
+    Returns:
+        The pipeline itself, or a CompiledPipeline wrapping it. Falls back to the
+        pipeline if it cannot be compiled.
+    """
+    if model is None or isinstance(model, CompiledPipeline) or backend != 'compiled':
+        return model
+    try:
+        predictor = CompiledPipeline.from_pipeline(model, batch_threshold=batch_threshold)
+        logger.info(f"Compiled {len(predictor.ensemble.roots)} trees for vectorized inference")
+        return predictor
+    except Exception as e:
+        logger.error(f"Failed to compile solar power model, using sklearn predict: {e}")
+        return model
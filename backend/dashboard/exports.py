@@ -0,0 +1,178 @@
+import csv
+from datetime import timedelta
+from django.conf import settings
+import logging
+
+from .models import PredictionModel
+from . import rollups
+
+logger = logging.getLogger(__name__)
+
+# Report period -> name of the bucket column in the export
+PERIOD_COLUMNS = {
+    'daily': 'date',
+    'weekly': 'week',
+    'monthly': 'month',
+}
+
+# Report period -> $dateTrunc unit
+PERIOD_UNITS = {
+    'daily': 'day',
+    'weekly': 'week',
+    'monthly': 'month',
+}
+
+# Set once the server has rejected $dateTrunc (MongoDB < 5.0), so later
+# exports go straight to the client-side aggregation
+_server_aggregation_unsupported = False
+
+# OperationFailure code of an unknown aggregation expression
+INVALID_PIPELINE_OPERATOR = 168
+
+
+def is_unsupported_date_trunc(error):
+    """Whether an OperationFailure means the server does not know $dateTrunc"""
+    return error.code == INVALID_PIPELINE_OPERATOR or '$dateTrunc' in str(error)
+
+
+def period_key(created_at, period):
+    """
+    Bucket a prediction timestamp: the date, the Monday starting its week,
+    or 'YYYY-MM' for the month.
+    """
+    if period == 'daily':
+        return created_at.date()
+    if period == 'weekly':
+        day = created_at.date()
+        return day - timedelta(days=day.weekday())
+    return created_at.strftime('%Y-%m')
+
+
+def iter_user_predictions(user_id, ascending=True, batch_size=1000):
+    """
+    Yield (created_at, predicted_power_generated) for every prediction of a
+    user, reading the cursor in batches and fetching only those two fields.
+    """
+    collection = PredictionModel.get_collection()
+    cursor = collection.find(
+        {'user_id': user_id},
+        projection={'_id': 0, 'created_at': 1, 'prediction.predicted_power_generated': 1}
+    ).sort('created_at', 1 if ascending else -1).batch_size(batch_size)
+    for doc in cursor:
+        yield doc['created_at'], doc.get('prediction', {}).get('predicted_power_generated', 0)
+
+
+def aggregate_period_totals(user_id, period):
+    """
+    Sum predicted power per period bucket on the server with $dateTrunc, so
+    only one document per bucket crosses the network.
+
+    Returns:
+        list: (bucket key, total) tuples in bucket order, keys formatted like period_key()
+
+    Raises:
+        pymongo.errors.OperationFailure: If the server does not support $dateTrunc
+    """
+    collection = PredictionModel.get_collection()
+    pipeline = [
+        {'$match': {'user_id': user_id}},
+        {'$group': {
+            '_id': {'$dateTrunc': {
+                'date': '$created_at',
+                'unit': PERIOD_UNITS[period],
+                'startOfWeek': 'monday'
+            }},
+            'total': {'$sum': {'$ifNull': ['$prediction.predicted_power_generated', 0]}}
+        }},
+        {'$sort': {'_id': 1}}
+    ]
+    return [(period_key(doc['_id'], period), doc['total']) for doc in collection.aggregate(pipeline)]
+
+
+def iter_report_rows(user_id, period, batch_size=1000):
+    """
+    Yield the report header followed by one row per period bucket.
+
+    Buckets are read from the precomputed prediction rollups when
+    SOLAR_PREDICTION_ROLLUPS is 'read'. Otherwise they are computed by
+    MongoDB (aggregate_period_totals) when
+    SOLAR_EXPORT_SERVER_AGGREGATION is on and the server supports $dateTrunc.
+    Otherwise predictions are read in created_at order so each bucket is
+    contiguous and can be summed and emitted as soon as the next one starts;
+    memory use does not depend on the number of predictions. Unknown periods
+    export the raw predictions, newest first.
+    """
+    global _server_aggregation_unsupported
+
+    if period not in PERIOD_COLUMNS:
+        yield ('created_at', 'predicted_power_generated')
+        for created_at, value in iter_user_predictions(user_id, ascending=False, batch_size=batch_size):
+            yield (created_at.isoformat(), value)
+        return
+
+    yield (PERIOD_COLUMNS[period], 'predicted_power_generated')
+
+    if rollups.rollups_readable():
+        for bucket, total in rollups.iter_period_totals(user_id, period):
+            yield (period_key(bucket, period), total)
+        return
+
+    if settings.SOLAR_EXPORT_SERVER_AGGREGATION and not _server_aggregation_unsupported:
+        from pymongo.errors import OperationFailure
+        try:
+            totals = aggregate_period_totals(user_id, period)
+        except OperationFailure as e:
+            # Other failures (e.g. a timeout) only fall back for this export
+            if is_unsupported_date_trunc(e):
+                _server_aggregation_unsupported = True
+                logger.warning(f"Server-side export aggregation unavailable, aggregating client-side: {e}")
+            else:
+                logger.warning(f"Server-side export aggregation failed, aggregating client-side: {e}")
+        else:
+            yield from totals
+            return
+
+    current, total = None, 0
+    for created_at, value in iter_user_predictions(user_id, ascending=True, batch_size=batch_size):
+        key = period_key(created_at, period)
+        if key != current:
+            if current is not None:
+                yield (current, total)
+            current, total = key, 0
+        total += value
+    if current is not None:
+        yield (current, total)
+
+
+class _Echo:
+    """File-like object whose write() just returns the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv_report(rows, recommendations, chunk_rows=500):
+    """
+    Render report rows as CSV chunks for a StreamingHttpResponse.
+
+    The header is only written if there is at least one data row, and the
+    recommendations are appended after the data, matching the layout of the
+    non-streaming export.
+    """
+    writer = csv.writer(_Echo(), lineterminator='\n')
+    rows = iter(rows)
+    header = next(rows)
+    chunk = []
+    for row in rows:
+        if header is not None:
+            chunk.append(writer.writerow(header))
+            header = None
+        chunk.append(writer.writerow(row))
+        if len(chunk) >= chunk_rows:
+            yield ''.join(chunk)
+            chunk = []
+
+    chunk.append('\n\nRecommendations:\n')
+    for rec in recommendations:
+        chunk.append(f"- {rec['title']}: {rec['description']}\n")
+    yield ''.join(chunk)
@@ -0,0 +1,149 @@
+import threading
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _unwrap(transformer):
+    """Return the single step of a one-step Pipeline, or the transformer itself."""
+    steps = getattr(transformer, 'steps', None)
+    if steps is not None:
+        if len(steps) != 1:
+            raise ValueError(f'Unsupported multi-step column pipeline: {[name for name, _ in steps]}')
+        return steps[0][1]
+    return transformer
+
+
+class FastFeaturizer:
+    """
+    Reproduces the fitted ColumnTransformer (StandardScaler + OneHotEncoder)
+    for a single row, writing straight into a preallocated NumPy buffer
+    instead of building a pandas DataFrame and dispatching the transformer.
+
+    Buffers are per thread; the array returned by transform_row is reused by
+    the next call on the same thread, so it must be consumed immediately.
+    """
+
+    def __init__(self, preprocessor):
+        if getattr(preprocessor, 'remainder', 'drop') != 'drop':
+            raise ValueError('Only ColumnTransformers with remainder="drop" are supported')
+
+        self.numeric = []
+        self.categorical = []
+        offset = 0
+        for name, transformer, columns in preprocessor.transformers_:
+            if transformer == 'drop' or name == 'remainder':
+                continue
+            transformer = _unwrap(transformer)
+            kind = type(transformer).__name__
+            if kind == 'StandardScaler':
+                mean = transformer.mean_ if transformer.with_mean else np.zeros(len(columns))
+                scale = transformer.scale_ if transformer.with_std else np.ones(len(columns))
+                self.numeric.append((list(columns), offset, np.asarray(mean, dtype=np.float64), np.asarray(scale, dtype=np.float64)))
+                offset += len(columns)
+            elif kind == 'OneHotEncoder':
+                if transformer.drop_idx_ is not None or getattr(transformer, '_infrequent_enabled', False):
+                    raise ValueError('OneHotEncoder with drop or infrequent categories is not supported')
+                if transformer.handle_unknown != 'ignore':
+                    raise ValueError('OneHotEncoder must use handle_unknown="ignore"')
+                for column, categories in zip(columns, transformer.categories_):
+                    lookup = {category: offset + i for i, category in enumerate(categories)}
+                    self.categorical.append((column, lookup))
+                    offset += len(categories)
+            else:
+                raise ValueError(f'Unsupported column transformer: {kind}')
+
+        self.n_features = offset
+        self._local = threading.local()
+
+    def _buffer(self):
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None:
+            buffer = np.zeros((1, self.n_features), dtype=np.float64)
+            self._local.buffer = buffer
+        return buffer
+
+    def transform_row(self, row):
+        """
+        Transform one row into model features.
+
+        Args:
+            row (dict): Values keyed by dataset column name
+
+        Returns:
+            ndarray: Feature matrix of shape (1, n_features), owned by this thread
+        """
+        buffer = self._buffer()
+        out = buffer[0]
+        out.fill(0.0)
+        for columns, offset, mean, scale in self.numeric:
+            values = np.array([float(row[column]) for column in columns])
+            out[offset:offset + len(columns)] = (values - mean) / scale
+        for column, lookup in self.categorical:
+            position = lookup.get(row[column])
+            if position is not None:
+                out[position] = 1.0
+        return buffer
+
+    def verify(self, preprocessor, columns):
+        """
+        Check that transform_row matches the fitted preprocessor on probe rows
+        covering every known category plus an unknown one.
+
+        Args:
+            preprocessor: The fitted ColumnTransformer
+            columns (list): Column names the pipeline was fitted on
+
+        Returns:
+            bool: True if every probe row matches
+        """
+        import pandas as pd
+
+        rng = np.random.default_rng(0)
+        n_probes = max([len(lookup) for _, lookup in self.categorical] + [1]) + 1
+        probe = {column: [0.0] * n_probes for column in columns}
+        for numeric_columns, _, mean, scale in self.numeric:
+            for column, column_mean, column_scale in zip(numeric_columns, mean, scale):
+                probe[column] = list(column_mean + column_scale * rng.normal(size=n_probes))
+        for column, lookup in self.categorical:
+            categories = list(lookup)
+            # The last probe row uses a category the encoder has never seen
+            probe[column] = [categories[i % len(categories)] for i in range(n_probes - 1)] + ['__unknown__']
+
+        frame = pd.DataFrame(probe, columns=columns)
+        expected = preprocessor.transform(frame)
+        if hasattr(expected, 'toarray'):
+            expected = expected.toarray()
+        if expected.shape[1] != self.n_features:
+            return False
+
+        for i, row in enumerate(frame.to_dict('records')):
+            if not np.allclose(self.transform_row(row)[0], expected[i], rtol=1e-12, atol=1e-12):
+                return False
+        return True
+
+
+def get_featurizer(model):
+    """
+    Build the fast single-row featurizer for a fitted pipeline (or
+    CompiledPipeline) and check it against the pipeline's own preprocessor.
+
+    Returns:
+        FastFeaturizer, or None if the pipeline is unsupported or the
+        consistency check fails (callers then fall back to the DataFrame path)
+    """
+    if model is None:
+        return None
+    try:
+        preprocessor = model.preprocessor if hasattr(model, 'preprocessor') else model[:-1]
+        column_transformer = _unwrap(preprocessor)
+        featurizer = FastFeaturizer(column_transformer)
+        if not featurizer.verify(preprocessor, list(model.feature_names_in_)):
+            logger.error("Fast featurizer does not match the model preprocessor; using DataFrame path")
+            return None
+        logger.info(f"Fast featurizer ready with {featurizer.n_features} features")
+        return featurizer
+    except Exception as e:
+        logger.error(f"Failed to build fast featurizer, using DataFrame path: {e}")
+        return None
@@ -0,0 +1,76 @@
+import hashlib
+import json
+from django.core.cache import cache
+from django.http import HttpResponseNotModified, JsonResponse
+from rest_framework import status
+from rest_framework.response import Response
+
+# Clients may keep a copy but must revalidate it (If-None-Match) on every use
+CACHE_CONTROL = 'max-age=0, must-revalidate'
+
+
+def cache_key(prefix, *parts):
+    """Cache key for a response variant; parts are hashed so any value (spaces, unicode) is safe"""
+    digest = hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    return f'{prefix}:{digest}'
+
+
+def etag_for(data):
+    """Strong ETag of a JSON-serializable payload"""
+    body = json.dumps(data, sort_keys=True, default=str, separators=(',', ':'))
+    return '"' + hashlib.sha1(body.encode('utf-8')).hexdigest() + '"'
+
+
+def get_or_build(key, build, timeout):
+    """
+    Return (data, etag) for key from the cache, building and storing it on a miss.
+
+    Args:
+        key (str): Cache key; it must change whenever the underlying data does
+        build (callable): Produces the JSON-serializable payload
+        timeout (int): Seconds to keep the entry
+    """
+    cached = cache.get(key)
+    if cached is None:
+        data = build()
+        cached = (data, etag_for(data))
+        cache.set(key, cached, timeout)
+    return cached
+
+
+async def aget_or_build(key, build, timeout):
+    """get_or_build for async views; build is a coroutine function"""
+    cached = await cache.aget(key)
+    if cached is None:
+        data = await build()
+        cached = (data, etag_for(data))
+        await cache.aset(key, cached, timeout)
+    return cached
+
+
+def etag_matches(request, etag):
+    """True if the request's If-None-Match lists etag (weak comparison) or '*'"""
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(',')]
+    return '*' in candidates or any(candidate.removeprefix('W/') == etag for candidate in candidates)
+
+
+def conditional_response(request, data, etag):
+    """200 with the payload, or an empty 304 if the client already has this ETag"""
+    headers = {'ETag': etag, 'Cache-Control': CACHE_CONTROL}
+    if etag_matches(request, etag):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(data, status=status.HTTP_200_OK, headers=headers)
+
+
+def conditional_json_response(request, data, etag):
+    """conditional_response for plain Django (async) views"""
+    if etag_matches(request, etag):
+        response = HttpResponseNotModified()
+    else:
+        response = JsonResponse(data)
+    response['ETag'] = etag
+    response['Cache-Control'] = CACHE_CONTROL
+    return response
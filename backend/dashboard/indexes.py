@@ -0,0 +1,99 @@
+from authentication.mongodb import (
+    get_historical_collection, get_predictions_collection, get_rollups_collection, get_tokens_collection
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Indexes the dashboard queries rely on, per collection getter.
+# Each entry is (name, keys) or (name, keys, options); names are fixed so
+# re-running is idempotent.
+INDEX_SPECS = {
+    'predictions': (get_predictions_collection, [
+        # get_user_predictions(_page) / get_user_latest_prediction / get_user_prediction_stats;
+        # _id is the keyset pagination tie-breaker
+        ('user_id_1_created_at_-1__id_-1', [('user_id', 1), ('created_at', -1), ('_id', -1)]),
+    ]),
+    'historical data': (get_historical_collection, [
+        # get_todays_power_generation for a city
+        ('City_1_Date_-1_Time_1', [('City', 1), ('Date', -1), ('Time', 1)]),
+        # get_todays_power_generation without a city filter
+        ('Date_-1_Time_1', [('Date', -1), ('Time', 1)]),
+    ]),
+    'prediction_rollups': (get_rollups_collection, [
+        # rollups.iter_period_totals / rebuild
+        ('user_id_1_period_1_bucket_1', [('user_id', 1), ('period', 1), ('bucket', 1)]),
+    ]),
+    'tokens': (get_tokens_collection, [
+        # Revoked access tokens are removed once they have expired anyway
+        ('expires_at_1', [('expires_at', 1)], {'expireAfterSeconds': 0}),
+    ]),
+}
+
+
+def ensure_indexes():
+    """
+    Create any missing dashboard indexes. Safe to run repeatedly: existing
+    indexes with the same name and keys are left untouched.
+
+    Returns:
+        dict: collection name -> list of index names that were requested
+    """
+    from pymongo import IndexModel
+
+    created = {}
+    for collection_name, (get_collection, specs) in INDEX_SPECS.items():
+        models = [IndexModel(spec[1], name=spec[0], **(spec[2] if len(spec) > 2 else {})) for spec in specs]
+        created[collection_name] = get_collection().create_indexes(models)
+        logger.info(f"Ensured indexes on '{collection_name}': {created[collection_name]}")
+    return created
+
+
+def index_report():
+    """
+    Compare existing indexes against INDEX_SPECS and collect usage from $indexStats.
+
+    Returns:
+        dict: collection name -> {'missing': [...], 'unused': [...], 'usage': {name: ops}}
+        where 'unused' lists indexes (other than _id_) with zero recorded accesses
+        since the server last restarted
+    """
+    report = {}
+    for collection_name, (get_collection, specs) in INDEX_SPECS.items():
+        collection = get_collection()
+        existing = {index['name']: list(index['key'].items()) for index in collection.list_indexes()}
+        missing = [
+            spec[0] for spec in specs
+            if existing.get(spec[0]) != [(field, direction) for field, direction in spec[1]]
+        ]
+
+        usage = {}
+        try:
+            for stat in collection.aggregate([{'$indexStats': {}}]):
+                usage[stat['name']] = int(stat.get('accesses', {}).get('ops', 0))
+        except Exception as e:
+            logger.warning(f"$indexStats unavailable for '{collection_name}': {e}")
+
+        report[collection_name] = {
+            'missing': missing,
+            'unused': sorted(name for name, ops in usage.items() if ops == 0 and name != '_id_'),
+            'usage': usage,
+        }
+    return report
+
+
+def check_indexes(create=False):
+    """
+    Startup check: log missing and unused indexes, optionally creating the
+    missing ones. Never raises, so an unreachable database doesn't stop the app.
+    """
+    try:
+        if create:
+            ensure_indexes()
+        for collection_name, result in index_report().items():
+            if result['missing']:
+                logger.warning(f"Missing MongoDB indexes on '{collection_name}': {result['missing']}")
+            if result['unused']:
+                logger.info(f"Unused MongoDB indexes on '{collection_name}': {result['unused']}")
+    except Exception as e:
+        logger.error(f"MongoDB index check failed: {e}")
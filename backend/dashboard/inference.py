@@ -0,0 +1,439 @@
+import re
+import numpy as np
+from authentication.metrics import MODEL_CALLS, MODEL_ROWS, timed
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Required parameters (matching the dataset columns)
+REQUIRED_PARAMS = [
+    'panel_area', 'tilt', 'azimuth', 'ghi',
+    'dni', 'temperature', 'humidity', 'wind_speed', 'cloud_cover'
+]
+
+NUMERIC_PARAMS = [
+    'panel_area', 'tilt', 'azimuth', 'ghi',
+    'dni', 'temperature', 'humidity', 'wind_speed'
+]
+
+# Optional parameters the model was trained on, with the defaults used when absent
+OPTIONAL_PARAMS = {
+    'city': 0,  # Default city index
+    'date': '2025-03-15',  # Default date
+    'time': '12:00',  # Default time
+    'power_consumed': 0.0,  # Default power consumed
+}
+
+# (parameter, pattern, strptime format, format shown in errors) of the date
+# and time strings, matching the training data
+DATETIME_FORMATS = [
+    ('date', r'\d{4}-\d{2}-\d{2}', '%Y-%m-%d', 'YYYY-MM-DD'),
+    ('time', r'\d{2}:\d{2}', '%H:%M', 'HH:MM'),
+]
+
+VALID_CLOUD_TYPES = [
+    'Fluffy white clouds', 'Mid-level clouds',
+    'Thin high clouds', 'Thick low clouds'
+]
+
+# API parameter name -> dataset column name, in the column order of the training data
+FEATURE_COLUMNS = {
+    'city': 'City',
+    'date': 'Date',
+    'time': 'Time',
+    'panel_area': 'Panel area (m^2)',
+    'tilt': 'Tilt (deg)',
+    'azimuth': 'Azimuth (deg)',
+    'ghi': 'Solar Irradiance (W/m^2)',  # GHI is Solar Irradiance
+    'dni': 'DNI (W/m^2)',
+    'temperature': 'Temperature (C)',
+    'humidity': 'Humidity (%)',
+    'wind_speed': 'Wind Speed (m/s)',
+    'power_consumed': 'Power Consumed (kW)',
+    'cloud_cover': 'Cloud Cover',  # This will be treated as categorical
+}
+
+
+def validate_rows(rows):
+    """
+    Validate a list of parameter objects column-wise.
+
+    Every check runs over a whole column at once; only rows that fail
+    are visited individually to build their error message.
+
+    Args:
+        rows (list): Parameter dicts as sent by the client
+
+    Returns:
+        tuple: (frame, errors) where frame holds the valid rows (indexed by
+        their position in the input, numeric columns already converted) and
+        errors maps input position -> error message
+    """
+    import pandas as pd
+
+    errors = {}
+    records = []
+    for i, row in enumerate(rows):
+        if isinstance(row, dict):
+            records.append(row)
+        else:
+            records.append({})
+            errors[i] = 'Each row must be an object of prediction parameters'
+
+    columns = REQUIRED_PARAMS + list(OPTIONAL_PARAMS)
+    frame = pd.DataFrame.from_records(records, columns=columns, index=range(len(records)))
+
+    def reject(mask, message):
+        for i in np.flatnonzero(mask):
+            errors.setdefault(int(i), message(int(i)) if callable(message) else message)
+
+    # Missing parameters
+    missing = frame[REQUIRED_PARAMS].isna().to_numpy()
+    reject(
+        missing.any(axis=1),
+        lambda i: f'Missing required parameters: {[p for p, m in zip(REQUIRED_PARAMS, missing[i]) if m]}'
+    )
+
+    # Numeric conversion
+    for param in NUMERIC_PARAMS + ['city', 'power_consumed']:
+        converted = pd.to_numeric(frame[param], errors='coerce')
+        reject(
+            (converted.isna() & frame[param].notna()).to_numpy(),
+            f'Invalid parameter value: {param} must be a number'
+        )
+        reject(
+            np.isinf(converted.to_numpy()),
+            f'Invalid parameter value: {param} must be a finite number'
+        )
+        frame[param] = converted
+
+    # Date and time must be strings in the format of the training data
+    for param, pattern, fmt, hint in DATETIME_FORMATS:
+        values = frame[param]
+        well_formed = values.map(lambda value: isinstance(value, str) and re.fullmatch(pattern, value) is not None)
+        parsed = pd.to_datetime(values.where(well_formed), format=fmt, errors='coerce')
+        reject(
+            (values.notna() & parsed.isna()).to_numpy(),
+            f'Invalid parameter value: {param} must be a string formatted as {hint}'
+        )
+
+    # Validate cloud cover type
+    cloud_cover = frame['cloud_cover']
+    reject(
+        (cloud_cover.notna() & ~cloud_cover.isin(VALID_CLOUD_TYPES)).to_numpy(),
+        f'Invalid cloud cover type. Must be one of: {VALID_CLOUD_TYPES}'
+    )
+
+    # Validate ranges
+    humidity = frame['humidity']
+    reject(
+        (humidity.notna() & ~humidity.between(0, 100)).to_numpy(),
+        'Humidity must be between 0 and 100'
+    )
+
+    valid = frame.drop(index=list(errors))
+    for param, default in OPTIONAL_PARAMS.items():
+        valid[param] = valid[param].fillna(default)
+    return valid, errors
+
+
+def build_feature_frame(params):
+    """
+    Build the model input DataFrame from validated parameters.
+
+    Args:
+        params (DataFrame): One row per prediction, columns named after the API parameters
+
+    Returns:
+        DataFrame: Columns renamed and ordered like the training dataset
+    """
+    return params[list(FEATURE_COLUMNS)].rename(columns=FEATURE_COLUMNS)
+
+
+def predict_features(predictor, features):
+    """
+    Run only the final estimator on an already preprocessed feature matrix.
+
+    Args:
+        predictor: Fitted sklearn Pipeline or CompiledPipeline
+        features (ndarray): Output of the pipeline's preprocessing steps
+    """
+    if hasattr(predictor, 'predict_features'):
+        return predictor.predict_features(features)
+    return predictor[-1].predict(features)
+
+
+def predict_one(predictor, featurizer, params):
+    """
+    Predict power for a single validated parameter set.
+
+    Uses the fast featurizer when one is available, otherwise builds a one-row
+    DataFrame and runs the full pipeline.
+
+    Args:
+        predictor: Fitted sklearn Pipeline or CompiledPipeline
+        featurizer (FastFeaturizer): Fast single-row featurizer, or None
+        params (dict): Values keyed by API parameter name, optional ones included
+
+    Returns:
+        float: Predicted power generated (kW)
+    """
+    MODEL_CALLS.inc(('single',))
+    MODEL_ROWS.inc(('single',))
+    if featurizer is not None:
+        with timed('features'):
+            features = featurizer.transform_row({column: params[param] for param, column in FEATURE_COLUMNS.items()})
+        with timed('model'):
+            return float(predict_features(predictor, features)[0])
+    import pandas as pd
+
+    with timed('features'):
+        frame = pd.DataFrame({column: [params[param]] for param, column in FEATURE_COLUMNS.items()})
+    # Without a featurizer the pipeline's preprocessing is part of the model stage
+    with timed('model'):
+        return float(predictor.predict(frame)[0])
+
+
+def fallback_predict(params):
+    """
+    Simple formula based on solar irradiance and panel area, used when the
+    model is not available. Works on scalars and on array-like columns.
+    """
+    base_power = (params['ghi'] / 1000) * params['panel_area'] * 0.2  # 20% efficiency
+    temperature_factor = 1 - (params['temperature'] - 25) * 0.004  # Temperature coefficient
+    cloud_factor = 1 - (params['humidity'] / 100) * 0.1  # Humidity effect
+    return base_power * temperature_factor * cloud_factor
+
+
+def predict_batch(model, rows):
+    """
+    Validate and score many parameter rows with a single model call.
+
+    Args:
+        model: Fitted pipeline, or None to use the fallback calculation
+        rows (list): Parameter dicts as sent by the client
+
+    Returns:
+        list: One result per input row, in input order. Each result holds
+        either 'predicted_power_generated' or 'error'.
+    """
+    valid, errors = validate_rows(rows)
+
+    predictions = np.empty(0)
+    if not valid.empty:
+        if model is not None:
+            MODEL_CALLS.inc(('batch',))
+            MODEL_ROWS.inc(('batch',), len(valid))
+            predictions = model.predict(build_feature_frame(valid))
+        else:
+            predictions = fallback_predict(valid).to_numpy()
+
+    results = [None] * len(rows)
+    for i, value in zip(valid.index, predictions.tolist()):
+        results[i] = {'index': int(i), 'predicted_power_generated': value}
+    for i, message in errors.items():
+        results[i] = {'index': i, 'error': message}
+    return results
+
+
+# Forecast requests: parameters fixed for a site vs. given per hour of weather
+SITE_PARAMS = ['panel_area', 'tilt', 'azimuth', 'city', 'power_consumed']
+WEATHER_PARAMS = ['ghi', 'dni', 'temperature', 'humidity', 'wind_speed', 'cloud_cover']
+
+
+def horizon_rows(site, weather):
+    """
+    Expand a site configuration and its weather series into prediction rows.
+
+    Each weather entry gives the WEATHER_PARAMS plus either 'timestamp'
+    (ISO 8601, e.g. '2025-03-15T06:00') or 'date' and 'time'.
+
+    Returns:
+        tuple: (rows, labels, errors) where labels holds the 'date'/'time' of
+        each entry and errors maps entry position -> message for entries whose
+        timestamp could not be parsed
+    """
+    from datetime import datetime
+
+    site_values = {param: site[param] for param in SITE_PARAMS if param in site}
+    rows, labels, errors = [], [], {}
+    for i, hour in enumerate(weather):
+        if not isinstance(hour, dict):
+            rows.append(hour)
+            labels.append({})
+            continue
+        row = dict(site_values)
+        row.update({param: hour.get(param) for param in WEATHER_PARAMS})
+        if hour.get('timestamp') is not None:
+            try:
+                moment = datetime.fromisoformat(str(hour['timestamp']))
+                row['date'], row['time'] = moment.strftime('%Y-%m-%d'), moment.strftime('%H:%M')
+            except ValueError:
+                errors[i] = f"Invalid timestamp: {hour['timestamp']!r}"
+        else:
+            row['date'], row['time'] = hour.get('date'), hour.get('time')
+        rows.append(row)
+        labels.append({'date': row.get('date'), 'time': row.get('time')})
+    return rows, labels, errors
+
+
+def forecast(model, sites, interval_hours=1.0):
+    """
+    Score the full horizon of one or more sites with a single model call.
+
+    Args:
+        model: Fitted pipeline, or None to use the fallback calculation
+        sites (list): {'site': {...}, 'weather': [...]} dicts, see horizon_rows
+        interval_hours (float): Length of each weather step, used to turn kW into kWh
+
+    Returns:
+        list: Per site, {'hours': [...], 'total_kwh', 'peak_kw', 'error_count'}.
+        Each hour holds its date, time and either predicted_power_generated
+        (kW) plus energy_kwh, or an 'error'.
+    """
+    all_rows, expanded = [], []
+    for entry in sites:
+        rows, labels, errors = horizon_rows(entry.get('site') or {}, entry.get('weather') or [])
+        expanded.append((len(all_rows), labels, errors))
+        all_rows.extend(rows)
+
+    results = predict_batch(model, all_rows)
+
+    forecasts = []
+    for offset, labels, errors in expanded:
+        hours = []
+        for i, label in enumerate(labels):
+            result = results[offset + i]
+            hour = dict(label)
+            if i in errors:
+                hour['error'] = errors[i]
+            elif 'error' in result:
+                hour['error'] = result['error']
+            else:
+                power = result['predicted_power_generated']
+                hour['predicted_power_generated'] = power
+                hour['energy_kwh'] = power * interval_hours
+            hours.append(hour)
+        scored = [hour for hour in hours if 'error' not in hour]
+        forecasts.append({
+            'hours': hours,
+            'total_kwh': sum(hour['energy_kwh'] for hour in scored),
+            'peak_kw': max((hour['predicted_power_generated'] for hour in scored), default=None),
+            'error_count': len(hours) - len(scored),
+        })
+    return forecasts
+
+
+# What-if sweeps: configuration parameters that can be varied, with their (inclusive) valid range
+SWEEP_PARAMS = {
+    'tilt': (0, 90),
+    'azimuth': (0, 360),
+    'panel_area': (0, None),
+}
+
+
+def sweep_axis(param, spec, max_points):
+    """
+    Expand one sweep grid specification into its values.
+
+    Args:
+        param (str): One of SWEEP_PARAMS
+        spec: A list of values, or {'start', 'stop', 'step'} (stop included)
+        max_points (int): Upper bound on the number of values
+
+    Returns:
+        ndarray: The grid values, in order
+
+    Raises:
+        ValueError: If the specification is malformed, too large or out of range
+    """
+    if isinstance(spec, dict):
+        try:
+            start, stop, step = (float(spec[key]) for key in ('start', 'stop', 'step'))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f'{param}: a range needs numeric start, stop and step')
+        if not np.isfinite([start, stop, step]).all():
+            raise ValueError(f'{param}: start, stop and step must be finite numbers')
+        if not step > 0 or stop < start:
+            raise ValueError(f'{param}: step must be positive and stop must not be below start')
+        # Compared as a float first, so a tiny step can't produce a huge count
+        steps = (stop - start) / step + 1e-9
+        if steps >= max_points:
+            raise ValueError(f'{param}: range has more than {max_points} values')
+        count = int(np.floor(steps)) + 1
+        values = np.round(start + step * np.arange(count), 9)
+    elif isinstance(spec, list) and spec:
+        if len(spec) > max_points:
+            raise ValueError(f'{param}: {len(spec)} values, at most {max_points} allowed')
+        try:
+            values = np.array(spec, dtype=float)
+        except (TypeError, ValueError):
+            raise ValueError(f'{param}: values must be numbers')
+        if values.ndim != 1:
+            raise ValueError(f'{param}: values must be a flat list of numbers')
+    else:
+        raise ValueError(f'{param}: give a non-empty list of values or a {{start, stop, step}} range')
+
+    low, high = SWEEP_PARAMS[param]
+    if not np.isfinite(values).all() or (values < low).any() or (high is not None and (values > high).any()):
+        bounds = f'between {low} and {high}' if high is not None else f'at least {low}'
+        raise ValueError(f'{param}: values must be {bounds}')
+    return values
+
+
+def sweep(model, base, grid, max_points):
+    """
+    Score the Cartesian product of parameter grids around a base configuration
+    with a single model call.
+
+    Args:
+        model: Fitted pipeline, or None to use the fallback calculation
+        base (dict): Prediction parameters; swept parameters may be omitted
+        grid (dict): SWEEP_PARAMS name -> grid specification (see sweep_axis)
+        max_points (int): Upper bound on the size of the product
+
+    Returns:
+        dict: 'parameters' (swept names, in axis order), 'grid' (their values),
+        'surface' (predicted kW as a nested list indexed like the grid axes),
+        'point_count' and 'best' (the highest-scoring point)
+
+    Raises:
+        ValueError: If the base configuration or the grid is invalid
+    """
+    unknown = [param for param in grid if param not in SWEEP_PARAMS]
+    if unknown or not grid:
+        raise ValueError(f'Grid parameters must be one or more of {list(SWEEP_PARAMS)}')
+    parameters = list(grid)
+    axes = [sweep_axis(param, grid[param], max_points) for param in parameters]
+    shape = tuple(len(axis) for axis in axes)
+    size = int(np.prod(shape))
+    if size > max_points:
+        raise ValueError(f'Sweep has {size} points, at most {max_points} allowed')
+
+    # Validate the base once, with the swept parameters filled in
+    base_row = {**base, **{param: float(axis[0]) for param, axis in zip(parameters, axes)}}
+    valid, errors = validate_rows([base_row])
+    if errors:
+        raise ValueError(errors[0])
+
+    points = valid.loc[valid.index.repeat(size)].reset_index(drop=True)
+    for param, column in zip(parameters, np.meshgrid(*axes, indexing='ij')):
+        points[param] = column.ravel()
+
+    if model is not None:
+        MODEL_CALLS.inc(('sweep',))
+        MODEL_ROWS.inc(('sweep',), size)
+        predictions = np.asarray(model.predict(build_feature_frame(points)), dtype=float)
+    else:
+        predictions = fallback_predict(points).to_numpy(dtype=float)
+
+    best_index = int(np.argmax(predictions))
+    best = {param: float(points[param].iat[best_index]) for param in parameters}
+    best['predicted_power_generated'] = float(predictions[best_index])
+    return {
+        'parameters': parameters,
+        'grid': {param: axis.tolist() for param, axis in zip(parameters, axes)},
+        'surface': predictions.reshape(shape).tolist(),
+        'point_count': size,
+        'best': best,
+    }
@@ -0,0 +1,28 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.indexes import ensure_indexes, index_report
+
+
+class Command(BaseCommand):
+    help = "Create the MongoDB indexes used by the dashboard and report missing or unused ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--report-only',
+            action='store_true',
+            help="Don't create anything, only report missing/unused indexes",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            if not options['report_only']:
+                for collection_name, names in ensure_indexes().items():
+                    self.stdout.write(self.style.SUCCESS(f"'{collection_name}': {', '.join(names)}"))
+            report = index_report()
+        except Exception as e:
+            raise CommandError(f"Index bootstrap failed: {e}")
+
+        self.stdout.write(json.dumps(report, indent=2))
+        if options['report_only'] and any(result['missing'] for result in report.values()):
+            raise CommandError("Some dashboard indexes are missing")
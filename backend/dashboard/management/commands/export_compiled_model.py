@@ -0,0 +1,47 @@
+import os
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.compiled_model import export_compiled
+
+
+class Command(BaseCommand):
+    help = (
+        "Export the solar power model as a flat compiled artifact that workers "
+        "load memory-mapped (point SOLAR_MODEL_PATH at the output file)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            default=os.path.join(settings.BASE_DIR, 'models', 'solar_power_model.pkl'),
+            help='Pickled sklearn Pipeline to export',
+        )
+        parser.add_argument(
+            '--output',
+            default=os.path.join(settings.BASE_DIR, 'models', 'solar_power_model.compiled.joblib'),
+            help='Where to write the compiled artifact',
+        )
+
+    def handle(self, *args, **options):
+        import joblib
+
+        try:
+            pipeline = joblib.load(options['source'])
+        except Exception as e:
+            raise CommandError(f"Failed to load model from {options['source']}: {e}")
+
+        # Write next to the target and rename, so a watching registry never sees a partial file
+        tmp_path = options['output'] + '.tmp'
+        try:
+            compiled = export_compiled(pipeline, tmp_path)
+            os.replace(tmp_path, options['output'])
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise CommandError(f"Failed to export compiled model: {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported {len(compiled.ensemble.roots)} trees "
+            f"({compiled.ensemble.value.size} nodes) to {options['output']}"
+        ))
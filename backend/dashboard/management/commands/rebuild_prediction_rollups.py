@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-user prediction rollups (daily/weekly/monthly/all) from the predictions collection."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            help="Only rebuild the rollups of this user ID",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help="Predictions fetched per MongoDB round trip",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            rebuilt = rebuild(user_id=options['user'], batch_size=options['batch_size'])
+        except Exception as e:
+            raise CommandError(f"Rollup rebuild failed: {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt rollups for {len(rebuilt)} users ({sum(rebuilt.values())} predictions)"
+        ))
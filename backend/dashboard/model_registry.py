@@ -0,0 +1,237 @@
+import hashlib
+import importlib.util
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from django.conf import settings
+import logging
+
+from .compiled_model import from_artifact, get_predictor, is_compiled_artifact
+from .featurizer import get_featurizer
+
+logger = logging.getLogger(__name__)
+
+# joblib (and sklearn with it) is only imported when a model is actually loaded
+JOBLIB_AVAILABLE = importlib.util.find_spec('joblib') is not None
+if not JOBLIB_AVAILABLE:
+    logger.warning("joblib not available. Model loading will be disabled.")
+
+
+class ModelHandle:
+    """
+    An immutable, fully prepared model version: the fitted pipeline plus the
+    predictor and featurizer derived from it. Requests grab one handle and use
+    it throughout, so a swap never mixes two versions within a request.
+    """
+
+    def __init__(self, model, predictor, featurizer, version, path, loaded_at):
+        self.model = model
+        self.predictor = predictor
+        self.featurizer = featurizer
+        self.version = version
+        self.path = path
+        self.loaded_at = loaded_at
+
+    @property
+    def available(self):
+        return self.model is not None
+
+    @property
+    def model_type(self):
+        if self.model is None:
+            return "FallbackCalculation"
+        # Compiled artifacts report the type of the pipeline they were exported from
+        return getattr(self.model, 'model_type', None) or str(type(self.model).__name__)
+
+    @property
+    def dataset_source(self):
+        return 'Gujarat Solar Dataset' if self.model is not None else 'Fallback Calculation'
+
+
+def file_checksum(path):
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """
+    Loads the solar power model, watches its file for changes and atomically
+    swaps in new versions from a background thread.
+
+    The file is polled by (mtime, size); a changed stat triggers a checksum,
+    and only a changed checksum triggers a reload. Recently loaded versions
+    are kept so callers can pin a version while a rollout is in progress.
+
+    The file may be a pickled sklearn Pipeline or a compiled artifact written
+    by export_compiled(); with mmap=True the latter's node arrays are mapped
+    read-only and shared between worker processes. The file must then be
+    replaced by renaming a new one over it: writing into the mapped file
+    changes (or truncates) the arrays of live handles before the watcher
+    notices.
+    """
+
+    def __init__(self, path, backend='sklearn', batch_threshold=16, fast_featurizer=True, max_versions=2,
+                 mmap=True, reload_interval=0):
+        self.path = path
+        self.mmap = mmap
+        self.reload_interval = reload_interval
+        self.backend = backend
+        self.batch_threshold = batch_threshold
+        self.fast_featurizer = fast_featurizer
+        self.max_versions = max_versions
+        self._versions = OrderedDict()
+        self._active = None
+        self._stat = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+
+    def _build_handle(self, checksum):
+        model = None
+        if JOBLIB_AVAILABLE:
+            import joblib
+            model = joblib.load(self.path, mmap_mode='r' if self.mmap else None)
+            if is_compiled_artifact(model):
+                model = from_artifact(model, batch_threshold=self.batch_threshold)
+            logger.info(f"Solar power model loaded successfully: {type(model)}")
+        else:
+            logger.error("joblib not available. Cannot load model.")
+        return ModelHandle(
+            model=model,
+            predictor=get_predictor(model, self.backend, batch_threshold=self.batch_threshold),
+            featurizer=get_featurizer(model) if self.fast_featurizer else None,
+            version=checksum[:12] if model is not None else None,
+            path=self.path,
+            loaded_at=datetime.utcnow(),
+        )
+
+    def _activate(self, handle):
+        with self._lock:
+            if handle.version is not None:
+                self._versions[handle.version] = handle
+                self._versions.move_to_end(handle.version)
+                while len(self._versions) > self.max_versions:
+                    self._versions.popitem(last=False)
+            # A single reference assignment, so readers see either the old or the new handle
+            self._active = handle
+
+    def load(self):
+        """
+        Load the model synchronously. On failure the previous handle stays
+        active, or a fallback handle (no model) is used if there is none.
+
+        Returns:
+            ModelHandle: The active handle
+        """
+        with self._load_lock:
+            try:
+                stat = os.stat(self.path)
+                checksum = file_checksum(self.path)
+                if self._active is not None and self._active.version == checksum[:12]:
+                    self._stat = (stat.st_mtime_ns, stat.st_size)
+                    return self._active
+                handle = self._build_handle(checksum)
+                self._stat = (stat.st_mtime_ns, stat.st_size)
+                self._activate(handle)
+                if handle.version is not None:
+                    logger.info(f"Activated solar power model version {handle.version}")
+            except Exception as e:
+                # _stat is left as it was, so the watcher retries once the file changes
+                logger.error(f"Failed to load solar power model: {e}")
+                if self._active is None:
+                    self._activate(ModelHandle(None, None, None, None, self.path, datetime.utcnow()))
+            # Watch for new versions once a load has been attempted (even a failed
+            # one, so a model copied in later is picked up), so processes that
+            # never predict (management commands) don't start a thread
+            self.start_watcher(self.reload_interval)
+            return self._active
+
+    def check_for_updates(self):
+        """
+        Reload the model if its file changed since the last load.
+
+        Returns:
+            bool: True if a new version was activated
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError as e:
+            logger.warning(f"Cannot stat solar power model at {self.path}: {e}")
+            return False
+        if (stat.st_mtime_ns, stat.st_size) == self._stat:
+            return False
+        previous = self._active.version if self._active else None
+        return self.load().version != previous
+
+    def get_active(self):
+        """Return the active ModelHandle, loading the model on first use."""
+        handle = self._active
+        if handle is None:
+            handle = self.load()
+        return handle
+
+    def get(self, version=None):
+        """
+        Return the handle for a specific retained version, or the active one.
+
+        Returns:
+            ModelHandle or None if the version is not loaded
+        """
+        if not version:
+            return self.get_active()
+        return self._versions.get(version)
+
+    def versions(self):
+        """List of retained model versions, oldest first."""
+        return list(self._versions)
+
+    def start_watcher(self, interval):
+        """Poll the model file every `interval` seconds in a daemon thread (0 disables)."""
+        if self._watcher is not None or interval <= 0:
+            return
+
+        def watch():
+            while not self._stop.wait(interval):
+                try:
+                    self.check_for_updates()
+                except Exception as e:
+                    logger.error(f"Model watcher error: {e}")
+
+        self._watcher = threading.Thread(target=watch, name='solar-model-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+        self._stop.clear()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry():
+    """Return the process-wide ModelRegistry configured from settings."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                registry = ModelRegistry(
+                    settings.SOLAR_MODEL_PATH,
+                    backend=settings.SOLAR_INFERENCE_BACKEND,
+                    batch_threshold=settings.SOLAR_COMPILED_BATCH_THRESHOLD,
+                    fast_featurizer=settings.SOLAR_FAST_FEATURIZER,
+                    max_versions=settings.SOLAR_MODEL_MAX_VERSIONS,
+                    mmap=settings.SOLAR_MODEL_MMAP,
+                    reload_interval=settings.SOLAR_MODEL_RELOAD_INTERVAL,
+                )
+                _registry = registry
+    return _registry
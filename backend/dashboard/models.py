@@ -1,10 +1,127 @@
+import asyncio
+import base64
+import json
 from datetime import datetime
 from bson import ObjectId
-from authentication.mongodb import get_predictions_collection
+from bson.errors import InvalidId
+from django.conf import settings
+from authentication.mongodb import (
+    get_async_predictions_collection, get_async_rollups_collection, get_predictions_collection
+)
+from . import rollups
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+def encode_cursor(doc):
+    """Opaque pagination token for the position right after `doc` in (created_at, _id) order"""
+    payload = json.dumps({'c': doc['created_at'].isoformat(), 'i': str(doc['_id'])}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Decode a token produced by encode_cursor.
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(payload['c']), ObjectId(payload['i'])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise ValueError(f'Invalid cursor: {e}')
+
+
+def serialize_prediction(doc):
+    """Convert ObjectId and datetimes of a prediction document for JSON serialization"""
+    doc['_id'] = str(doc['_id'])
+    doc['created_at'] = doc['created_at'].isoformat()
+    doc['updated_at'] = doc['updated_at'].isoformat()
+    return doc
+
+
+def page_query(user_id, limit, skip=0, cursor=None):
+    """
+    Query and skip for one page of a user's predictions in (created_at, _id)
+    descending order; a cursor replaces the skip.
+
+    Raises:
+        ValueError: If limit is below 1, skip is negative or the cursor is malformed
+    """
+    if limit < 1:
+        raise ValueError('limit must be at least 1')
+    if skip < 0:
+        raise ValueError('skip must not be negative')
+    query = {'user_id': user_id}
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        query['$or'] = [
+            {'created_at': {'$lt': created_at}},
+            {'created_at': created_at, '_id': {'$lt': last_id}}
+        ]
+        skip = 0
+    return query, skip
+
+
+def split_page(docs, limit):
+    """Trim the extra look-ahead document and serialize a page of predictions"""
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1])
+    return {'predictions': [serialize_prediction(doc) for doc in docs], 'next_cursor': next_cursor}
+
+
+# Returned when a user has no predictions (or stats can't be read)
+EMPTY_STATS = {
+    'total_predictions': 0,
+    'latest_prediction_date': None,
+    'average_power': 0,
+    'max_power': 0,
+    'min_power': 0
+}
+
+
+def stats_from_rollup(totals):
+    """Prediction statistics from a user's 'all' rollup document (or None)"""
+    if not totals or totals['count'] <= 0:
+        return dict(EMPTY_STATS)
+    return {
+        'total_predictions': totals['count'],
+        'latest_prediction_date': totals['latest_created_at'].isoformat(),
+        'average_power': round(totals['total'] / totals['count'], 2),
+        'max_power': round(totals['max'], 2),
+        'min_power': round(totals['min'], 2)
+    }
+
+
+def stats_pipeline(user_id):
+    """$group pipeline for the average/max/min predicted power of a user"""
+    return [
+        {'$match': {'user_id': user_id}},
+        {'$group': {
+            '_id': None,
+            'avg_power': {'$avg': '$prediction.predicted_power_generated'},
+            'max_power': {'$max': '$prediction.predicted_power_generated'},
+            'min_power': {'$min': '$prediction.predicted_power_generated'}
+        }}
+    ]
+
+
+def stats_from_scan(total_predictions, latest_prediction, stats_result):
+    stats = stats_result[0] if stats_result else {}
+    return {
+        'total_predictions': total_predictions,
+        'latest_prediction_date': latest_prediction['created_at'].isoformat() if latest_prediction else None,
+        'average_power': round(stats.get('avg_power', 0), 2),
+        'max_power': round(stats.get('max_power', 0), 2),
+        'min_power': round(stats.get('min_power', 0), 2)
+    }
+
+
 class PredictionModel:
     """Model for managing solar power predictions in MongoDB"""
     
@@ -17,6 +134,11 @@ class PredictionModel:
     def create_prediction(user_id, input_data, prediction_result):
         """
         Create a new prediction record
+
+        With SOLAR_PREDICTION_WRITE_BEHIND enabled the document is given a
+        client-side ObjectId and queued for a batched background insert
+        instead of being inserted before returning. The user's rollups are
+        updated once the document has been written.
         
         Args:
             user_id (str): User ID who made the prediction
@@ -27,8 +149,6 @@ class PredictionModel:
             str: Prediction ID if successful, None if failed
         """
         try:
-            collection = PredictionModel.get_collection()
-            
             prediction_doc = {
                 'user_id': user_id,
                 'input_data': {
@@ -53,8 +173,22 @@ class PredictionModel:
                 'updated_at': datetime.utcnow()
             }
             
+            if settings.SOLAR_PREDICTION_WRITE_BEHIND:
+                from .write_behind import get_prediction_writer
+                prediction_id = get_prediction_writer().enqueue(prediction_doc)
+                if prediction_id is None:
+                    return None
+                logger.info(f"Prediction queued for user {user_id}: {prediction_id}")
+                return str(prediction_id)
+
+            collection = PredictionModel.get_collection()
             result = collection.insert_one(prediction_doc)
             logger.info(f"Prediction created successfully for user {user_id}: {result.inserted_id}")
+            if rollups.rollups_maintained():
+                try:
+                    rollups.apply_created([prediction_doc])
+                except Exception as e:
+                    logger.error(f"Failed to update prediction rollups for user {user_id}: {e}")
             return str(result.inserted_id)
             
         except Exception as e:
@@ -97,6 +231,46 @@ class PredictionModel:
             logger.error(f"Failed to get predictions for user {user_id}: {e}")
             return []
     
+    @staticmethod
+    def get_user_predictions_page(user_id, limit=10, skip=0, cursor=None):
+        """
+        Get one page of a user's predictions using keyset pagination on (created_at, _id)
+
+        Unlike skip/limit, the cost of a page does not grow with its depth:
+        the query seeks straight to the cursor position on the
+        {user_id, created_at, _id} index.
+
+        Args:
+            user_id (str): User ID
+            limit (int): Maximum number of predictions to return
+            skip (int): Offset, only used when no cursor is given (backward compatibility)
+            cursor (str): next_cursor from the previous page
+
+        Returns:
+            dict: {'predictions': [...], 'next_cursor': str or None}
+
+        Raises:
+            ValueError: If limit or skip is out of range or the cursor is malformed
+        """
+        query, skip = page_query(user_id, limit, skip=skip, cursor=cursor)
+
+        try:
+            collection = PredictionModel.get_collection()
+
+            # Fetch one extra document to know whether there is a next page
+            docs = list(collection.find(query).sort(
+                [('created_at', -1), ('_id', -1)]
+            ).skip(skip).limit(limit + 1))
+            page = split_page(docs, limit)
+            predictions = page['predictions']
+
+            logger.info(f"Retrieved {len(predictions)} predictions for user {user_id}")
+            return page
+
+        except Exception as e:
+            logger.error(f"Failed to get predictions for user {user_id}: {e}")
+            return {'predictions': [], 'next_cursor': None}
+
     @staticmethod
     def get_user_latest_prediction(user_id):
         """
@@ -147,13 +321,18 @@ class PredictionModel:
             collection = PredictionModel.get_collection()
             
             # Delete only if the prediction belongs to the user
-            result = collection.delete_one({
-                '_id': ObjectId(prediction_id),
-                'user_id': user_id
-            })
+            deleted = collection.find_one_and_delete(
+                {'_id': ObjectId(prediction_id), 'user_id': user_id},
+                projection={'user_id': 1, 'created_at': 1, 'prediction.predicted_power_generated': 1}
+            )
             
-            if result.deleted_count > 0:
+            if deleted is not None:
                 logger.info(f"Prediction {prediction_id} deleted for user {user_id}")
+                if rollups.rollups_maintained():
+                    try:
+                        rollups.apply_deleted(deleted)
+                    except Exception as e:
+                        logger.error(f"Failed to update prediction rollups for user {user_id}: {e}")
                 return True
             else:
                 logger.warning(f"Prediction {prediction_id} not found or not owned by user {user_id}")
@@ -167,6 +346,9 @@ class PredictionModel:
     def get_user_prediction_stats(user_id):
         """
         Get prediction statistics for a user
+
+        With SOLAR_PREDICTION_ROLLUPS = 'read' this is a single lookup of the
+        user's precomputed rollup instead of a scan of their predictions.
         
         Args:
             user_id (str): User ID
@@ -175,6 +357,9 @@ class PredictionModel:
             dict: Statistics about user's predictions
         """
         try:
+            if rollups.rollups_readable():
+                return stats_from_rollup(rollups.get_user_totals(user_id))
+
             collection = PredictionModel.get_collection()
             
             # Count total predictions
@@ -188,33 +373,78 @@ class PredictionModel:
             )
             
             # Calculate average predicted power
-            pipeline = [
-                {'$match': {'user_id': user_id}},
-                {'$group': {
-                    '_id': None,
-                    'avg_power': {'$avg': '$prediction.predicted_power_generated'},
-                    'max_power': {'$max': '$prediction.predicted_power_generated'},
-                    'min_power': {'$min': '$prediction.predicted_power_generated'}
-                }}
-            ]
-            
-            stats_result = list(collection.aggregate(pipeline))
-            stats = stats_result[0] if stats_result else {}
-            
-            return {
-                'total_predictions': total_predictions,
-                'latest_prediction_date': latest_prediction['created_at'].isoformat() if latest_prediction else None,
-                'average_power': round(stats.get('avg_power', 0), 2),
-                'max_power': round(stats.get('max_power', 0), 2),
-                'min_power': round(stats.get('min_power', 0), 2)
-            }
+            stats_result = list(collection.aggregate(stats_pipeline(user_id)))
+            return stats_from_scan(total_predictions, latest_prediction, stats_result)
             
         except Exception as e:
             logger.error(f"Failed to get prediction stats for user {user_id}: {e}")
-            return {
-                'total_predictions': 0,
-                'latest_prediction_date': None,
-                'average_power': 0,
-                'max_power': 0,
-                'min_power': 0
-            }
\ No newline at end of file
+            return dict(EMPTY_STATS)
+
+class AsyncPredictionModel:
+    """
+    Async counterparts of the PredictionModel read queries, on the motor
+    client (MongoDBConnection.get_async_collection). Used by the async
+    dashboard views; results have the same shape as the sync methods.
+    """
+
+    @staticmethod
+    def get_collection():
+        return get_async_predictions_collection()
+
+    @staticmethod
+    async def get_user_predictions_page(user_id, limit=10, skip=0, cursor=None):
+        """
+        Async PredictionModel.get_user_predictions_page
+
+        Raises:
+            ValueError: If limit or skip is out of range or the cursor is malformed
+        """
+        query, skip = page_query(user_id, limit, skip=skip, cursor=cursor)
+
+        try:
+            collection = AsyncPredictionModel.get_collection()
+            docs = await collection.find(query).sort(
+                [('created_at', -1), ('_id', -1)]
+            ).skip(skip).limit(limit + 1).to_list(length=limit + 1)
+            return split_page(docs, limit)
+
+        except Exception as e:
+            logger.error(f"Failed to get predictions for user {user_id}: {e}")
+            return {'predictions': [], 'next_cursor': None}
+
+    @staticmethod
+    async def get_user_latest_prediction(user_id):
+        """Async PredictionModel.get_user_latest_prediction"""
+        try:
+            collection = AsyncPredictionModel.get_collection()
+            doc = await collection.find_one({'user_id': user_id}, sort=[('created_at', -1)])
+            return serialize_prediction(doc) if doc else None
+
+        except Exception as e:
+            logger.error(f"Failed to get latest prediction for user {user_id}: {e}")
+            return None
+
+    @staticmethod
+    async def get_user_prediction_stats(user_id):
+        """
+        Async PredictionModel.get_user_prediction_stats; the count, latest
+        date and $group aggregation are issued concurrently.
+        """
+        try:
+            if rollups.rollups_readable():
+                totals = await get_async_rollups_collection().find_one(
+                    {'_id': rollups.rollup_id(user_id, rollups.TOTAL_PERIOD)}
+                )
+                return stats_from_rollup(totals)
+
+            collection = AsyncPredictionModel.get_collection()
+            total_predictions, latest_prediction, stats_result = await asyncio.gather(
+                collection.count_documents({'user_id': user_id}),
+                collection.find_one({'user_id': user_id}, sort=[('created_at', -1)], projection={'created_at': 1}),
+                collection.aggregate(stats_pipeline(user_id)).to_list(length=1)
+            )
+            return stats_from_scan(total_predictions, latest_prediction, stats_result)
+
+        except Exception as e:
+            logger.error(f"Failed to get prediction stats for user {user_id}: {e}")
+            return dict(EMPTY_STATS)
@@ -0,0 +1,239 @@
+import math
+import threading
+from collections import OrderedDict
+from django.conf import settings
+import logging
+
+from .inference import sweep
+from .model_registry import get_model_registry
+
+logger = logging.getLogger(__name__)
+
+# Step each site parameter is rounded to before searching, so nearby inputs
+# share one cache entry. Parameters not listed (cloud_cover, city, date, time)
+# are used as given.
+QUANTA = {
+    'tilt': 1.0,
+    'azimuth': 1.0,
+    'ghi': 50.0,
+    'dni': 50.0,
+    'temperature': 2.0,
+    'humidity': 5.0,
+    'wind_speed': 1.0,
+    'power_consumed': 0.5,
+}
+
+# Parameters rounded to a number of significant digits instead, because a
+# fixed step would be too coarse for small sites (2 m2 -> 0) or too fine for
+# large ones
+SIGNIFICANT_DIGITS = {'panel_area': 2}
+
+# Coarse grid over the whole valid range, then a finer one around the coarse optimum
+COARSE_GRID = {
+    'tilt': {'start': 0, 'stop': 90, 'step': 10},
+    'azimuth': {'start': 0, 'stop': 360, 'step': 30},
+}
+REFINE_SPAN = {'tilt': (10, 1), 'azimuth': (30, 3)}  # (+/- half width, step)
+LIMITS = {'tilt': (0, 90), 'azimuth': (0, 360)}
+MAX_POINTS = 1000
+
+
+def round_significant(value, digits):
+    """Round value to the given number of significant digits"""
+    if value == 0 or not math.isfinite(value):
+        return value
+    return round(value, digits - 1 - math.floor(math.log10(abs(value))))
+
+
+def quantize(params):
+    """
+    Round the site parameters to their QUANTA steps or SIGNIFICANT_DIGITS.
+
+    Returns:
+        dict: The quantized parameters, or None if a quantized parameter is
+        missing or not a number
+    """
+    quantized = dict(params)
+    for param, step in QUANTA.items():
+        if param not in params:
+            continue
+        try:
+            quantized[param] = round(float(params[param]) / step) * step
+        except (TypeError, ValueError):
+            return None
+    for param, digits in SIGNIFICANT_DIGITS.items():
+        if param not in params:
+            continue
+        try:
+            quantized[param] = round_significant(float(params[param]), digits)
+        except (TypeError, ValueError):
+            return None
+    if 'tilt' not in quantized or 'azimuth' not in quantized:
+        return None
+    return quantized
+
+
+def cache_key(version, params):
+    """Hashable key for a model version and quantized parameters"""
+    return (version, tuple(sorted((param, str(value)) for param, value in params.items())))
+
+
+def search_orientation(model, params):
+    """
+    Find the tilt and azimuth with the highest predicted output for a site.
+
+    Scores a coarse grid over the full range, then a finer grid around its
+    best point (one model call each), and finally the 2x2 grid of
+    current/optimal tilt and azimuth so each change can be credited
+    separately.
+
+    Args:
+        model: Fitted pipeline
+        params (dict): Prediction parameters, current tilt and azimuth included
+
+    Returns:
+        dict: optimal_tilt, optimal_azimuth and the predicted kW at the
+        current orientation ('current'), with only the tilt changed
+        ('tilt_only'), only the azimuth changed ('azimuth_only') and both
+        ('optimal')
+
+    Raises:
+        ValueError: If params are not a valid prediction input
+    """
+    best = sweep(model, params, COARSE_GRID, MAX_POINTS)['best']
+
+    refine = {}
+    for param, (half_width, step) in REFINE_SPAN.items():
+        low, high = LIMITS[param]
+        refine[param] = {
+            'start': max(low, best[param] - half_width),
+            'stop': min(high, best[param] + half_width),
+            'step': step,
+        }
+    best = sweep(model, params, refine, MAX_POINTS)['best']
+
+    current_tilt, current_azimuth = float(params['tilt']), float(params['azimuth'])
+    surface = sweep(
+        model, params,
+        {'tilt': [current_tilt, best['tilt']], 'azimuth': [current_azimuth, best['azimuth']]},
+        MAX_POINTS
+    )['surface']
+    return {
+        'optimal_tilt': best['tilt'],
+        'optimal_azimuth': best['azimuth'],
+        'current': surface[0][0],
+        'tilt_only': surface[1][0],
+        'azimuth_only': surface[0][1],
+        'optimal': surface[1][1],
+    }
+
+
+class OrientationCache:
+    """
+    Bounded LRU cache of search_orientation results keyed by (model version,
+    quantized site parameters), so dashboard reloads don't repeat the search.
+
+    Results never go stale for a given model version, and entries of several
+    versions can coexist (e.g. pinned requests during a rollout).
+    live_versions, if given, returns the versions still loaded; entries of any
+    other version are dropped at the next insert once it changes, rather than
+    waiting for LRU eviction.
+    """
+
+    def __init__(self, max_size=2048, live_versions=None):
+        self.max_size = max_size
+        self.live_versions = live_versions
+        self._entries = OrderedDict()
+        self._live = None
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def get(self, key):
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return result
+
+    def _drop_retired_versions(self):
+        """Drop entries of versions no longer loaded (called with the lock held)"""
+        if self.live_versions is None:
+            return
+        live = tuple(self.live_versions())
+        if live == self._live:
+            return
+        self._live = live
+        stale = [k for k in self._entries if k[0] not in live]
+        for k in stale:
+            del self._entries[k]
+        self._stats['invalidations'] += len(stale)
+
+    def set(self, key, result):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._drop_retired_versions()
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Counters, current size and hit rate (hits / lookups)"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_orientation_cache = None
+_orientation_cache_lock = threading.Lock()
+
+
+def get_orientation_cache():
+    """Return the process-wide optimal orientation cache."""
+    global _orientation_cache
+    if _orientation_cache is None:
+        with _orientation_cache_lock:
+            if _orientation_cache is None:
+                _orientation_cache = OrientationCache(
+                    max_size=settings.SOLAR_ORIENTATION_CACHE_SIZE,
+                    live_versions=get_model_registry().versions,
+                )
+    return _orientation_cache
+
+
+def optimal_orientation(handle, params):
+    """
+    Cached search_orientation for the given model handle.
+
+    Returns:
+        dict: See search_orientation, or None when the model is not loaded
+        (the fallback formula ignores orientation) or params are unusable
+    """
+    if not handle.available:
+        return None
+    quantized = quantize(params)
+    if quantized is None:
+        return None
+    cache = get_orientation_cache()
+    key = cache_key(handle.version, quantized)
+    result = cache.get(key)
+    if result is None:
+        try:
+            result = search_orientation(handle.predictor, quantized)
+        except ValueError as e:
+            logger.warning(f"Cannot search optimal orientation: {e}")
+            return None
+        cache.set(key, result)
+    return result
@@ -0,0 +1,47 @@
+import codecs
+import csv
+import json
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class CSVParser(BaseParser):
+    """
+    Parses a CSV body with a header row into a list of dicts.
+    Empty cells are returned as None so they count as missing parameters.
+    """
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            reader = csv.DictReader(codecs.getreader(encoding)(stream))
+            return [
+                {key: (value if value != '' else None) for key, value in row.items() if key is not None}
+                for row in reader
+            ]
+        except (csv.Error, UnicodeDecodeError) as e:
+            raise ParseError(f'CSV parse error - {e}')
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parses newline-delimited JSON (one object per line) into a list.
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        rows = []
+        line_number = 0
+        try:
+            for line_number, line in enumerate(codecs.getreader(encoding)(stream), start=1):
+                line = line.strip()
+                if line:
+                    rows.append(json.loads(line))
+        except ValueError as e:
+            raise ParseError(f'NDJSON parse error on line {line_number} - {e}')
+        return rows
@@ -0,0 +1,196 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+import logging
+
+from .inference import FEATURE_COLUMNS
+from .model_registry import get_model_registry
+
+logger = logging.getLogger(__name__)
+
+
+def canonicalize(params, quanta):
+    """
+    Canonical form of a validated parameter set.
+
+    Numbers become floats, rounded to their quanta step when one is
+    configured (otherwise to 6 decimals, so 30 and 30.0 match); other values
+    become strings.
+
+    Returns:
+        dict: The canonical parameters, keyed like FEATURE_COLUMNS
+    """
+    canonical = {}
+    for param in FEATURE_COLUMNS:
+        value = params[param]
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            step = quanta.get(param)
+            value = round(float(value) / step) * step if step else float(value)
+            canonical[param] = round(value, 6)
+        else:
+            canonical[param] = str(value)
+    return canonical
+
+
+class PredictionCache:
+    """
+    LRU cache of single predictions with a per-entry TTL, keyed by model
+    version plus the canonicalized (optionally quantized) inputs.
+
+    With quanta configured, the model is run on the quantized inputs, so an
+    entry's value depends only on its key. Entries of several versions can
+    coexist (e.g. pinned requests during a rollout); live_versions, if given,
+    returns the versions still loaded, and entries of any other version are
+    dropped once it changes. With a shared backend (a Django cache alias,
+    e.g. file-based or Redis) the version in the key keeps workers from
+    serving another version's results.
+    """
+
+    def __init__(self, max_size=4096, ttl=300.0, quanta=None, shared=None, live_versions=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.quanta = quanta or {}
+        self.shared = shared
+        self.live_versions = live_versions
+        self._entries = OrderedDict()
+        self._live = None
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0, 'shared_hits': 0, 'misses': 0, 'expired': 0,
+            'evictions': 0, 'invalidations': 0, 'bypasses': 0,
+        }
+
+    @property
+    def enabled(self):
+        return self.max_size > 0 and self.ttl > 0
+
+    def _key(self, version, canonical):
+        return (version, tuple(canonical[param] for param in FEATURE_COLUMNS))
+
+    def _shared_key(self, key):
+        digest = hashlib.sha1(json.dumps(key[1]).encode('utf-8')).hexdigest()
+        return f'prediction:{key[0]}:{digest}'
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _get_local(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._stats['expired'] += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _drop_retired_versions(self):
+        """Drop entries of versions no longer loaded (called with the lock held)"""
+        if self.live_versions is None:
+            return
+        live = tuple(self.live_versions())
+        if live == self._live:
+            return
+        self._live = live
+        stale = [k for k in self._entries if k[0] not in live]
+        for k in stale:
+            del self._entries[k]
+        self._stats['invalidations'] += len(stale)
+
+    def _set_local(self, key, value):
+        with self._lock:
+            self._drop_retired_versions()
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def predict(self, version, params, compute, bypass=False):
+        """
+        Return (prediction, status) for params, computing it on a miss.
+
+        Args:
+            version (str): Model version that would serve the prediction
+            params (dict): Validated parameters, optional ones included
+            compute (callable): Runs the model on a parameter dict
+            bypass (bool): Skip the lookup; the fresh value is still stored
+
+        Returns:
+            tuple: (float, 'hit' | 'miss' | 'bypass' | 'disabled')
+        """
+        if not self.enabled or version is None:
+            return compute(params), 'disabled'
+
+        canonical = canonicalize(params, self.quanta)
+        key = self._key(version, canonical)
+        if bypass:
+            self._count('bypasses')
+        else:
+            value = self._get_local(key)
+            if value is not None:
+                self._count('hits')
+                return value, 'hit'
+            if self.shared is not None:
+                try:
+                    value = self.shared.get(self._shared_key(key))
+                except Exception as e:
+                    logger.warning(f"Shared prediction cache lookup failed: {e}")
+                if value is not None:
+                    self._count('shared_hits')
+                    self._set_local(key, value)
+                    return value, 'hit'
+            self._count('misses')
+
+        quantized = {param: canonical[param] for param in self.quanta if param in canonical}
+        value = compute({**params, **quantized})
+        self._set_local(key, value)
+        if self.shared is not None:
+            try:
+                self.shared.set(self._shared_key(key), value, self.ttl)
+            except Exception as e:
+                logger.warning(f"Shared prediction cache store failed: {e}")
+        return value, 'bypass' if bypass else 'miss'
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Counters, current size and hit rate (local + shared hits / lookups)"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        hits = stats['hits'] + stats['shared_hits']
+        lookups = hits + stats['misses']
+        stats['hit_rate'] = round(hits / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_prediction_cache = None
+_prediction_cache_lock = threading.Lock()
+
+
+def get_prediction_cache():
+    """Return the process-wide prediction cache."""
+    global _prediction_cache
+    if _prediction_cache is None:
+        with _prediction_cache_lock:
+            if _prediction_cache is None:
+                shared_alias = settings.SOLAR_PREDICTION_CACHE_SHARED
+                _prediction_cache = PredictionCache(
+                    max_size=settings.SOLAR_PREDICTION_CACHE_SIZE,
+                    ttl=settings.SOLAR_PREDICTION_CACHE_TTL,
+                    quanta=settings.SOLAR_PREDICTION_CACHE_QUANTA,
+                    shared=caches[shared_alias] if shared_alias else None,
+                    live_versions=get_model_registry().versions,
+                )
+    return _prediction_cache
@@ -0,0 +1,120 @@
+from .model_registry import get_model_registry
+from .orientation import optimal_orientation
+
+# Orientation changes predicted to gain less than this are not recommended
+MIN_GAIN_PERCENT = 1.0
+
+
+def gain_percent(current, improved):
+    """Relative gain of improved over current, in percent (0 if current is not positive)"""
+    if current is None or current <= 0:
+        return 0.0
+    return (improved - current) / current * 100
+
+
+def build_recommendations(latest, handle=None):
+    """
+    Build the recommendation cards for a user.
+
+    Args:
+        latest (dict): The user's latest prediction document, or None
+        handle (ModelHandle): Model used for the tilt/azimuth search;
+            defaults to the active version
+
+    Returns:
+        list: Recommendation dicts (title, current, recommended, improvement,
+        description, priority); never empty
+    """
+    recommendations = []
+
+    if latest and "prediction" in latest and "input_parameters" in latest["prediction"]:
+        params = latest["prediction"]["input_parameters"]
+        predicted_power = latest["prediction"].get("predicted_power_generated")
+        # 1. Low Power Recommendation
+        if predicted_power is not None and predicted_power < 2.0:
+            recommendations.append({
+                "title": "Increase Panel Area",
+                "current": f"{params.get('panel_area', '-')}",
+                "recommended": "Consider adding more panels",
+                "improvement": "+20% potential output",
+                "description": "Your predicted power is low. Increasing the panel area can significantly boost your energy generation.",
+                "priority": "high",
+            })
+        # 2. High Temperature Warning
+        if params.get("temperature") is not None and params["temperature"] > 45:
+            recommendations.append({
+                "title": "High Temperature Detected",
+                "current": f"{params['temperature']}°C",
+                "recommended": "Improve ventilation or shading",
+                "improvement": "+5% efficiency",
+                "description": "High temperatures can reduce panel efficiency. Consider improving airflow or partial shading during peak heat.",
+                "priority": "medium",
+            })
+        # 3. High Humidity Warning
+        if params.get("humidity") is not None and params["humidity"] > 80:
+            recommendations.append({
+                "title": "High Humidity Detected",
+                "current": f"{params['humidity']}%",
+                "recommended": "Regular panel cleaning",
+                "improvement": "+3% efficiency",
+                "description": "High humidity can cause dust and grime to stick to panels. Clean panels more frequently for optimal performance.",
+                "priority": "medium",
+            })
+        # 4./5. Tilt and azimuth: searched with the loaded model for this site
+        orientation = optimal_orientation(handle or get_model_registry().get_active(), params)
+        if orientation is not None:
+            current_tilt, optimal_tilt = float(params["tilt"]), orientation["optimal_tilt"]
+            tilt_gain = gain_percent(orientation["current"], orientation["tilt_only"])
+            if abs(current_tilt - optimal_tilt) > 2 and tilt_gain >= MIN_GAIN_PERCENT:
+                recommendations.append({
+                    "title": "Optimal Tilt Angle",
+                    "current": f"{current_tilt:g}°",
+                    "recommended": f"{optimal_tilt:g}°",
+                    "improvement": f"+{tilt_gain:.0f}% predicted output",
+                    "description": f"For your latest conditions the model predicts the most output with the panels tilted at {optimal_tilt:g}°.",
+                    "priority": "high",
+                })
+            current_azimuth, optimal_azimuth = float(params["azimuth"]), orientation["optimal_azimuth"]
+            azimuth_gain = gain_percent(orientation["current"], orientation["azimuth_only"])
+            if abs(current_azimuth - optimal_azimuth) > 5 and azimuth_gain >= MIN_GAIN_PERCENT:
+                recommendations.append({
+                    "title": "Azimuth Orientation",
+                    "current": f"{current_azimuth:g}°",
+                    "recommended": f"{optimal_azimuth:g}°",
+                    "improvement": f"+{azimuth_gain:.0f}% predicted output",
+                    "description": f"For your latest conditions the model predicts the most output with the panels facing {optimal_azimuth:g}°.",
+                    "priority": "medium",
+                })
+        # 6. Seasonal Adjustment
+        if params.get("tilt") == params.get("azimuth"):
+            recommendations.append({
+                "title": "Seasonal Adjustment",
+                "current": "Fixed",
+                "recommended": "Bi-annual",
+                "improvement": "+12% efficiency",
+                "description": "Adjusting tilt twice yearly (winter: +15°, summer: -15°) optimizes performance.",
+                "priority": "medium",
+            })
+
+    # If no recommendations, provide a more meaningful message or fallback
+    if not recommendations:
+        if latest:
+            recommendations.append({
+                "title": "Great Job!",
+                "current": "All key parameters optimal",
+                "recommended": "Maintain current setup",
+                "improvement": "Max efficiency achieved",
+                "description": "Your solar system is configured for maximum efficiency based on your latest prediction. Keep monitoring for seasonal or environmental changes.",
+                "priority": "low",
+            })
+        else:
+            recommendations.append({
+                "title": "No Prediction Data",
+                "current": "-",
+                "recommended": "Submit a prediction",
+                "improvement": "-",
+                "description": "No prediction data found. Please generate a prediction to receive personalized recommendations.",
+                "priority": "medium",
+            })
+
+    return recommendations
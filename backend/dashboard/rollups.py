@@ -0,0 +1,236 @@
+from datetime import datetime, timedelta
+from django.conf import settings
+from authentication.mongodb import get_predictions_collection, get_rollups_collection
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bucketed rollups kept per user, in the order they are repaired after a delete
+# ('all' last, since it is recomputed from the monthly buckets)
+ROLLUP_PERIODS = ('daily', 'weekly', 'monthly')
+TOTAL_PERIOD = 'all'
+
+
+def rollups_maintained():
+    """True if rollups are updated on every prediction write/delete"""
+    return settings.SOLAR_PREDICTION_ROLLUPS in ('write', 'read')
+
+
+def rollups_readable():
+    """True if stats and exports are served from the rollups"""
+    return settings.SOLAR_PREDICTION_ROLLUPS == 'read'
+
+
+def bucket_start(created_at, period):
+    """Start of the day, week (Monday) or month containing created_at"""
+    day = datetime(created_at.year, created_at.month, created_at.day)
+    if period == 'daily':
+        return day
+    if period == 'weekly':
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def bucket_end(start, period):
+    if period == 'daily':
+        return start + timedelta(days=1)
+    if period == 'weekly':
+        return start + timedelta(days=7)
+    return (start + timedelta(days=32)).replace(day=1)
+
+
+def rollup_id(user_id, period, bucket=None):
+    if bucket is None:
+        return f'{user_id}:{period}'
+    return f'{user_id}:{period}:{bucket.isoformat()}'
+
+
+def _buckets(created_at):
+    for period in ROLLUP_PERIODS:
+        yield period, bucket_start(created_at, period)
+    yield TOTAL_PERIOD, None
+
+
+def _prediction_value(doc):
+    value = doc.get('prediction', {}).get('predicted_power_generated')
+    return float(value) if value is not None else 0.0
+
+
+def _group(docs):
+    """Combine prediction documents into {(user_id, period, bucket): totals}"""
+    grouped = {}
+    for doc in docs:
+        value = _prediction_value(doc)
+        created_at = doc['created_at']
+        for period, bucket in _buckets(created_at):
+            key = (doc['user_id'], period, bucket)
+            entry = grouped.get(key)
+            if entry is None:
+                grouped[key] = {'count': 1, 'total': value, 'min': value, 'max': value, 'latest_created_at': created_at}
+                continue
+            entry['count'] += 1
+            entry['total'] += value
+            entry['min'] = min(entry['min'], value)
+            entry['max'] = max(entry['max'], value)
+            entry['latest_created_at'] = max(entry['latest_created_at'], created_at)
+    return grouped
+
+
+def apply_created(docs):
+    """
+    Add newly written predictions to their rollups with a single unordered
+    bulk write ($inc count/total, $min/$max extremes, upserting new buckets).
+    """
+    from pymongo import UpdateOne
+
+    now = datetime.utcnow()
+    requests = [
+        UpdateOne(
+            {'_id': rollup_id(user_id, period, bucket)},
+            {
+                '$inc': {'count': entry['count'], 'total': entry['total']},
+                '$min': {'min': entry['min']},
+                '$max': {'max': entry['max'], 'latest_created_at': entry['latest_created_at']},
+                '$set': {'updated_at': now},
+                '$setOnInsert': {'user_id': user_id, 'period': period, 'bucket': bucket},
+            },
+            upsert=True
+        )
+        for (user_id, period, bucket), entry in _group(docs).items()
+    ]
+    if requests:
+        get_rollups_collection().bulk_write(requests, ordered=False)
+
+
+def _recompute_bucket(user_id, period, bucket):
+    """
+    Recompute one rollup exactly after a delete removed one of its extremes.
+    Period buckets rescan their (bounded) range of predictions; the 'all'
+    rollup is rebuilt from the monthly rollups.
+    """
+    rollups = get_rollups_collection()
+    if period == TOTAL_PERIOD:
+        pipeline = [
+            {'$match': {'user_id': user_id, 'period': 'monthly', 'count': {'$gt': 0}}},
+            {'$group': {
+                '_id': None,
+                'min': {'$min': '$min'},
+                'max': {'$max': '$max'},
+                'latest_created_at': {'$max': '$latest_created_at'}
+            }}
+        ]
+        source = rollups
+    else:
+        pipeline = [
+            {'$match': {
+                'user_id': user_id,
+                'created_at': {'$gte': bucket, '$lt': bucket_end(bucket, period)}
+            }},
+            {'$group': {
+                '_id': None,
+                'min': {'$min': {'$ifNull': ['$prediction.predicted_power_generated', 0]}},
+                'max': {'$max': {'$ifNull': ['$prediction.predicted_power_generated', 0]}},
+                'latest_created_at': {'$max': '$created_at'}
+            }}
+        ]
+        source = get_predictions_collection()
+
+    result = list(source.aggregate(pipeline))
+    if result:
+        fields = {name: result[0][name] for name in ('min', 'max', 'latest_created_at')}
+        rollups.update_one({'_id': rollup_id(user_id, period, bucket)}, {'$set': fields})
+
+
+def apply_deleted(doc):
+    """
+    Remove a deleted prediction from its rollups: $inc the count and total
+    down, drop buckets that became empty, and recompute min/max/latest only
+    when the deleted prediction was one of them.
+    """
+    from pymongo import ReturnDocument
+
+    rollups = get_rollups_collection()
+    value = _prediction_value(doc)
+    for period, bucket in _buckets(doc['created_at']):
+        _id = rollup_id(doc['user_id'], period, bucket)
+        rollup = rollups.find_one_and_update(
+            {'_id': _id},
+            {'$inc': {'count': -1, 'total': -value}, '$set': {'updated_at': datetime.utcnow()}},
+            return_document=ReturnDocument.AFTER
+        )
+        if rollup is None:
+            continue
+        if rollup['count'] <= 0:
+            rollups.delete_one({'_id': _id, 'count': {'$lte': 0}})
+        elif value <= rollup['min'] or value >= rollup['max'] or doc['created_at'] >= rollup['latest_created_at']:
+            _recompute_bucket(doc['user_id'], period, bucket)
+
+
+def rebuild(user_id=None, batch_size=1000):
+    """
+    Recompute the rollups of one user (or every user) from their predictions.
+
+    Each bucket is overwritten in place with a $set upsert rather than
+    deleted and re-inserted, so readers never see a user without rollups and
+    apply_created calls racing the rebuild are not wiped out between a delete
+    and an insert. Afterwards the user's buckets that no longer have
+    predictions are removed, and a full rebuild also drops the rollups of
+    users without predictions; buckets updated since the rebuild started are
+    kept in both cases.
+
+    Returns:
+        dict: user_id -> number of predictions rolled up (0 for users whose
+        stale rollups were dropped)
+    """
+    from pymongo import UpdateOne
+
+    predictions = get_predictions_collection()
+    rollups = get_rollups_collection()
+    rebuild_started = datetime.utcnow()
+    user_ids = [user_id] if user_id is not None else predictions.distinct('user_id')
+
+    rebuilt = {}
+    for uid in user_ids:
+        started = datetime.utcnow()
+        cursor = predictions.find(
+            {'user_id': uid},
+            projection={'_id': 0, 'user_id': 1, 'created_at': 1, 'prediction.predicted_power_generated': 1}
+        ).batch_size(batch_size)
+        grouped = _group(cursor)
+        now = datetime.utcnow()
+        buckets = {
+            rollup_id(uid, period, bucket): dict(entry, user_id=uid, period=period, bucket=bucket, updated_at=now)
+            for (_, period, bucket), entry in grouped.items()
+        }
+        if buckets:
+            rollups.bulk_write(
+                [UpdateOne({'_id': _id}, {'$set': fields}, upsert=True) for _id, fields in buckets.items()],
+                ordered=False
+            )
+        rollups.delete_many({'user_id': uid, '_id': {'$nin': list(buckets)}, 'updated_at': {'$lt': started}})
+        rebuilt[uid] = grouped.get((uid, TOTAL_PERIOD, None), {}).get('count', 0)
+        logger.info(f"Rebuilt {len(buckets)} prediction rollups for user {uid}")
+
+    if user_id is None:
+        known = set(user_ids)
+        orphaned = [uid for uid in rollups.distinct('user_id') if uid not in known]
+        if orphaned:
+            rollups.delete_many({'user_id': {'$in': orphaned}, 'updated_at': {'$lt': rebuild_started}})
+            rebuilt.update(dict.fromkeys(orphaned, 0))
+            logger.info(f"Dropped prediction rollups of {len(orphaned)} users without predictions")
+    return rebuilt
+
+
+def get_user_totals(user_id):
+    """The 'all' rollup of a user: count, total, min, max and latest_created_at, or None"""
+    return get_rollups_collection().find_one({'_id': rollup_id(user_id, TOTAL_PERIOD)})
+
+
+def iter_period_totals(user_id, period):
+    """Yield (bucket start, total predicted power) for a user's non-empty buckets, oldest first"""
+    cursor = get_rollups_collection().find(
+        {'user_id': user_id, 'period': period, 'count': {'$gt': 0}},
+        projection={'_id': 0, 'bucket': 1, 'total': 1}
+    ).sort('bucket', 1)
+    for doc in cursor:
+        yield doc['bucket'], doc['total']
@@ -1,3 +1,684 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from datetime import datetime
+from io import StringIO
+from types import SimpleNamespace
 
-# Create your tests here.
+import joblib
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from authentication.mongodb import MongoDBConnection, get_historical_collection, get_predictions_collection
+from . import async_views, exports
+from .compiled_model import CompiledPipeline, export_compiled
+from .exports import iter_report_rows, stream_csv_report
+from .featurizer import get_featurizer
+from .indexes import INDEX_SPECS, ensure_indexes, index_report
+from .inference import FEATURE_COLUMNS, forecast, predict_batch, predict_one, sweep
+from .model_registry import ModelRegistry, get_model_registry
+from .models import PredictionModel, decode_cursor, encode_cursor
+from .orientation import OrientationCache, quantize, search_orientation
+from .prediction_cache import PredictionCache
+from .rollups import bucket_end, bucket_start, rebuild, rollup_id
+from .views import latest_dates_pipeline, predict_solar_power_forecast
+from .write_behind import WriteBehindWriter
+
+DATASET_PATH = os.path.join(settings.BASE_DIR, 'models', 'gujarat_dataset_preprocessed.csv')
+SOLAR_MODEL = get_model_registry().get_active().model
+
+VALID_ROW = {
+    'panel_area': 50.0,
+    'tilt': 30.0,
+    'azimuth': 180.0,
+    'ghi': 800.0,
+    'dni': 700.0,
+    'temperature': 25.0,
+    'humidity': 60.0,
+    'wind_speed': 5.0,
+    'cloud_cover': 'Fluffy white clouds',
+}
+
+
+class PredictBatchTests(SimpleTestCase):
+    def test_results_keep_input_order_with_per_row_errors(self):
+        rows = [
+            VALID_ROW,
+            {**VALID_ROW, 'humidity': 120},
+            {k: v for k, v in VALID_ROW.items() if k != 'tilt'},
+            {**VALID_ROW, 'ghi': 'bright'},
+            'not a row',
+            {**VALID_ROW, 'ghi': '400'},
+        ]
+        results = predict_batch(None, rows)
+
+        self.assertEqual([r['index'] for r in results], list(range(len(rows))))
+        self.assertAlmostEqual(results[0]['predicted_power_generated'], 800 / 1000 * 50 * 0.2 * 0.94)
+        self.assertEqual(results[1]['error'], 'Humidity must be between 0 and 100')
+        self.assertEqual(results[2]['error'], "Missing required parameters: ['tilt']")
+        self.assertIn('ghi', results[3]['error'])
+        self.assertIn('error', results[4])
+        self.assertAlmostEqual(results[5]['predicted_power_generated'], results[0]['predicted_power_generated'] / 2)
+
+    def test_invalid_cloud_cover(self):
+        results = predict_batch(None, [{**VALID_ROW, 'cloud_cover': 'Overcast'}])
+        self.assertTrue(results[0]['error'].startswith('Invalid cloud cover type'))
+
+    def test_rejects_malformed_dates_times_and_non_finite_numbers(self):
+        rows = [
+            {**VALID_ROW, 'time': ['12:00']},
+            {**VALID_ROW, 'date': '2025-02-30'},
+            {**VALID_ROW, 'time': '9:5'},
+            {**VALID_ROW, 'date': 20250315},
+            {**VALID_ROW, 'ghi': 'inf'},
+            {**VALID_ROW, 'temperature': float('-inf')},
+            {**VALID_ROW, 'date': '2025-03-16', 'time': '06:30'},
+        ]
+        results = predict_batch(SOLAR_MODEL, rows)
+
+        self.assertEqual([r.get('error', '')[:40] for r in results[:4]],
+                         ['Invalid parameter value: time must be a ', 'Invalid parameter value: date must be a '] * 2)
+        self.assertEqual(results[4]['error'], 'Invalid parameter value: ghi must be a finite number')
+        self.assertIn('temperature', results[5]['error'])
+        self.assertIn('predicted_power_generated', results[6])
+
+
+class ForecastTests(SimpleTestCase):
+    def test_horizon_matches_single_predictions(self):
+        site = {key: VALID_ROW[key] for key in ('panel_area', 'tilt', 'azimuth')}
+        weather = [
+            {**{key: VALID_ROW[key] for key in ('ghi', 'dni', 'temperature', 'humidity', 'wind_speed', 'cloud_cover')},
+             'timestamp': f'2025-03-16T{hour:02d}:00'}
+            for hour in range(0, 24, 2)
+        ]
+        weather[3]['timestamp'] = 'yesterday'
+
+        result = forecast(SOLAR_MODEL, [{'site': site, 'weather': weather}], interval_hours=2)[0]
+
+        self.assertEqual(result['error_count'], 1)
+        self.assertIn('timestamp', result['hours'][3]['error'])
+        hour = result['hours'][6]
+        self.assertEqual((hour['date'], hour['time']), ('2025-03-16', '12:00'))
+        expected = predict_batch(SOLAR_MODEL, [{**VALID_ROW, 'date': '2025-03-16', 'time': '12:00'}])[0]
+        self.assertAlmostEqual(hour['predicted_power_generated'], expected['predicted_power_generated'])
+        self.assertAlmostEqual(hour['energy_kwh'], 2 * hour['predicted_power_generated'])
+        self.assertAlmostEqual(
+            result['total_kwh'], sum(h['energy_kwh'] for h in result['hours'] if 'error' not in h)
+        )
+
+    def test_view_rejects_non_finite_interval(self):
+        site = {key: VALID_ROW[key] for key in ('panel_area', 'tilt', 'azimuth')}
+        weather = [{**{key: value for key, value in VALID_ROW.items() if key not in site}, 'timestamp': '2025-03-16T12:00'}]
+        for interval in ('nan', 'inf', '-1'):
+            with self.subTest(interval=interval):
+                request = APIRequestFactory().post(
+                    '/api/dashboard/forecast/',
+                    {'site': site, 'weather': weather, 'interval_hours': interval}, format='json'
+                )
+                force_authenticate(request, user=SimpleNamespace(id=1, is_authenticated=True))
+                response = predict_solar_power_forecast(request)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.data['error'], 'interval_hours must be a positive number')
+
+
+class SweepTests(SimpleTestCase):
+    def test_surface_matches_single_predictions(self):
+        base = {key: value for key, value in VALID_ROW.items() if key != 'tilt'}
+        grid = {'tilt': {'start': 0, 'stop': 60, 'step': 15}, 'azimuth': [90, 180, 270]}
+
+        result = sweep(SOLAR_MODEL, base, grid, max_points=100)
+
+        self.assertEqual(result['grid']['tilt'], [0, 15, 30, 45, 60])
+        self.assertEqual(result['point_count'], 15)
+        self.assertEqual((len(result['surface']), len(result['surface'][0])), (5, 3))
+        expected = predict_batch(SOLAR_MODEL, [{**VALID_ROW, 'tilt': 45, 'azimuth': 270}])[0]
+        self.assertAlmostEqual(result['surface'][3][2], expected['predicted_power_generated'])
+        self.assertEqual(result['best']['predicted_power_generated'], np.max(result['surface']))
+
+    def test_rejects_oversized_and_out_of_range_grids(self):
+        with self.assertRaisesRegex(ValueError, 'at most'):
+            sweep(SOLAR_MODEL, VALID_ROW, {'tilt': list(range(10)), 'azimuth': list(range(10))}, max_points=50)
+        with self.assertRaisesRegex(ValueError, 'tilt'):
+            sweep(SOLAR_MODEL, VALID_ROW, {'tilt': [30, 120]}, max_points=50)
+        with self.assertRaisesRegex(ValueError, '^tilt: start, stop and step must be finite'):
+            sweep(SOLAR_MODEL, VALID_ROW, {'tilt': {'start': 0, 'stop': 'inf', 'step': 1}}, max_points=50)
+        with self.assertRaisesRegex(ValueError, '^tilt: start, stop and step must be finite'):
+            sweep(SOLAR_MODEL, VALID_ROW, {'tilt': {'start': 'nan', 'stop': 10, 'step': 1}}, max_points=50)
+        with self.assertRaisesRegex(ValueError, '^tilt: range has more than 50 values$'):
+            sweep(SOLAR_MODEL, VALID_ROW, {'tilt': {'start': 0, 'stop': 10, 'step': 1e-300}}, max_points=50)
+        with self.assertRaisesRegex(ValueError, '^tilt: values must be a flat list'):
+            sweep(SOLAR_MODEL, VALID_ROW, {'tilt': [[10, 20]]}, max_points=50)
+
+
+class PeakedOrientationModel:
+    """Stand-in model whose output peaks at tilt 37, azimuth 200"""
+
+    def predict(self, frame):
+        return 100 - (frame['Tilt (deg)'] - 37) ** 2 / 100 - (frame['Azimuth (deg)'] - 200) ** 2 / 1000
+
+
+class OrientationSearchTests(SimpleTestCase):
+    def test_refinement_finds_the_peak_between_coarse_grid_points(self):
+        result = search_orientation(PeakedOrientationModel(), {**VALID_ROW, 'tilt': 10, 'azimuth': 90})
+
+        self.assertEqual((result['optimal_tilt'], result['optimal_azimuth']), (37, 201))
+        self.assertLess(result['current'], result['tilt_only'])
+        self.assertLess(result['current'], result['azimuth_only'])
+        self.assertAlmostEqual(result['optimal'], 100 - 0.001)
+
+    def test_cache_evicts_lru_and_drops_retired_model_versions(self):
+        live = ['v1']
+        cache = OrientationCache(max_size=3, live_versions=lambda: live)
+        cache.set(('v1', 'a'), 1)
+        cache.set(('v1', 'b'), 2)
+        cache.set(('v1', 'c'), 3)
+        cache.get(('v1', 'a'))
+        cache.set(('v1', 'd'), 4)
+        self.assertIsNone(cache.get(('v1', 'b')))
+        self.assertEqual(cache.get(('v1', 'a')), 1)
+
+        live = ['v1', 'v2']
+        cache.set(('v2', 'a'), 5)
+        self.assertEqual((cache.get(('v1', 'a')), cache.get(('v2', 'a'))), (1, 5))
+        self.assertEqual(cache.stats()['invalidations'], 0)
+
+        live = ['v2']
+        cache.set(('v2', 'b'), 6)
+        self.assertIsNone(cache.get(('v1', 'a')))
+        self.assertEqual(cache.stats()['invalidations'], 2)
+
+    def test_panel_area_keeps_two_significant_digits(self):
+        self.assertEqual([quantize({**VALID_ROW, 'panel_area': area})['panel_area'] for area in (2.34, 17.6, 1234)],
+                         [2.3, 18.0, 1200.0])
+
+
+class PredictionCacheTests(SimpleTestCase):
+    PARAMS = {'city': 0, 'date': '2025-03-15', 'time': '12:00', 'power_consumed': 0.0, **VALID_ROW}
+
+    def setUp(self):
+        self.calls = []
+
+    def compute(self, params):
+        self.calls.append(params)
+        return params['ghi'] / 100
+
+    def test_quantized_inputs_share_an_entry_per_model_version(self):
+        cache = PredictionCache(max_size=10, ttl=60, quanta={'ghi': 10})
+
+        self.assertEqual(cache.predict('v1', {**self.PARAMS, 'ghi': 801}, self.compute), (8.0, 'miss'))
+        self.assertEqual(cache.predict('v1', {**self.PARAMS, 'ghi': 799.0}, self.compute), (8.0, 'hit'))
+        self.assertEqual(cache.predict('v1', self.PARAMS, self.compute, bypass=True), (8.0, 'bypass'))
+        self.assertEqual(self.calls[0]['ghi'], 800)
+
+        self.assertEqual(cache.predict('v2', self.PARAMS, self.compute)[1], 'miss')
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['bypasses']), (1, 2, 1))
+        self.assertEqual(stats['size'], 2)
+
+    def test_pinned_versions_coexist_until_retired(self):
+        live = ['v1', 'v2']
+        cache = PredictionCache(max_size=10, ttl=60, live_versions=lambda: live)
+        statuses = [cache.predict(version, self.PARAMS, self.compute)[1] for version in ['v1', 'v2'] * 3]
+        self.assertEqual(statuses, ['miss', 'miss', 'hit', 'hit', 'hit', 'hit'])
+
+        live = ['v2', 'v3']
+        cache.predict('v3', self.PARAMS, self.compute)
+        stats = cache.stats()
+        self.assertEqual((stats['invalidations'], stats['size']), (1, 2))
+        self.assertEqual(cache.predict('v2', self.PARAMS, self.compute)[1], 'hit')
+
+    def test_shared_backend_serves_other_workers(self):
+        shared = caches['default']
+        self.addCleanup(shared.clear)
+        PredictionCache(shared=shared).predict('v1', self.PARAMS, self.compute)
+
+        other_worker = PredictionCache(shared=shared)
+        self.assertEqual(other_worker.predict('v1', self.PARAMS, self.compute)[1], 'hit')
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(other_worker.stats()['shared_hits'], 1)
+
+
+@unittest.skipIf(SOLAR_MODEL is None, 'Solar power model not available')
+class CompiledModelParityTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.frame = pd.read_csv(DATASET_PATH).drop(columns=['Power Generated (kW)'])
+        cls.expected = SOLAR_MODEL.predict(cls.frame)
+
+    def test_compiled_trees_match_pipeline_on_dataset(self):
+        compiled = CompiledPipeline.from_pipeline(SOLAR_MODEL)
+        features = compiled.transform(self.frame)
+        np.testing.assert_allclose(compiled.ensemble.predict(features), self.expected, rtol=1e-9, atol=1e-9)
+
+    def test_small_and_large_batches_match_pipeline(self):
+        compiled = CompiledPipeline.from_pipeline(SOLAR_MODEL, batch_threshold=16)
+        np.testing.assert_allclose(compiled.predict(self.frame.iloc[:1]), self.expected[:1], rtol=1e-9, atol=1e-9)
+        np.testing.assert_allclose(compiled.predict(self.frame.iloc[:100]), self.expected[:100], rtol=1e-9, atol=1e-9)
+
+    def test_both_backends_reject_non_finite_features(self):
+        compiled = CompiledPipeline.from_pipeline(SOLAR_MODEL)
+        for value in (np.nan, np.inf):
+            frame = self.frame.iloc[:1].copy()
+            frame['Solar Irradiance (W/m^2)'] = value
+            with self.subTest(value=value):
+                with self.assertRaisesRegex(ValueError, 'NaN|infinity'):
+                    SOLAR_MODEL.predict(frame)
+                with self.assertRaisesRegex(ValueError, 'NaN|infinity'):
+                    compiled.predict(frame)
+                # The preprocessing step lets NaN through, so the ensemble must catch it
+                features = compiled.transform(self.frame.iloc[:1])
+                features[0, 0] = value
+                with self.assertRaisesRegex(ValueError, 'NaN or infinity'):
+                    compiled.ensemble.predict(features)
+
+
+@unittest.skipIf(SOLAR_MODEL is None, 'Solar power model not available')
+class FastFeaturizerTests(SimpleTestCase):
+    def test_matches_pipeline_preprocessing_on_dataset_rows(self):
+        featurizer = get_featurizer(SOLAR_MODEL)
+        self.assertIsNotNone(featurizer)
+        frame = pd.read_csv(DATASET_PATH).drop(columns=['Power Generated (kW)']).iloc[::97]
+        expected = SOLAR_MODEL[:-1].transform(frame)
+        for i, row in enumerate(frame.to_dict('records')):
+            np.testing.assert_allclose(featurizer.transform_row(row)[0], expected[i], rtol=1e-12, atol=1e-12)
+
+    def test_predict_one_matches_dataframe_path(self):
+        featurizer = get_featurizer(SOLAR_MODEL)
+        params = {'city': 3, 'date': '2025-03-15', 'time': '12:00', 'power_consumed': 0.0, **VALID_ROW}
+        self.assertAlmostEqual(
+            predict_one(SOLAR_MODEL, featurizer, params),
+            predict_one(SOLAR_MODEL, None, params),
+            places=12
+        )
+
+
+@unittest.skipIf(SOLAR_MODEL is None, 'Solar power model not available')
+class ModelRegistryTests(SimpleTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'solar_power_model.pkl')
+        shutil.copyfile(settings.SOLAR_MODEL_PATH, self.path)
+        self.registry = ModelRegistry(self.path, fast_featurizer=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_swaps_to_new_version_and_keeps_previous(self):
+        first = self.registry.get_active()
+        self.assertFalse(self.registry.check_for_updates())
+
+        # Same model, different bytes on disk -> new version
+        joblib.dump(SOLAR_MODEL, self.path + '.tmp', compress=3)
+        os.replace(self.path + '.tmp', self.path)
+        self.assertTrue(self.registry.check_for_updates())
+
+        second = self.registry.get_active()
+        self.assertNotEqual(first.version, second.version)
+        self.assertEqual(self.registry.versions(), [first.version, second.version])
+        self.assertIs(self.registry.get(first.version), first)
+
+    def test_loads_memory_mapped_compiled_artifact(self):
+        export_compiled(SOLAR_MODEL, self.path)
+        handle = ModelRegistry(self.path).get_active()
+
+        self.assertIsInstance(handle.predictor, CompiledPipeline)
+        self.assertIsNone(handle.predictor.estimator)
+        self.assertIsInstance(handle.predictor.ensemble.value.base, np.memmap)
+        self.assertEqual(handle.model_type, 'Pipeline')
+        self.assertIsNotNone(handle.featurizer)
+
+        frame = pd.read_csv(DATASET_PATH).drop(columns=['Power Generated (kW)']).iloc[:600]
+        np.testing.assert_allclose(handle.predictor.predict(frame), SOLAR_MODEL.predict(frame), rtol=1e-9, atol=1e-9)
+
+    def test_broken_artifact_keeps_active_version(self):
+        first = self.registry.get_active()
+        with open(self.path, 'wb') as f:
+            f.write(b'not a model')
+        self.assertFalse(self.registry.check_for_updates())
+        self.assertIs(self.registry.get_active(), first)
+
+    def test_watcher_picks_up_model_after_failed_first_load(self):
+        missing = os.path.join(self.tmpdir, 'later.pkl')
+        registry = ModelRegistry(missing, fast_featurizer=False, reload_interval=0.05)
+        self.addCleanup(registry.stop_watcher)
+        self.assertFalse(registry.get_active().available)
+
+        shutil.copyfile(self.path, missing)
+        for _ in range(100):
+            if registry.get_active().available:
+                break
+            time.sleep(0.05)
+        self.assertTrue(registry.get_active().available)
+
+
+class RecordingCollection:
+    def __init__(self):
+        self.batches = []
+
+    def insert_many(self, documents, ordered=True):
+        self.batches.append(list(documents))
+
+
+class WriteBehindWriterTests(SimpleTestCase):
+    def test_batches_documents_with_client_side_ids(self):
+        collection = RecordingCollection()
+        writer = WriteBehindWriter(lambda: collection, batch_size=3, flush_interval=0.05)
+        ids = [writer.enqueue({'n': i}) for i in range(7)]
+        self.assertTrue(writer.flush())
+        writer.close()
+
+        written = [doc for batch in collection.batches for doc in batch]
+        self.assertEqual([doc['_id'] for doc in written], ids)
+        self.assertTrue(all(len(batch) <= 3 for batch in collection.batches))
+        self.assertEqual(writer.stats()['written'], 7)
+
+    def test_drops_when_buffer_is_full(self):
+        blocker = threading.Event()
+
+        class BlockingCollection:
+            def insert_many(self, documents, ordered=True):
+                blocker.wait()
+
+        writer = WriteBehindWriter(BlockingCollection, batch_size=1, flush_interval=0.01, max_pending=1,
+                                   enqueue_timeout=0.01)
+        results = [writer.enqueue({'n': i}) for i in range(5)]
+        blocker.set()
+        writer.flush()
+        writer.close()
+
+        self.assertIn(None, results)
+        self.assertEqual(writer.stats()['dropped'], results.count(None))
+
+    def test_on_written_skips_failed_documents(self):
+        from pymongo.errors import BulkWriteError
+
+        class PartiallyFailingCollection:
+            def insert_many(self, documents, ordered=True):
+                raise BulkWriteError({'writeErrors': [{'index': 1}], 'nInserted': len(documents) - 1})
+
+        written = []
+        writer = WriteBehindWriter(PartiallyFailingCollection, batch_size=3, flush_interval=0.05,
+                                   on_written=written.extend)
+        for i in range(3):
+            writer.enqueue({'n': i})
+        self.assertTrue(writer.flush())
+        writer.close()
+
+        self.assertEqual([doc['n'] for doc in written], [0, 2])
+        self.assertEqual(writer.stats()['failed'], 1)
+
+
+class RollupBucketTests(SimpleTestCase):
+    def test_bucket_ranges(self):
+        created_at = datetime(2025, 3, 13, 17, 45)  # a Thursday
+        self.assertEqual(bucket_start(created_at, 'daily'), datetime(2025, 3, 13))
+        self.assertEqual(bucket_start(created_at, 'weekly'), datetime(2025, 3, 10))
+        self.assertEqual(bucket_start(created_at, 'monthly'), datetime(2025, 3, 1))
+        self.assertEqual(bucket_end(datetime(2025, 12, 1), 'monthly'), datetime(2026, 1, 1))
+        self.assertEqual(bucket_end(datetime(2025, 3, 10), 'weekly'), datetime(2025, 3, 17))
+
+
+class AsyncViewAuthTests(SimpleTestCase):
+    async def test_rejects_missing_and_invalid_tokens(self):
+        request = RequestFactory().get('/api/dashboard/user-stats/')
+        response = await async_views.get_user_prediction_stats(request)
+        self.assertEqual(response.status_code, 401)
+
+        request = RequestFactory().get('/api/dashboard/user-stats/', HTTP_AUTHORIZATION='Bearer not-a-jwt')
+        response = await async_views.get_user_prediction_stats(request)
+        self.assertEqual(response.status_code, 401)
+
+
+class ResponseCacheTests(SimpleTestCase):
+    def test_prediction_info_revalidates_with_etag(self):
+        response = self.client.get('/api/dashboard/info/')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.client.get('/api/dashboard/info/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        response = self.client.get('/api/dashboard/info/', HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+
+class MongomockTestCase(SimpleTestCase):
+    """Runs against an in-memory mongomock client instead of MongoDB"""
+
+    def setUp(self):
+        import mongomock
+
+        patcher = mock.patch.multiple(MongoDBConnection, _client=mongomock.MongoClient(), _db=None, _pid=os.getpid())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.predictions = get_predictions_collection()
+
+    def add_predictions(self, user_id, *points):
+        """Insert (created_at, predicted_power_generated) pairs for a user"""
+        self.predictions.insert_many([
+            {'user_id': user_id, 'created_at': created_at, 'prediction': {'predicted_power_generated': value}}
+            for created_at, value in points
+        ])
+
+
+@override_settings(SOLAR_PREDICTION_ROLLUPS='write', SOLAR_EXPORT_SERVER_AGGREGATION=True)
+class ServerAggregationFallbackTests(MongomockTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(exports, '_server_aggregation_unsupported', False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.add_predictions('u1', (datetime(2025, 3, 15, 9), 1.5), (datetime(2025, 3, 15, 13), 2.0))
+
+    def test_only_unsupported_date_trunc_disables_server_aggregation(self):
+        from pymongo.errors import OperationFailure
+
+        timeout = OperationFailure('operation exceeded time limit', code=50)
+        with mock.patch.object(exports, 'aggregate_period_totals', side_effect=timeout):
+            rows = list(iter_report_rows('u1', 'daily'))
+        self.assertEqual(rows[1:], [(datetime(2025, 3, 15).date(), 3.5)])
+        self.assertFalse(exports._server_aggregation_unsupported)
+
+        # mongomock, like MongoDB < 5.0, does not know $dateTrunc
+        self.assertEqual(list(iter_report_rows('u1', 'daily')), rows)
+        self.assertTrue(exports._server_aggregation_unsupported)
+
+
+class KeysetPaginationTests(MongomockTestCase):
+    def setUp(self):
+        super().setUp()
+        # Three predictions share a timestamp, so only _id orders them
+        same = datetime(2025, 3, 15, 12)
+        self.add_predictions('u1', (datetime(2025, 3, 14), 1.0), (same, 2.0), (same, 3.0), (same, 4.0),
+                             (datetime(2025, 3, 16), 5.0))
+        self.add_predictions('u2', (same, 9.0))
+        self.predictions.update_many({}, {'$set': {'updated_at': same}})
+
+    def test_cursor_round_trip(self):
+        doc = self.predictions.find_one({'user_id': 'u1'})
+        self.assertEqual(decode_cursor(encode_cursor(doc)), (doc['created_at'], doc['_id']))
+        with self.assertRaisesRegex(ValueError, 'Invalid cursor'):
+            decode_cursor('not-a-cursor')
+
+    def test_pages_break_timestamp_ties_by_id(self):
+        expected = [
+            str(doc['_id']) for doc in
+            self.predictions.find({'user_id': 'u1'}).sort([('created_at', -1), ('_id', -1)])
+        ]
+        seen, cursor = [], None
+        for _ in range(len(expected)):
+            page = PredictionModel.get_user_predictions_page('u1', limit=2, cursor=cursor)
+            seen.extend(doc['_id'] for doc in page['predictions'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(seen, expected)
+        self.assertEqual(
+            [doc['_id'] for doc in PredictionModel.get_user_predictions_page('u1', limit=2, skip=2)['predictions']],
+            expected[2:4]
+        )
+
+    def test_rejects_non_positive_limit_and_negative_skip(self):
+        with self.assertRaisesRegex(ValueError, 'limit'):
+            PredictionModel.get_user_predictions_page('u1', limit=0)
+        with self.assertRaisesRegex(ValueError, 'skip'):
+            PredictionModel.get_user_predictions_page('u1', limit=5, skip=-1)
+
+
+@override_settings(SOLAR_PREDICTION_ROLLUPS='write', SOLAR_EXPORT_SERVER_AGGREGATION=False)
+class ReportExportTests(MongomockTestCase):
+    RECOMMENDATIONS = [{'title': 'Tilt', 'description': 'Raise the panels to 25 degrees'}]
+
+    def setUp(self):
+        super().setUp()
+        # Sat 2025-03-15 and Sun 2025-03-16 share a week; Mon 2025-03-17 and Tue 2025-04-01 start new ones
+        self.add_predictions(
+            'u1',
+            (datetime(2025, 3, 16, 9), 2.0), (datetime(2025, 3, 15, 13), 1.5), (datetime(2025, 3, 15, 9), 1.0),
+            (datetime(2025, 3, 17, 12), 4.0), (datetime(2025, 4, 1, 12), 8.0),
+        )
+        self.add_predictions('u2', (datetime(2025, 3, 15, 9), 100.0))
+
+    def test_client_side_buckets_per_period(self):
+        day = lambda *args: datetime(*args).date()
+        self.assertEqual(list(iter_report_rows('u1', 'daily', batch_size=2)), [
+            ('date', 'predicted_power_generated'),
+            (day(2025, 3, 15), 2.5), (day(2025, 3, 16), 2.0), (day(2025, 3, 17), 4.0), (day(2025, 4, 1), 8.0),
+        ])
+        self.assertEqual(list(iter_report_rows('u1', 'weekly'))[1:], [
+            (day(2025, 3, 10), 4.5), (day(2025, 3, 17), 4.0), (day(2025, 3, 31), 8.0),
+        ])
+        self.assertEqual(list(iter_report_rows('u1', 'monthly'))[1:], [('2025-03', 8.5), ('2025-04', 8.0)])
+
+    def test_unknown_period_exports_raw_predictions_newest_first(self):
+        rows = list(iter_report_rows('u1', 'hourly'))
+        self.assertEqual(rows[0], ('created_at', 'predicted_power_generated'))
+        self.assertEqual(rows[1:3], [('2025-04-01T12:00:00', 8.0), ('2025-03-17T12:00:00', 4.0)])
+        self.assertEqual(len(rows), 6)
+
+    def test_csv_has_header_rows_and_recommendations(self):
+        chunks = list(stream_csv_report(iter_report_rows('u1', 'monthly'), self.RECOMMENDATIONS, chunk_rows=2))
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(''.join(chunks), (
+            'month,predicted_power_generated\n2025-03,8.5\n2025-04,8.0\n'
+            '\n\nRecommendations:\n- Tilt: Raise the panels to 25 degrees\n'
+        ))
+
+    def test_csv_omits_header_without_predictions(self):
+        csv = ''.join(stream_csv_report(iter_report_rows('nobody', 'daily'), []))
+        self.assertEqual(csv, '\n\nRecommendations:\n')
+
+
+class IndexBootstrapTests(MongomockTestCase):
+    def test_ensure_indexes_creates_every_spec_idempotently(self):
+        ensure_indexes()
+        created = ensure_indexes()
+
+        self.assertEqual(created, {name: [spec[0] for spec in specs] for name, (_, specs) in INDEX_SPECS.items()})
+        for name, (get_collection, specs) in INDEX_SPECS.items():
+            indexes = {index['name']: index for index in get_collection().list_indexes()}
+            for spec in specs:
+                self.assertEqual(list(indexes[spec[0]]['key'].items()), spec[1])
+        self.assertEqual(indexes['expires_at_1']['expireAfterSeconds'], 0)
+        self.assertTrue(all(not result['missing'] for result in index_report().values()))
+
+    def test_report_lists_missing_and_unused_indexes(self):
+        self.predictions.create_index([('created_at', 1)], name='created_at_1')
+        stats = [
+            {'name': '_id_', 'accesses': {'ops': 0}},
+            {'name': 'created_at_1', 'accesses': {'ops': 0}},
+            {'name': 'user_id_1_created_at_-1__id_-1', 'accesses': {'ops': 12}},
+        ]
+        with mock.patch('mongomock.collection.Collection.aggregate', return_value=stats):
+            report = index_report()['predictions']
+
+        self.assertEqual(report['missing'], ['user_id_1_created_at_-1__id_-1'])
+        self.assertEqual(report['unused'], ['created_at_1'])
+        self.assertEqual(report['usage']['user_id_1_created_at_-1__id_-1'], 12)
+
+    def test_command_reports_and_creates(self):
+        with self.assertRaisesRegex(CommandError, 'missing'):
+            call_command('ensure_indexes', '--report-only', stdout=StringIO())
+
+        out = StringIO()
+        call_command('ensure_indexes', stdout=out)
+        self.assertIn("'predictions': user_id_1_created_at_-1__id_-1", out.getvalue())
+        call_command('ensure_indexes', '--report-only', stdout=StringIO())
+
+
+class LatestDatesPipelineTests(MongomockTestCase):
+    @staticmethod
+    def client_side_latest_dates(collection, city):
+        """The loop get_todays_power_generation used before the $group pipeline"""
+        latest_dates = []
+        for doc in collection.find({'City': city} if city else {}).sort('Date', -1):
+            date_val = doc.get('Date')
+            if date_val and date_val not in latest_dates:
+                latest_dates.append(date_val)
+            if len(latest_dates) == 2:
+                break
+        return latest_dates
+
+    def test_matches_the_client_side_loop(self):
+        collection = get_historical_collection()
+        collection.insert_many([
+            {'City': city, 'Date': date, 'Time': time}
+            for city, dates in [
+                ('Surat', ['2025-03-14', '2025-03-15', '2025-03-16']),
+                ('Rajkot', ['2025-03-17', '2025-03-12']),
+                ('Vadodara', ['2025-03-10']),
+                ('Vadodara', [None, '']),
+            ]
+            for date in dates
+            for time in ('09:00', '12:00')
+        ])
+        collection.insert_one({'City': 'Rajkot', 'Time': '12:00'})
+
+        for city in [None, 'Surat', 'Rajkot', 'Vadodara', 'Ahmedabad']:
+            with self.subTest(city=city):
+                latest = [doc['_id'] for doc in collection.aggregate(latest_dates_pipeline(city)) if doc['_id']]
+                self.assertEqual(latest, self.client_side_latest_dates(collection, city))
+
+
+class RollupRebuildTests(MongomockTestCase):
+    def setUp(self):
+        super().setUp()
+        from authentication.mongodb import get_rollups_collection
+
+        self.rollups = get_rollups_collection()
+        self.add_predictions('u1', (datetime(2025, 3, 15, 9), 1.0), (datetime(2025, 3, 16, 9), 3.0))
+        stale = datetime(2020, 1, 1)
+        self.rollups.insert_many([
+            # u1's rollups are off, one of its buckets no longer has predictions,
+            # and u2's predictions were all deleted
+            {'_id': rollup_id('u1', 'all'), 'user_id': 'u1', 'period': 'all', 'count': 7, 'updated_at': stale},
+            {'_id': rollup_id('u1', 'daily', datetime(2025, 1, 1)), 'user_id': 'u1', 'period': 'daily',
+             'count': 1, 'updated_at': stale},
+            {'_id': rollup_id('u2', 'all'), 'user_id': 'u2', 'period': 'all', 'count': 2, 'updated_at': stale},
+        ])
+
+    def test_full_rebuild_overwrites_buckets_and_drops_stale_rollups(self):
+        self.assertEqual(rebuild(), {'u1': 2, 'u2': 0})
+        self.assertEqual(rebuild(), {'u1': 2})
+
+        totals = self.rollups.find_one({'_id': rollup_id('u1', 'all')})
+        self.assertEqual((totals['count'], totals['total'], totals['min'], totals['max']), (2, 4.0, 1.0, 3.0))
+        self.assertEqual(sorted(doc['period'] for doc in self.rollups.find({'user_id': 'u1'})),
+                         ['all', 'daily', 'daily', 'monthly', 'weekly'])
+        self.assertEqual(self.rollups.count_documents({'user_id': 'u2'}), 0)
+
+    def test_single_user_rebuild_leaves_other_users_alone(self):
+        self.assertEqual(rebuild('u2'), {'u2': 0})
+        self.assertEqual(self.rollups.count_documents({'user_id': 'u2'}), 0)
+        self.assertEqual(self.rollups.find_one({'_id': rollup_id('u1', 'all')})['count'], 7)
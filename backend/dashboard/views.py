@@ -5,15 +5,14 @@ def test_view(request):
     print('DEBUG: test_view endpoint called')
     return JsonResponse({'status': 'ok', 'message': 'Test endpoint is working.'})
 import io
-import pandas as pd
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from django.http import FileResponse, HttpResponse
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from datetime import datetime
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 # Export report endpoint
 from .models import PredictionModel
+from .exports import iter_report_rows, stream_csv_report
 ## DEBUG: Commented out DRF decorators for troubleshooting
 # @api_view(["GET"])
 # @permission_classes([IsAuthenticated])
@@ -24,56 +23,34 @@ def export_report(request):
     period = request.GET.get('period', 'daily')
     if not user_id:
         return HttpResponse('Unauthorized', status=401)
-    # Get all predictions for user
-    predictions = PredictionModel.get_user_predictions(user_id, limit=1000, skip=0)
-    # Flatten for DataFrame
-    rows = []
-    for p in predictions:
-        created = p.get('created_at')
-        pred = p.get('prediction', {})
-        val = pred.get('predicted_power_generated', 0)
-        rows.append({'created_at': created, 'predicted_power_generated': val})
-    df = pd.DataFrame(rows)
-    # Aggregate by period
-    if not df.empty:
-        if period == 'daily':
-            df['date'] = pd.to_datetime(df['created_at']).dt.date
-            grouped = df.groupby('date').agg({'predicted_power_generated': 'sum'}).reset_index()
-        elif period == 'weekly':
-            df['week'] = pd.to_datetime(df['created_at']).dt.to_period('W').apply(lambda r: r.start_time.date())
-            grouped = df.groupby('week').agg({'predicted_power_generated': 'sum'}).reset_index()
-        elif period == 'monthly':
-            df['month'] = pd.to_datetime(df['created_at']).dt.to_period('M').astype(str)
-            grouped = df.groupby('month').agg({'predicted_power_generated': 'sum'}).reset_index()
-        else:
-            grouped = df
-    else:
-        grouped = pd.DataFrame()
+    # All predictions for the user, aggregated per period while the cursor is read
+    rows = iter_report_rows(user_id, period, batch_size=settings.SOLAR_EXPORT_BATCH_SIZE)
     # Get recommendations
     recs_resp = get_recommendations(request)
     recommendations = []
     if hasattr(recs_resp, 'data') and isinstance(recs_resp.data, dict):
         recommendations = recs_resp.data.get('recommendations', [])
     if export_format == 'csv':
-        output = io.StringIO()
-        if not grouped.empty:
-            grouped.to_csv(output, index=False)
-        output.write('\n\nRecommendations:\n')
-        for rec in recommendations:
-            output.write(f"- {rec['title']}: {rec['description']}\n")
-        response = HttpResponse(output.getvalue(), content_type='text/csv')
+        # Streamed in chunks, so large histories never sit in memory as a whole
+        response = StreamingHttpResponse(stream_csv_report(rows, recommendations), content_type='text/csv')
         response['Content-Disposition'] = f'attachment; filename=solar_report_{period}_{datetime.now().date()}.csv'
         return response
     elif export_format == 'pdf':
+        # reportlab is only needed by this export path
+        from reportlab.lib.pagesizes import letter
+        from reportlab.pdfgen import canvas
         buffer = io.BytesIO()
         p = canvas.Canvas(buffer, pagesize=letter)
         p.setFont('Helvetica', 12)
         p.drawString(30, 750, f'Solar Prediction Report ({period.title()})')
         y = 720
-        if not grouped.empty:
-            for idx, row in grouped.iterrows():
-                p.drawString(30, y, f"{row[0]}: {row[1]:.2f} kWh")
-                y -= 20
+        next(rows)  # header
+        for bucket, total in rows:
+            p.drawString(30, y, f"{bucket}: {total:.2f} kWh")
+            y -= 20
+            if y < 50:
+                p.showPage()
+                y = 750
         y -= 20
         p.drawString(30, y, 'Recommendations:')
         y -= 20
@@ -93,6 +70,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from authentication.mongodb import get_predictions_collection
+from .recommendations import build_recommendations
 
 # Dynamic recommendations endpoint
 @api_view(["GET"])
@@ -106,99 +84,46 @@ def get_recommendations(request):
     # Fetch latest prediction for this user
     predictions_col = get_predictions_collection()
     latest = predictions_col.find_one({"user_id": user_id}, sort=[("created_at", -1)])
-
-    if latest and "prediction" in latest and "input_parameters" in latest["prediction"]:
-        params = latest["prediction"]["input_parameters"]
-        predicted_power = latest["prediction"].get("predicted_power_generated")
-        # 1. Low Power Recommendation
-        if predicted_power is not None and predicted_power < 2.0:
-            recommendations.append({
-                "title": "Increase Panel Area",
-                "current": f"{params.get('panel_area', '-')}",
-                "recommended": "Consider adding more panels",
-                "improvement": "+20% potential output",
-                "description": "Your predicted power is low. Increasing the panel area can significantly boost your energy generation.",
-                "priority": "high",
-            })
-        # 2. High Temperature Warning
-        if params.get("temperature") is not None and params["temperature"] > 45:
-            recommendations.append({
-                "title": "High Temperature Detected",
-                "current": f"{params['temperature']}°C",
-                "recommended": "Improve ventilation or shading",
-                "improvement": "+5% efficiency",
-                "description": "High temperatures can reduce panel efficiency. Consider improving airflow or partial shading during peak heat.",
-                "priority": "medium",
-            })
-        # 3. High Humidity Warning
-        if params.get("humidity") is not None and params["humidity"] > 80:
-            recommendations.append({
-                "title": "High Humidity Detected",
-                "current": f"{params['humidity']}%",
-                "recommended": "Regular panel cleaning",
-                "improvement": "+3% efficiency",
-                "description": "High humidity can cause dust and grime to stick to panels. Clean panels more frequently for optimal performance.",
-                "priority": "medium",
-            })
-        # 4. Optimal Tilt Angle
-        current_tilt = params.get("tilt")
-        optimal_tilt = 32
-        if current_tilt is not None and abs(current_tilt - optimal_tilt) > 2:
-            recommendations.append({
-                "title": "Optimal Tilt Angle",
-                "current": f"{current_tilt}°",
-                "recommended": f"{optimal_tilt}°",
-                "improvement": "+14% efficiency",
-                "description": f"Adjusting your panel tilt to {optimal_tilt}° will maximize solar exposure throughout the year.",
-                "priority": "high",
-            })
-        # 5. Azimuth Orientation
-        current_azimuth = params.get("azimuth")
-        optimal_azimuth = 180
-        if current_azimuth is not None and abs(current_azimuth - optimal_azimuth) > 5:
-            recommendations.append({
-                "title": "Azimuth Orientation",
-                "current": f"{current_azimuth}°",
-                "recommended": f"{optimal_azimuth}°",
-                "improvement": "+8% efficiency",
-                "description": "Rotating panels more towards true south will increase energy capture.",
-                "priority": "medium",
-            })
-        # 6. Seasonal Adjustment
-        if params.get("tilt") == params.get("azimuth"):
-            recommendations.append({
-                "title": "Seasonal Adjustment",
-                "current": "Fixed",
-                "recommended": "Bi-annual",
-                "improvement": "+12% efficiency",
-                "description": "Adjusting tilt twice yearly (winter: +15°, summer: -15°) optimizes performance.",
-                "priority": "medium",
-            })
-
-    # If no recommendations, provide a more meaningful message or fallback
-    if not recommendations:
-        if latest:
-            recommendations.append({
-                "title": "Great Job!",
-                "current": "All key parameters optimal",
-                "recommended": "Maintain current setup",
-                "improvement": "Max efficiency achieved",
-                "description": "Your solar system is configured for maximum efficiency based on your latest prediction. Keep monitoring for seasonal or environmental changes.",
-                "priority": "low",
-            })
-        else:
-            recommendations.append({
-                "title": "No Prediction Data",
-                "current": "-",
-                "recommended": "Submit a prediction",
-                "improvement": "-",
-                "description": "No prediction data found. Please generate a prediction to receive personalized recommendations.",
-                "priority": "medium",
-            })
+    recommendations = build_recommendations(latest)
 
     return Response({"recommendations": recommendations}, status=status.HTTP_200_OK)
 from datetime import datetime, timedelta
 from authentication.mongodb import get_historical_collection
+
+# Only the fields get_todays_power_generation returns (_id is included by default)
+HISTORY_PROJECTION = {'Date': 1, 'Time': 1, 'City': 1, 'Power Generated (kW)': 1}
+
+def latest_dates_pipeline(city=None):
+    """
+    Find the latest two dates for this city (no user filter, flat doc structure).
+    Grouped on the server so only the two dates come back, not every reading;
+    sorting on Date before grouping lets MongoDB answer it from the
+    {City, Date} index with a distinct scan.
+    """
+    pipeline = [{'$match': {'City': city}}] if city else []
+    pipeline += [
+        {'$sort': {'Date': -1}},
+        {'$group': {'_id': '$Date'}},
+        {'$sort': {'_id': -1}},
+        {'$limit': 2}
+    ]
+    return pipeline
+
+def history_query(city, latest_dates):
+    query = {'Date': {'$in': latest_dates}}
+    if city:
+        query['City'] = city
+    return query
+
+def format_history(doc):
+    return {
+        'date': doc.get('Date', None),
+        'time': doc.get('Time', None),
+        'power_generated': doc.get('Power Generated (kW)', None),
+        'city': doc.get('City', None),
+        '_id': str(doc.get('_id'))
+    }
+
 # New API endpoint: Get today's power generation data for the authenticated user
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
@@ -213,79 +138,60 @@ def get_todays_power_generation(request):
     try:
         collection = get_historical_collection()
         city = request.GET.get('city')
-        # Find the latest two dates for this city (no user filter, flat doc structure)
-        match = {}
-        if city:
-            match['City'] = city
-        # Get all unique dates for the city, sorted descending
-        dates_cursor = collection.find({'City': city} if city else {}).sort('Date', -1)
-        latest_dates = []
-        for doc in dates_cursor:
-            date_val = doc.get('Date')
-            if date_val and date_val not in latest_dates:
-                latest_dates.append(date_val)
-            if len(latest_dates) == 2:
-                break
+        # Missing/empty dates sort last, so they only show up when there are fewer than two real ones
+        latest_dates = [doc['_id'] for doc in collection.aggregate(latest_dates_pipeline(city)) if doc['_id']]
         if not latest_dates:
             return Response({'data': []}, status=status.HTTP_200_OK)
-        # Now get all records for those dates and city
-        query = {'Date': {'$in': latest_dates}}
-        if city:
-            query['City'] = city
-        cursor = collection.find(query).sort([('Date', 1), ('Time', 1)])
-        results = []
-        for doc in cursor:
-            time = doc.get('Time', None)
-            power = doc.get('Power Generated (kW)', None)
-            city_val = doc.get('City', None)
-            date_val = doc.get('Date', None)
-            results.append({
-                'date': date_val,
-                'time': time,
-                'power_generated': power,
-                'city': city_val,
-                '_id': str(doc.get('_id'))
-            })
-        return Response({'data': results}, status=status.HTTP_200_OK)
+        # Now get all records for those dates and city. Historical data is
+        # append-only, so (city, dates, row count) identifies the response: an
+        # index-only count decides whether the cached rows are still current.
+        query = history_query(city, latest_dates)
+        key = cache_key('todays-power', city, latest_dates, collection.count_documents(query))
+
+        def build_history():
+            cursor = collection.find(query, projection=HISTORY_PROJECTION).sort([('Date', 1), ('Time', 1)])
+            return {'data': [format_history(doc) for doc in cursor]}
+
+        data, etag = get_or_build(key, build_history, settings.SOLAR_RESPONSE_CACHE_TTL)
+        return conditional_response(request, data, etag)
     except Exception as e:
         logger.error(f"Error fetching today's power generation: {e}")
         return Response({'error': 'Failed to fetch today\'s power generation'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 from django.shortcuts import render
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, parser_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
 from rest_framework import status
-import pandas as pd
-import numpy as np
+import math
 import os
 from django.conf import settings
 import logging
 from .models import PredictionModel
+from .inference import OPTIONAL_PARAMS, forecast, predict_batch, predict_one, sweep
+from .model_registry import get_model_registry
+from .parsers import CSVParser, NDJSONParser
+from .prediction_cache import get_prediction_cache
+from .http_cache import cache_key, conditional_response, get_or_build
 from authentication.jwt_auth import CustomJWTAuthentication
+from authentication.metrics import StageClock
 
 logger = logging.getLogger(__name__)
 
-# Try to import joblib, if not available, we'll handle it gracefully
-try:
-    import joblib
-    JOBLIB_AVAILABLE = True
-except ImportError:
-    JOBLIB_AVAILABLE = False
-    logger.warning("joblib not available. Model loading will be disabled.")
+# The model is loaded on first prediction (or at startup when SOLAR_MODEL_WARMUP
+# is set, see DashboardConfig.ready); the registry then watches the model file
+# and swaps in retrained versions without a restart
+MODEL_PATH = settings.SOLAR_MODEL_PATH
+MODEL_REGISTRY = get_model_registry()
 
-# Load the model once when the module is imported
-MODEL_PATH = os.path.join(settings.BASE_DIR, 'models', 'solar_power_model.pkl')
-SOLAR_MODEL = None
-
-if JOBLIB_AVAILABLE:
-    try:
-        SOLAR_MODEL = joblib.load(MODEL_PATH)
-        logger.info(f"Solar power model loaded successfully: {type(SOLAR_MODEL)}")
-    except Exception as e:
-        logger.error(f"Failed to load solar power model: {e}")
-        SOLAR_MODEL = None
-else:
-    logger.error("joblib not available. Cannot load model.")
+def model_info(handle):
+    """Describe the model version that served a prediction"""
+    return {
+        'model_type': handle.model_type,
+        'model_version': handle.version,
+        'prediction_units': 'kW',
+        'dataset_source': handle.dataset_source
+    }
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -303,11 +209,23 @@ def predict_solar_power(request):
     - humidity: Humidity percentage
     - wind_speed: Wind speed in m/s
     - cloud_cover: Cloud cover type (categorical string)
+
+    Optional: model_version pins one of the currently loaded model versions.
+    Send "Cache-Control: no-cache" to bypass the prediction cache.
     """
     
+    # Authentication is timed by CustomJWTAuthentication; the rest of the view here
+    stages = StageClock()
     try:
         # Extract input parameters from request
         data = request.data
+
+        handle = MODEL_REGISTRY.get(data.get('model_version'))
+        if handle is None:
+            return Response(
+                {'error': f'Unknown model version. Loaded versions: {MODEL_REGISTRY.versions()}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         # Required parameters (matching the dataset columns)
         required_params = [
@@ -353,26 +271,33 @@ def predict_solar_power(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Make prediction
-        if SOLAR_MODEL is not None:
+        stages.lap('parse')
+
+        # Make prediction (features and model stages are timed in predict_one)
+        if handle.available:
             # Use the trained model
-            input_data = pd.DataFrame({
-                'City': [data.get('city', 0)],  # Default city index
-                'Date': [data.get('date', '2025-03-15')],  # Default date
-                'Time': [data.get('time', '12:00')],  # Default time
-                'Panel area (m^2)': [panel_area],
-                'Tilt (deg)': [tilt],
-                'Azimuth (deg)': [azimuth],
-                'Solar Irradiance (W/m^2)': [ghi],  # GHI is Solar Irradiance
-                'DNI (W/m^2)': [dni],
-                'Temperature (C)': [temperature],
-                'Humidity (%)': [humidity],
-                'Wind Speed (m/s)': [wind_speed],
-                'Power Consumed (kW)': [data.get('power_consumed', 0.0)],  # Default power consumed
-                'Cloud Cover': [cloud_cover]  # This will be treated as categorical
-            })
-            prediction = SOLAR_MODEL.predict(input_data)[0]
-            model_type = str(type(SOLAR_MODEL).__name__)
+            model_params = {
+                'city': data.get('city', OPTIONAL_PARAMS['city']),
+                'date': data.get('date', OPTIONAL_PARAMS['date']),
+                'time': data.get('time', OPTIONAL_PARAMS['time']),
+                'panel_area': panel_area,
+                'tilt': tilt,
+                'azimuth': azimuth,
+                'ghi': ghi,
+                'dni': dni,
+                'temperature': temperature,
+                'humidity': humidity,
+                'wind_speed': wind_speed,
+                'power_consumed': data.get('power_consumed', OPTIONAL_PARAMS['power_consumed']),
+                'cloud_cover': cloud_cover
+            }
+            # Identical (or, with quanta configured, near-identical) inputs are served
+            # from the prediction cache; "Cache-Control: no-cache" forces a fresh run
+            prediction, cache_status = get_prediction_cache().predict(
+                handle.version, model_params,
+                lambda params: predict_one(handle.predictor, handle.featurizer, params),
+                bypass='no-cache' in request.headers.get('Cache-Control', '')
+            )
         else:
             # Fallback calculation when model is not available
             # Simple formula based on solar irradiance and panel area
@@ -380,8 +305,10 @@ def predict_solar_power(request):
             temperature_factor = 1 - (temperature - 25) * 0.004  # Temperature coefficient
             cloud_factor = 1 - (humidity / 100) * 0.1  # Humidity effect
             prediction = base_power * temperature_factor * cloud_factor
-            model_type = "FallbackCalculation"
+            cache_status = 'disabled'
         
+        stages.reset()
+
         # Prepare response
         response_data = {
             'predicted_power_generated': float(prediction),
@@ -396,11 +323,7 @@ def predict_solar_power(request):
                 'wind_speed': wind_speed,
                 'cloud_cover': cloud_cover
             },
-            'model_info': {
-                'model_type': model_type,
-                'prediction_units': 'kW',
-                'dataset_source': 'Gujarat Solar Dataset' if SOLAR_MODEL else 'Fallback Calculation'
-            }
+            'model_info': model_info(handle)
         }
         
         # Save prediction to MongoDB
@@ -438,8 +361,9 @@ def predict_solar_power(request):
         except Exception as e:
             logger.error(f"Error saving prediction to MongoDB: {e}")
             # Don't fail the request if MongoDB save fails, just log the error
+        stages.lap('persist')
         
-        return Response(response_data, status=status.HTTP_200_OK)
+        return Response(response_data, status=status.HTTP_200_OK, headers={'X-Prediction-Cache': cache_status})
         
     except ValueError as e:
         return Response(
@@ -453,6 +377,171 @@ def predict_solar_power(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@parser_classes([JSONParser, CSVParser, NDJSONParser])
+def predict_solar_power_batch(request):
+    """
+    API endpoint to predict solar power generation for many parameter rows at once.
+
+    Accepts a JSON array of parameter objects (or {"rows": [...]}), a CSV body
+    with a header row (text/csv) or newline-delimited JSON (application/x-ndjson).
+    Each row takes the same parameters as predict_solar_power. All valid rows
+    are scored with a single model call; results come back in input order with
+    an 'error' entry for rows that failed validation. Batch predictions are not
+    saved to MongoDB.
+    """
+    try:
+        rows = request.data
+        version = request.query_params.get('model_version')
+        if isinstance(rows, dict):
+            version = rows.get('model_version', version)
+            rows = rows.get('rows')
+        if not isinstance(rows, list):
+            return Response(
+                {'error': 'Request body must be a list of prediction parameter objects'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(rows) > settings.SOLAR_BATCH_MAX_ROWS:
+            return Response(
+                {'error': f'Batch too large: at most {settings.SOLAR_BATCH_MAX_ROWS} rows per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        handle = MODEL_REGISTRY.get(version)
+        if handle is None:
+            return Response(
+                {'error': f'Unknown model version. Loaded versions: {MODEL_REGISTRY.versions()}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = predict_batch(handle.predictor, rows)
+        error_count = sum(1 for result in results if 'error' in result)
+
+        return Response({
+            'results': results,
+            'count': len(results),
+            'error_count': error_count,
+            'model_info': model_info(handle)
+        }, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        logger.error(f"Error in batch solar power prediction: {e}")
+        return Response(
+            {'error': 'An error occurred while making the batch prediction'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def predict_solar_power_forecast(request):
+    """
+    API endpoint to forecast generation over a horizon (e.g. the next 24-48 hours).
+
+    Takes {"site": {...}, "weather": [...]} or {"sites": [{"site": ..., "weather": ...}, ...]}.
+    The site gives panel_area, tilt and azimuth (optionally city and
+    power_consumed); each weather entry gives ghi, dni, temperature,
+    humidity, wind_speed, cloud_cover and a 'timestamp' (or 'date' and
+    'time'). Every hour of every site is scored in one model call. Returns
+    per-hour kW and kWh plus the total kWh per site; nothing is saved.
+    """
+    try:
+        data = request.data if isinstance(request.data, dict) else {}
+        sites = data.get('sites')
+        if sites is None:
+            sites = [{'site': data.get('site'), 'weather': data.get('weather')}]
+        if not isinstance(sites, list) or not all(
+            isinstance(entry, dict) and isinstance(entry.get('site'), dict) and isinstance(entry.get('weather'), list)
+            for entry in sites
+        ):
+            return Response(
+                {'error': 'Each forecast needs a "site" object and a "weather" list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        total_hours = sum(len(entry['weather']) for entry in sites)
+        if total_hours > settings.SOLAR_BATCH_MAX_ROWS:
+            return Response(
+                {'error': f'Forecast too large: at most {settings.SOLAR_BATCH_MAX_ROWS} hours per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            interval_hours = float(data.get('interval_hours', 1.0))
+        except (TypeError, ValueError):
+            interval_hours = 0
+        if not math.isfinite(interval_hours) or interval_hours <= 0:
+            return Response(
+                {'error': 'interval_hours must be a positive number'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        handle = MODEL_REGISTRY.get(data.get('model_version'))
+        if handle is None:
+            return Response(
+                {'error': f'Unknown model version. Loaded versions: {MODEL_REGISTRY.versions()}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        forecasts = forecast(handle.predictor, sites, interval_hours=interval_hours)
+        for entry, result in zip(sites, forecasts):
+            if 'id' in entry:
+                result['id'] = entry['id']
+
+        response = {'model_info': model_info(handle), 'interval_hours': interval_hours}
+        if 'sites' in data:
+            response['forecasts'] = forecasts
+        else:
+            response.update(forecasts[0])
+        return Response(response, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        logger.error(f"Error in solar power forecast: {e}")
+        return Response(
+            {'error': 'An error occurred while making the forecast'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def predict_solar_power_sweep(request):
+    """
+    API endpoint for what-if sweeps over tilt, azimuth and panel_area.
+
+    Takes {"base": {...prediction parameters...}, "grid": {"tilt": {"start": 0,
+    "stop": 60, "step": 5}, "azimuth": [90, 135, 180, 225, 270]}}. The
+    Cartesian product of the grids is scored in one model call and returned
+    as a response surface with the best point; nothing is saved.
+    """
+    try:
+        data = request.data if isinstance(request.data, dict) else {}
+        base, grid = data.get('base'), data.get('grid')
+        if not isinstance(base, dict) or not isinstance(grid, dict):
+            return Response(
+                {'error': 'A sweep needs a "base" object and a "grid" object'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        handle = MODEL_REGISTRY.get(data.get('model_version'))
+        if handle is None:
+            return Response(
+                {'error': f'Unknown model version. Loaded versions: {MODEL_REGISTRY.versions()}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            result = sweep(handle.predictor, base, grid, settings.SOLAR_SWEEP_MAX_POINTS)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        result['model_info'] = model_info(handle)
+        return Response(result, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        logger.error(f"Error in solar power sweep: {e}")
+        return Response(
+            {'error': 'An error occurred while running the sweep'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
 @api_view(['GET'])
 @permission_classes([AllowAny])  # Allow unauthenticated access for testing
 def get_prediction_info(request):
@@ -460,95 +549,115 @@ def get_prediction_info(request):
     Get information about the solar power prediction model and required parameters.
     """
     
-    info = {
-        'model_type': str(type(SOLAR_MODEL).__name__) if SOLAR_MODEL else "FallbackCalculation",
-        'model_available': SOLAR_MODEL is not None,
-        'dataset_source': 'Gujarat Solar Dataset' if SOLAR_MODEL else 'Fallback Calculation',
-        'required_parameters': {
-            'panel_area': {
-                'type': 'float',
-                'description': 'Panel area in square meters',
-                'unit': 'm²',
-                'range': '> 0'
-            },
-            'tilt': {
-                'type': 'float', 
-                'description': 'Panel tilt angle',
-                'unit': 'degrees',
-                'range': '0-90'
-            },
-            'azimuth': {
-                'type': 'float',
-                'description': 'Panel azimuth angle (0° = North, 90° = East, 180° = South, 270° = West)', 
-                'unit': 'degrees',
-                'range': '0-360'
-            },
-            'ghi': {
-                'type': 'float',
-                'description': 'Global Horizontal Irradiance (Solar Irradiance)',
-                'unit': 'W/m²',
-                'range': '≥ 0'
-            },
-            'dni': {
-                'type': 'float',
-                'description': 'Direct Normal Irradiance',
-                'unit': 'W/m²',
-                'range': '≥ 0'
-            },
-            'temperature': {
-                'type': 'float',
-                'description': 'Ambient temperature',
-                'unit': 'Celsius',
-                'range': 'Any'
-            },
-            'humidity': {
-                'type': 'float',
-                'description': 'Relative humidity',
-                'unit': 'percentage',
-                'range': '0-100'
-            },
-            'wind_speed': {
-                'type': 'float',
-                'description': 'Wind speed',
-                'unit': 'm/s',
-                'range': '≥ 0'
+    handle = MODEL_REGISTRY.get_active()
+    loaded_versions = MODEL_REGISTRY.versions()
+
+    def build_info():
+        return {
+            'model_type': handle.model_type,
+            'model_available': handle.available,
+            'model_version': handle.version,
+            'model_loaded_at': handle.loaded_at.isoformat(),
+            'loaded_versions': loaded_versions,
+            'dataset_source': handle.dataset_source,
+            'required_parameters': {
+                'panel_area': {
+                    'type': 'float',
+                    'description': 'Panel area in square meters',
+                    'unit': 'm²',
+                    'range': '> 0'
+                },
+                'tilt': {
+                    'type': 'float', 
+                    'description': 'Panel tilt angle',
+                    'unit': 'degrees',
+                    'range': '0-90'
+                },
+                'azimuth': {
+                    'type': 'float',
+                    'description': 'Panel azimuth angle (0° = North, 90° = East, 180° = South, 270° = West)', 
+                    'unit': 'degrees',
+                    'range': '0-360'
+                },
+                'ghi': {
+                    'type': 'float',
+                    'description': 'Global Horizontal Irradiance (Solar Irradiance)',
+                    'unit': 'W/m²',
+                    'range': '≥ 0'
+                },
+                'dni': {
+                    'type': 'float',
+                    'description': 'Direct Normal Irradiance',
+                    'unit': 'W/m²',
+                    'range': '≥ 0'
+                },
+                'temperature': {
+                    'type': 'float',
+                    'description': 'Ambient temperature',
+                    'unit': 'Celsius',
+                    'range': 'Any'
+                },
+                'humidity': {
+                    'type': 'float',
+                    'description': 'Relative humidity',
+                    'unit': 'percentage',
+                    'range': '0-100'
+                },
+                'wind_speed': {
+                    'type': 'float',
+                    'description': 'Wind speed',
+                    'unit': 'm/s',
+                    'range': '≥ 0'
+                },
+                'cloud_cover': {
+                    'type': 'string',
+                    'description': 'Cloud cover type',
+                    'valid_values': [
+                        'Fluffy white clouds', 'Mid-level clouds', 
+                        'Thin high clouds', 'Thick low clouds'
+                    ]
+                }
             },
-            'cloud_cover': {
-                'type': 'string',
-                'description': 'Cloud cover type',
-                'valid_values': [
-                    'Fluffy white clouds', 'Mid-level clouds', 
-                    'Thin high clouds', 'Thick low clouds'
-                ]
-            }
-        },
-        'output': {
-            'predicted_power_generated': {
-                'type': 'float',
-                'description': 'Predicted solar power generation',
-                'unit': 'kW'
+            'output': {
+                'predicted_power_generated': {
+                    'type': 'float',
+                    'description': 'Predicted solar power generation',
+                    'unit': 'kW'
+                }
             }
         }
-    }
-    
-    return Response(info, status=status.HTTP_200_OK)
+
+    # Only changes when a different model is loaded; clients polling with
+    # If-None-Match get an empty 304
+    key = cache_key('prediction-info', handle.version, handle.loaded_at, loaded_versions)
+    info, etag = get_or_build(key, build_info, settings.SOLAR_RESPONSE_CACHE_TTL)
+    return conditional_response(request, info, etag)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_user_predictions(request):
     """
     Get all predictions for the authenticated user
+
+    Pages with ?limit=N. Pass the returned next_cursor as ?cursor= to get the
+    following page; ?skip= is still accepted when no cursor is given.
     """
     try:
         user_id = str(request.user.id)
         limit = int(request.GET.get('limit', 10))
         skip = int(request.GET.get('skip', 0))
-        
-        predictions = PredictionModel.get_user_predictions(user_id, limit=limit, skip=skip)
+        cursor = request.GET.get('cursor')
+
+        try:
+            page = PredictionModel.get_user_predictions_page(user_id, limit=limit, skip=skip, cursor=cursor)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        predictions = page['predictions']
         
         return Response({
             'predictions': predictions,
             'count': len(predictions),
+            'next_cursor': page['next_cursor'],
             'user_id': user_id
         }, status=status.HTTP_200_OK)
         
@@ -0,0 +1,189 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from bson import ObjectId
+from django.conf import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindWriter:
+    """
+    Buffers documents in memory and inserts them from a background thread
+    with insert_many(ordered=False), so requests don't wait on a MongoDB
+    round trip.
+
+    - Batches are flushed when batch_size documents are pending or
+      flush_interval seconds have passed since the first one arrived.
+    - The buffer is bounded by max_pending. When it is full, enqueue blocks
+      for up to enqueue_timeout seconds (backpressure) and then drops the
+      document, counting it in stats()['dropped'].
+    - _id values are generated client-side so callers get an ID immediately.
+    - on_written, if given, is called from the background thread with the
+      documents of each batch that were inserted successfully.
+    - The thread starts on first use in each process (so it is created after
+      a pre-fork server forks) and pending documents are flushed at exit.
+    """
+
+    def __init__(self, get_collection, batch_size=500, flush_interval=0.25, max_pending=10000,
+                 enqueue_timeout=0.05, on_written=None):
+        self.get_collection = get_collection
+        self.on_written = on_written
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.enqueue_timeout = enqueue_timeout
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._atexit_registered = False
+        self._stats = {'enqueued': 0, 'written': 0, 'dropped': 0, 'failed': 0, 'batches': 0}
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _ensure_started(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # Forked child: the parent's pending documents and thread are not ours
+                self._queue = queue.Queue(maxsize=self.max_pending)
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='prediction-write-behind', daemon=True)
+            self._thread.start()
+            if not self._atexit_registered:
+                atexit.register(self.close)
+                self._atexit_registered = True
+
+    def enqueue(self, document):
+        """
+        Queue a document for insertion.
+
+        Returns:
+            ObjectId: The document's _id, or None if it was dropped
+        """
+        document.setdefault('_id', ObjectId())
+        self._ensure_started()
+        try:
+            self._queue.put(document, timeout=self.enqueue_timeout)
+        except queue.Full:
+            self._count('dropped')
+            logger.warning(f"Write-behind buffer full ({self.max_pending}); dropped document {document['_id']}")
+            return None
+        self._count('enqueued')
+        return document['_id']
+
+    def _next_batch(self):
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0 or self._stop.is_set():
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        from pymongo.errors import BulkWriteError
+
+        written = []
+        try:
+            self.get_collection().insert_many(batch, ordered=False)
+            written = batch
+            self._count('written', len(batch))
+        except BulkWriteError as e:
+            failed = {error['index'] for error in e.details.get('writeErrors', [])}
+            written = [doc for i, doc in enumerate(batch) if i not in failed]
+            self._count('written', len(written))
+            self._count('failed', len(failed))
+            logger.error(f"Write-behind insert: {len(failed)} of {len(batch)} documents failed")
+        except Exception as e:
+            self._count('failed', len(batch))
+            logger.error(f"Write-behind insert of {len(batch)} documents failed: {e}")
+        finally:
+            self._count('batches')
+            if written and self.on_written is not None:
+                try:
+                    self.on_written(written)
+                except Exception as e:
+                    logger.error(f"Write-behind on_written callback failed: {e}")
+            for _ in batch:
+                self._queue.task_done()
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+
+    def flush(self, timeout=5.0):
+        """
+        Wait until every queued document has been written (or has failed).
+
+        Returns:
+            bool: True if the buffer drained within the timeout
+        """
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self, timeout=5.0):
+        """Flush pending documents and stop the background thread."""
+        thread = self._thread
+        if thread is None or self._pid != os.getpid():
+            return
+        self._stop.set()
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.warning(f"Write-behind shutdown timed out with {self._queue.qsize()} documents pending")
+        self._thread = None
+
+    def stats(self):
+        """Counters plus the current number of pending documents."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['pending'] = self._queue.qsize()
+        return stats
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_prediction_writer():
+    """Return the process-wide write-behind writer for the predictions collection."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                from authentication.mongodb import get_predictions_collection
+                from . import rollups
+                _writer = WriteBehindWriter(
+                    get_predictions_collection,
+                    batch_size=settings.SOLAR_WRITE_BEHIND_BATCH_SIZE,
+                    flush_interval=settings.SOLAR_WRITE_BEHIND_FLUSH_INTERVAL,
+                    max_pending=settings.SOLAR_WRITE_BEHIND_MAX_PENDING,
+                    enqueue_timeout=settings.SOLAR_WRITE_BEHIND_ENQUEUE_TIMEOUT,
+                    on_written=rollups.apply_created if rollups.rollups_maintained() else None,
+                )
+    return _writer